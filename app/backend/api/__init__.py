@@ -1,6 +1,7 @@
 from .auth import auth_bp
 from .profile import profile_bp
 from .posts import posts_bp
+from .admin import admin_bp
 from .feed import feed_bp
 from .jobs import jobs_bp
 from .messaging import messaging_bp
@@ -9,6 +10,7 @@ __all__ = [
     'auth_bp',
     'profile_bp',
     'posts_bp',
+    'admin_bp',
     'feed_bp',
     'jobs_bp',
     'messaging_bp'
@@ -0,0 +1,116 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from models.user import db, User
+from models.post import Post
+from api.posts import delete_post_with_engagement
+from services.view_buffer import view_buffer
+from services.trending import trending_leaderboard
+from services.pagination import InvalidCursor, keyset_paginate_by
+from services.cache import response_cache
+from services.responses import response_layer
+from services.realtime import notification_hub
+from services.image_jobs import image_pipeline
+from services.storage import media_store
+from services.passwords import password_hasher
+from services.ratelimit import login_rate_limiter
+from services.identity import require_role, role_revocations, user_cache, user_roles
+import operator
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/api/admin/posts/<int:post_id>', methods=['DELETE'])
+@jwt_required()
+@require_role('admin')
+def admin_delete_post(post_id):
+    post = Post.query.get_or_404(post_id)
+    delete_post_with_engagement(post)
+    return jsonify({'message': 'Post deleted by admin.'})
+
+# sort arg -> (column, descending); each is the leading column of an index, with id breaking ties
+ADMIN_USER_SORTS = {
+    'id': (User.id, True),
+    'username': (User.username_lower, False),
+    'post_count': (User.post_count, True),
+}
+
+def username_prefix_filter(prefix):
+    """``username_lower LIKE 'prefix%'`` as a range, so it seeks through the username_lower index on any database"""
+    prefix = prefix.lower()
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return db.and_(User.username_lower >= prefix, User.username_lower < upper)
+
+@admin_bp.route('/api/admin/users', methods=['GET'])
+@jwt_required()
+@require_role('admin')  # ahead of the ETag check, so a 304 is only ever answered to admins
+@response_layer.options(version=lambda: response_cache.version('users', 'posts'))
+def admin_list_users():
+    """One cursor page of users; sort, per_page, cursor and username/is_admin/min_posts/max_posts filters"""
+    sort = request.args.get('sort', 'id')
+    if sort not in ADMIN_USER_SORTS:
+        return jsonify({'error': f"sort must be one of: {', '.join(ADMIN_USER_SORTS)}."}), 400
+    sort_column, descending = ADMIN_USER_SORTS[sort]
+    max_per_page = current_app.config.get('ADMIN_USERS_MAX_PER_PAGE', 200)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), max_per_page)
+
+    columns = [User.id, User.username, User.email, User.is_admin, User.post_count]
+    if sort_column not in columns:
+        columns.append(sort_column)  # the cursor is built from it
+    query = db.session.query(*columns)
+    if request.args.get('username', '').strip():
+        query = query.filter(username_prefix_filter(request.args['username'].strip()))
+    if 'is_admin' in request.args:
+        query = query.filter(User.is_admin == (request.args['is_admin'].lower() in ('1', 'true')))
+    for arg, compare in (('min_posts', operator.ge), ('max_posts', operator.le)):
+        if arg in request.args:
+            bound = request.args.get(arg, type=int)
+            if bound is None or bound < 0:
+                return jsonify({'error': f'{arg} must be a non-negative integer.'}), 400
+            query = query.filter(compare(User.post_count, bound))
+
+    try:
+        rows, next_cursor = keyset_paginate_by(query, sort_column, User.id, request.args.get('cursor'), per_page,
+                                               descending=descending)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'users': [
+            {'id': row.id, 'username': row.username, 'email': row.email, 'is_admin': row.is_admin,
+             'post_count': row.post_count}
+            for row in rows
+        ],
+        'per_page': per_page,
+        'next_cursor': next_cursor
+    })
+
+@admin_bp.route('/api/admin/metrics', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def admin_metrics():
+    return jsonify({
+        'view_buffer': view_buffer.stats(),
+        'trending': trending_leaderboard.stats(),
+        'response_cache': response_cache.stats(),
+        'response_layer': response_layer.stats(),
+        'notification_hub': notification_hub.stats(),
+        'image_pipeline': image_pipeline.stats(),
+        'media_store': media_store.stats(),
+        'password_hasher': password_hasher.stats(),
+        'login_rate_limiter': login_rate_limiter.stats(),
+        'user_cache': user_cache.stats(),
+        'role_revocations': role_revocations.stats()
+    })
+
+@admin_bp.route('/api/admin/users/<int:user_id>/roles', methods=['PUT'])
+@jwt_required()
+@require_role('admin')
+def admin_set_roles(user_id):
+    user = User.query.get_or_404(user_id)
+    data = request.get_json() or {}
+    if not isinstance(data.get('is_admin'), bool):
+        return jsonify({'error': 'is_admin must be true or false.'}), 400
+    user.is_admin = data['is_admin']
+    # Tokens already issued still claim the old roles; this overrides them from the next request on
+    role_revocations.revoke(user)
+    db.session.commit()
+    response_cache.bump('users')
+    return jsonify({'id': user.id, 'username': user.username, 'roles': user_roles(user)})
@@ -1,22 +1,29 @@
 from flask import Blueprint, request, jsonify
-from models.user import db, User
+from models.user import db, User, normalize_identifier
+from services.cache import response_cache
+from services.passwords import HashingUnavailable, password_hasher
+from services.ratelimit import login_rate_limiter
 from flask_jwt_extended import create_access_token
+from services.identity import user_claims
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_
-from werkzeug.security import check_password_hash
 from models.profile import Profile, Skill, Experience, Education
 
 auth_bp = Blueprint('auth', __name__)
 
+def hashing_unavailable(e):
+    return jsonify({'error': str(e)}), e.status, {'Retry-After': str(e.retry_after)}
+
 @auth_bp.route('/api/signup', methods=['POST'])
 def signup():
     data = request.get_json()
     username = data.get('username')
     email = data.get('email')
     password = data.get('password')
-    is_admin = data.get('is_admin', False)
     if not username or not email or not password:
         return jsonify({'error': 'Missing required fields'}), 400
+    if '@' in username:
+        # Login routes identifiers containing '@' to the email column
+        return jsonify({'error': 'Username cannot contain @'}), 400
     user = User(
         username=username,
         email=email,
@@ -25,16 +32,20 @@ def signup():
         work_experience="",
         education="",
         contact_info="",
-        image_url="",
-        is_admin=is_admin
+        image_url=""
     )
-    user.set_password(password)
+    # The KDF runs in the bounded hashing pool; a saturated pool answers 429/503 instead of queueing
+    try:
+        user.password_hash = password_hasher.hash(password)
+    except HashingUnavailable as e:
+        return hashing_unavailable(e)
     db.session.add(user)
     try:
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
         return jsonify({'error': 'Username or email already exists'}), 400
+    response_cache.bump('users')
     return jsonify({'message': 'User created'}), 201
 
 @auth_bp.route('/api/login', methods=['POST'])
@@ -44,9 +55,23 @@ def login():
     password = data.get('password')
     if not identifier or not password:
         return jsonify({'error': 'Missing credentials'}), 400
-    user = User.query.filter(or_(User.username == identifier, User.email == identifier)).first()
-    if user and user.check_password(password):
-        access_token = create_access_token(identity=str(user.id))
+    identifier = normalize_identifier(identifier)
+    retry_after = login_rate_limiter.check(identifier, request.remote_addr)
+    if retry_after:
+        return jsonify({'error': 'Too many login attempts, try again later.'}), 429, {'Retry-After': str(retry_after)}
+    # One unique-index lookup: emails contain '@', usernames are matched case-insensitively
+    column = User.email_lower if '@' in identifier else User.username_lower
+    user = User.query.filter(column == identifier).first()
+    try:
+        valid = user is not None and password_hasher.verify(user.password_hash, password)
+    except HashingUnavailable as e:
+        return hashing_unavailable(e)
+    if valid:
+        # Upgrade hashes made with older parameters while the plaintext is at hand
+        if password_hasher.rehash_if_needed(user, password):
+            db.session.commit()
+        # Admin flag and username ride in the token, so authorization needs no user lookup
+        access_token = create_access_token(identity=str(user.id), additional_claims=user_claims(user))
         return jsonify({'token': access_token, 'user': {'id': user.id, 'username': user.username, 'email': user.email}}), 200
     return jsonify({'error': 'Invalid credentials'}), 401
 
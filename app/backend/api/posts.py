@@ -1,39 +1,99 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.utils import secure_filename
-import os
-from models.user import db, User, Notification
-from models.post import Post, PostReaction, PostComment, PostView
-from datetime import datetime, timedelta
-from sqlalchemy import or_
-import re
+from models.user import db
+from models.post import Post, PostReaction, PostComment, PostView, PostViewCount
+from services.counters import increment_counter, increment_user_post_count
+from services.view_buffer import view_buffer
+from services.trending import trending_leaderboard
+from services.pagination import InvalidCursor, keyset_paginate, encode_cursor
+from services.search import get_search_backend
+from services.tasks import task_queue
+from services.cache import response_cache
+from services.responses import response_layer
+from services.notifications import extract_mentions
+from services.serializers import InvalidFields, post_serializer
+from services.storage import media_store
+from services.uploads import upload_details, upload_limit
+from services.comments import MAX_COMMENT_DEPTH, create_comment, load_threads
+from services.tags import parse_tags, set_post_tags, clear_post_tags, filter_by_tags, top_tags
+from sqlalchemy.exc import IntegrityError
 
 posts_bp = Blueprint('posts', __name__)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'mp4', 'mov', 'avi'}
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '../uploads/posts')
+# Sniffed media type -> stored file extension
+ALLOWED_MEDIA_TYPES = {'png': 'png', 'jpeg': 'jpg', 'gif': 'gif', 'mp4': 'mp4', 'mov': 'mov', 'avi': 'avi'}
 MAX_FILE_SIZE_MB = 10
 MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+def paginate_posts(query, ranked=False):
+    """Page posts by ``cursor`` (keyset) or ``page`` (offset); returns ``(posts, pagination_fields)``"""
+    max_per_page = current_app.config.get('POSTS_MAX_PER_PAGE', 100)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), max_per_page)
+    include_total = request.args.get('include_total', '').lower()
+    if 'cursor' in request.args:
+        if ranked:
+            raise InvalidCursor('Cursor pagination requires sort=recent.')
+        items, next_cursor = keyset_paginate(query, Post.created_at, Post.id, request.args['cursor'], per_page)
+        fields = {'per_page': per_page, 'next_cursor': next_cursor}
+        if include_total in ('1', 'true'):
+            fields['total'] = query.order_by(None).count()
+        return items, fields
 
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    page = max(request.args.get('page', 1, type=int), 1)
+    count = include_total not in ('0', 'false')
+    if not ranked:
+        query = query.order_by(Post.created_at.desc(), Post.id.desc())
+    posts = query.paginate(page=page, per_page=per_page, error_out=False, count=count)
+    last = posts.items[-1] if posts.items else None
+    return posts.items, {
+        'total': posts.total,
+        'page': posts.page,
+        'per_page': posts.per_page,
+        'pages': posts.pages if count else None,
+        # Lets clients switch to cursor mode after an offset page
+        'next_cursor': encode_cursor(last.created_at, last.id) if last and not ranked and len(posts.items) == per_page else None
+    }
 
-def notify_mentions(content, actor_id, context):
-    mentioned_usernames = set(re.findall(r'@([A-Za-z0-9_]+)', content))
-    for username in mentioned_usernames:
-        user = User.query.filter_by(username=username).first()
-        if user and user.id != actor_id:
-            message = f'You were mentioned in a {context}.'
-            notif = Notification(user_id=user.id, message=message)
-            db.session.add(notif)
+def post_projection(extra_fields=()):
+    """Serializer and query for the ``fields`` and ``preview_len`` args; returns ``(serializer, query, requested)``"""
+    requested = {name.strip() for name in request.args.get('fields', '').split(',') if name.strip()} or None
+    columns = None
+    if 'preview_len' in request.args:
+        preview_len = request.args.get('preview_len', type=int)
+        if not preview_len or preview_len < 1:
+            raise InvalidFields('preview_len must be a positive integer.')
+        columns = {'content': db.func.substr(Post.content, 1, preview_len)}
+    # Only computed fields (fields=snippet) still return each post's id alongside them
+    serializer = post_serializer.project(requested and (requested.difference(extra_fields) or {'id'}), columns)
+    keys = [getattr(Post, name) for name in ('id', 'created_at') if name not in serializer.fields]
+    return serializer, serializer.query(Post.query, *keys), requested
+
+def delete_post_with_engagement(post):
+    """Delete a post and its reactions, comments and views with bulk DELETEs instead of loading them"""
+    for model in (PostReaction, PostView, PostViewCount):
+        model.query.filter_by(post_id=post.id).delete(synchronize_session=False)
+    PostComment.query.filter_by(post_id=post.id).update({PostComment.parent_id: None}, synchronize_session=False)
+    PostComment.query.filter_by(post_id=post.id).delete(synchronize_session=False)
+    clear_post_tags(post.id)
+    released = media_store.release([post.media_key])
+    increment_user_post_count(post.user_id, -1)
+    db.session.delete(post)
     db.session.commit()
+    media_store.collect_later(released)
+    response_cache.bump('posts')
+    trending_leaderboard.discard(post.id)
+
+def notify_mentions(content, actor_id, context):
+    """Queue mention notifications on the task queue"""
+    usernames = extract_mentions(content)
+    if usernames:
+        task_queue.enqueue('notify_mentions', usernames=usernames, actor_id=actor_id, context=context)
 
 @posts_bp.route('/api/posts', methods=['POST'])
 @jwt_required()
+@upload_limit(MAX_FILE_SIZE)
 def create_post():
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     title = request.form.get('title', '').strip()
     content = request.form.get('content')
     tags = request.form.get('tags', '').strip()
@@ -45,79 +105,59 @@ def create_post():
     if visibility not in ['public', 'private']:
         return jsonify({'error': 'Invalid visibility value.'}), 400
 
-    media_url = None
+    media_url = media_key = None
     if 'media' in request.files:
         file = request.files['media']
-        if file and allowed_file(file.filename):
-            file.seek(0, 2)
-            file_length = file.tell()
-            file.seek(0)
-            if file_length > MAX_FILE_SIZE:
-                return jsonify({'error': f'Media file too large (max {MAX_FILE_SIZE_MB}MB).'}), 400
-            filename = secure_filename(f"{user_id}_{int(datetime.utcnow().timestamp())}_{file.filename}")
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(file_path)
-            media_url = f"/uploads/posts/{filename}"
-        else:
+        # Size was enforced while streaming; the type comes from the file's magic bytes, not its name
+        size, digest, media_type = upload_details(file)
+        if media_type not in ALLOWED_MEDIA_TYPES:
             return jsonify({'error': 'Invalid media file type.'}), 400
+        # Content-addressed: re-uploads of the same file share one stored blob
+        media_key = media_store.store(file, ALLOWED_MEDIA_TYPES[media_type], digest=digest, size=size)
+        media_url = media_store.url(media_key)
 
-    post = Post(user_id=user_id, content=content, media_url=media_url, title=title, tags=tags, visibility=visibility)
+    post = Post(user_id=user_id, content=content, media_url=media_url, title=title, tags=tags, visibility=visibility,
+                media_key=media_key)
     db.session.add(post)
+    db.session.flush()
+    set_post_tags(post.id, tags)
+    increment_user_post_count(user_id)
     db.session.commit()
+    response_cache.bump('posts')
     notify_mentions(content, user_id, 'post')
 
-    return jsonify({
-        'id': post.id,
-        'user_id': post.user_id,
-        'title': post.title,
-        'content': post.content,
-        'tags': post.tags,
-        'visibility': post.visibility,
-        'media_url': post.media_url,
-        'created_at': post.created_at.isoformat()
-    }), 201
+    return jsonify(post_serializer.dump(post)), 201
 
 @posts_bp.route('/api/posts', methods=['GET'])
+@response_layer.options(version=lambda: response_cache.version('posts'))
+@response_cache.cached('posts', vary_args=('page', 'per_page', 'cursor', 'include_total', 'tag', 'tag_mode', 'visibility', 'q',
+                                           'fields', 'preview_len'))
 def list_posts():
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
     tag_filter = request.args.get('tag')
     visibility = request.args.get('visibility')
     q = request.args.get('q')
 
-    query = Post.query
+    try:
+        serializer, query, _ = post_projection()
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     if tag_filter:
-        query = query.filter(Post.tags.ilike(f'%{tag_filter}%'))
+        query = filter_by_tags(query, Post.id, parse_tags(tag_filter), match_all=request.args.get('tag_mode') == 'all')
     if visibility in ['public', 'private']:
         query = query.filter(Post.visibility == visibility)
     if q:
-        query = query.filter(or_(Post.title.ilike(f'%{q}%'), Post.content.ilike(f'%{q}%')))
+        query = get_search_backend().filter(query, q)
 
-    posts = query.order_by(Post.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    return jsonify({
-        'posts': [
-            {
-                'id': post.id,
-                'user_id': post.user_id,
-                'title': post.title,
-                'content': post.content,
-                'tags': post.tags,
-                'visibility': post.visibility,
-                'media_url': post.media_url,
-                'created_at': post.created_at.isoformat(),
-                'like_count': len(post.reactions)
-            } for post in posts.items
-        ],
-        'total': posts.total,
-        'page': posts.page,
-        'per_page': posts.per_page,
-        'pages': posts.pages
-    })
+    try:
+        posts, pagination = paginate_posts(query)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'posts': serializer.dump_many(posts), **pagination})
 
 @posts_bp.route('/api/posts/<int:post_id>', methods=['PUT'])
 @jwt_required()
 def edit_post(post_id):
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     post = Post.query.get_or_404(post_id)
     if post.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
@@ -136,19 +176,20 @@ def edit_post(post_id):
     post.content = content
     post.tags = tags
     post.visibility = visibility
+    set_post_tags(post.id, tags)
     # Media update not supported in edit for simplicity
     db.session.commit()
+    response_cache.bump('posts')
     return jsonify({'message': 'Post updated successfully.'})
 
 @posts_bp.route('/api/posts/<int:post_id>', methods=['DELETE'])
 @jwt_required()
 def delete_post(post_id):
-    user_id = get_jwt_identity()
+    user_id = int(get_jwt_identity())
     post = Post.query.get_or_404(post_id)
     if post.user_id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
-    db.session.delete(post)
-    db.session.commit()
+    delete_post_with_engagement(post)
     return jsonify({'message': 'Post deleted successfully.'})
 
 @posts_bp.route('/api/posts/<int:post_id>/like', methods=['POST'])
@@ -161,9 +202,14 @@ def like_post(post_id):
         return jsonify({'error': 'Already liked'}), 400
     reaction = PostReaction(user_id=user_id, post_id=post_id)
     db.session.add(reaction)
-    db.session.commit()
-    like_count = PostReaction.query.filter_by(post_id=post_id).count()
-    return jsonify({'message': 'Post liked', 'like_count': like_count})
+    increment_counter(post_id, 'like_count')
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Already liked'}), 400
+    response_cache.bump('posts')
+    return jsonify({'message': 'Post liked', 'like_count': post.like_count})
 
 @posts_bp.route('/api/posts/<int:post_id>/like', methods=['DELETE'])
 @jwt_required()
@@ -173,30 +219,42 @@ def unlike_post(post_id):
     if not reaction:
         return jsonify({'error': 'Not liked yet'}), 400
     db.session.delete(reaction)
+    increment_counter(post_id, 'like_count', -1)
     db.session.commit()
-    like_count = PostReaction.query.filter_by(post_id=post_id).count()
+    response_cache.bump('posts')
+    like_count = db.session.query(Post.like_count).filter(Post.id == post_id).scalar()
     return jsonify({'message': 'Post unliked', 'like_count': like_count})
 
-# Helper to build comment tree
-def build_comment_tree(comments):
-    comment_dict = {c.id: {**c.__dict__, 'replies': []} for c in comments}
-    root_comments = []
-    for c in comments:
-        if c.parent_id:
-            comment_dict[c.parent_id]['replies'].append(comment_dict[c.id])
-        else:
-            root_comments.append(comment_dict[c.id])
-    # Remove SQLAlchemy state from dicts
-    for c in comment_dict.values():
-        c.pop('_sa_instance_state', None)
-    return root_comments
+def comment_page_args():
+    max_per_page = current_app.config.get('COMMENTS_MAX_PER_PAGE', 50)
+    max_depth = current_app.config.get('COMMENTS_MAX_DEPTH', 10)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), max_per_page)
+    depth = min(max(request.args.get('depth', 3, type=int), 0), max_depth)
+    return page, per_page, depth
+
+def comment_threads_response(threads, has_more, page):
+    # The body stays a plain list of threads; paging hints travel in headers
+    response = jsonify(threads)
+    response.headers['X-Page'] = str(page)
+    response.headers['X-Has-More'] = 'true' if has_more else 'false'
+    return response
 
 @posts_bp.route('/api/posts/<int:post_id>/comments', methods=['GET'])
+@response_layer.options(version=lambda: response_cache.version('posts'))
 def get_comments(post_id):
-    post = Post.query.get_or_404(post_id)
-    comments = PostComment.query.filter_by(post_id=post_id).order_by(PostComment.created_at.asc()).all()
-    tree = build_comment_tree(comments)
-    return jsonify(tree)
+    Post.query.get_or_404(post_id)
+    page, per_page, depth = comment_page_args()
+    threads, has_more = load_threads(post_id, page=page, per_page=per_page, max_depth=depth)
+    return comment_threads_response(threads, has_more, page)
+
+@posts_bp.route('/api/posts/<int:post_id>/comments/<int:comment_id>/replies', methods=['GET'])
+@response_layer.options(version=lambda: response_cache.version('posts'))
+def get_comment_replies(post_id, comment_id):
+    parent = PostComment.query.filter_by(id=comment_id, post_id=post_id).first_or_404()
+    page, per_page, depth = comment_page_args()
+    threads, has_more = load_threads(post_id, parent=parent, page=page, per_page=per_page, max_depth=depth)
+    return comment_threads_response(threads, has_more, page)
 
 @posts_bp.route('/api/posts/<int:post_id>/comments', methods=['POST'])
 @jwt_required()
@@ -208,9 +266,17 @@ def add_comment(post_id):
     parent_id = data.get('parent_id')
     if not content:
         return jsonify({'error': 'Content is required.'}), 400
-    comment = PostComment(user_id=user_id, post_id=post_id, content=content, parent_id=parent_id)
-    db.session.add(comment)
+    parent = None
+    if parent_id:
+        parent = PostComment.query.filter_by(id=parent_id, post_id=post_id).first()
+        if not parent:
+            return jsonify({'error': 'Parent comment not found.'}), 400
+        if parent.depth + 1 > MAX_COMMENT_DEPTH:
+            return jsonify({'error': 'Replies are nested too deeply.'}), 400
+    create_comment(post_id, user_id, content, parent=parent)
+    increment_counter(post_id, 'comment_count')
     db.session.commit()
+    response_cache.bump('posts')
     notify_mentions(content, user_id, 'comment')
     return jsonify({'message': 'Comment added.'}), 201
 
@@ -219,126 +285,63 @@ def add_comment(post_id):
 def get_post(post_id):
     post = Post.query.get_or_404(post_id)
     user_id = get_jwt_identity()
-    # Record view
-    view = PostView(post_id=post_id, user_id=user_id)
-    db.session.add(view)
-    db.session.commit()
+    # Record view (buffered; written in bulk by a background flusher)
+    view_buffer.record(post_id, user_id)
     # Prepare response
-    return jsonify({
-        'id': post.id,
-        'user_id': post.user_id,
-        'title': post.title,
-        'content': post.content,
-        'tags': post.tags,
-        'visibility': post.visibility,
-        'media_url': post.media_url,
-        'created_at': post.created_at.isoformat(),
-        'like_count': len(post.reactions),
-        'comment_count': len(post.comments),
-        'view_count': len(post.views)
-    })
+    return jsonify(post_serializer.dump(post))
 
 @posts_bp.route('/api/posts/trending', methods=['GET'])
 def trending_posts():
-    since = datetime.utcnow() - timedelta(days=7)
-    posts = (
-        Post.query
-        .join(PostView)
-        .filter(PostView.viewed_at >= since)
-        .group_by(Post.id)
-        .order_by(db.func.count(PostView.id).desc())
-        .limit(5)
-        .all()
-    )
-    return jsonify([
-        {
-            'id': post.id,
-            'user_id': post.user_id,
-            'title': post.title,
-            'content': post.content,
-            'tags': post.tags,
-            'visibility': post.visibility,
-            'media_url': post.media_url,
-            'created_at': post.created_at.isoformat(),
-            'like_count': len(post.reactions),
-            'comment_count': len(post.comments),
-            'view_count': len(post.views)
-        } for post in posts
-    ])
+    max_k = current_app.config.get('TRENDING_MAX_K', 50)
+    k = min(max(request.args.get('k', 5, type=int), 1), max_k)
+    ranked = trending_leaderboard.top(k, tag=request.args.get('tag'), category=request.args.get('category'))
+    ranked_ids = [post_id for post_id, _ in ranked]
+    posts = {post.id: post for post in post_serializer.query(Post.query).filter(Post.id.in_(ranked_ids))} if ranked_ids else {}
+    return jsonify([post_serializer.dump(posts[post_id]) for post_id in ranked_ids if post_id in posts])
 
-@posts_bp.route('/api/admin/posts/<int:post_id>', methods=['DELETE'])
-@jwt_required()
-def admin_delete_post(post_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admin only'}), 403
-    post = Post.query.get_or_404(post_id)
-    db.session.delete(post)
-    db.session.commit()
-    return jsonify({'message': 'Post deleted by admin.'})
-
-@posts_bp.route('/api/admin/users', methods=['GET'])
-@jwt_required()
-def admin_list_users():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user or not user.is_admin:
-        return jsonify({'error': 'Admin only'}), 403
-    users = User.query.all()
-    return jsonify([
-        {
-            'id': u.id,
-            'username': u.username,
-            'email': u.email,
-            'is_admin': u.is_admin,
-            'post_count': len(u.posts) if hasattr(u, 'posts') else 0
-        } for u in users
-    ])
+@posts_bp.route('/api/tags', methods=['GET'])
+def list_tags():
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    tags = top_tags(limit=limit, prefix=request.args.get('prefix'))
+    return jsonify([{'name': name, 'post_count': post_count} for name, post_count in tags])
 
 @posts_bp.route('/api/posts/search', methods=['GET'])
 def search_posts():
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
     q = request.args.get('q')
     user_id = request.args.get('user_id')
     tag = request.args.get('tag')
     date_from = request.args.get('date_from')
     date_to = request.args.get('date_to')
 
-    query = Post.query
+    sort = request.args.get('sort', 'relevance' if q else 'recent')
+    ranked = bool(q) and sort == 'relevance'
+    search_backend = get_search_backend()
+
+    try:
+        serializer, query, requested = post_projection(extra_fields=('snippet',))
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    with_snippets = bool(q) and (requested is None or 'snippet' in requested)
     if q:
-        query = query.filter(or_(Post.title.ilike(f'%{q}%'), Post.content.ilike(f'%{q}%')))
+        query = search_backend.filter(query, q, ranked=ranked)
     if user_id:
         query = query.filter(Post.user_id == int(user_id))
     if tag:
-        query = query.filter(Post.tags.ilike(f'%{tag}%'))
+        query = filter_by_tags(query, Post.id, parse_tags(tag), match_all=request.args.get('tag_mode') == 'all')
     if date_from:
         query = query.filter(Post.created_at >= date_from)
     if date_to:
         query = query.filter(Post.created_at <= date_to)
 
-    posts = query.order_by(Post.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    return jsonify({
-        'posts': [
-            {
-                'id': post.id,
-                'user_id': post.user_id,
-                'title': post.title,
-                'content': post.content,
-                'tags': post.tags,
-                'visibility': post.visibility,
-                'media_url': post.media_url,
-                'created_at': post.created_at.isoformat(),
-                'like_count': len(post.reactions),
-                'comment_count': len(post.comments),
-                'view_count': len(post.views)
-            } for post in posts.items
-        ],
-        'total': posts.total,
-        'page': posts.page,
-        'per_page': posts.per_page,
-        'pages': posts.pages
-    })
-
-# Routes will be implemented here 
\ No newline at end of file
+    try:
+        posts, pagination = paginate_posts(query, ranked=ranked)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    snippets = search_backend.snippets(q, posts) if with_snippets else {}
+    results = []
+    for post in posts:
+        result = serializer.dump(post)
+        if with_snippets:
+            result['snippet'] = snippets.get(post.id)
+        results.append(result)
+    return jsonify({'posts': results, **pagination})
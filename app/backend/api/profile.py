@@ -1,83 +1,62 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.user import db, User, Notification
-import os
-from werkzeug.utils import secure_filename
-from PIL import Image
+from models.user import db, User, Notification, normalize_identifier
+from models.task import ImageJob
+from services.serializers import profile_serializer, notification_serializer
+from services.notifications import inbox_page, set_read_state, unread_count
+from services.pagination import InvalidCursor
+from services.image_jobs import image_pipeline
+from services.storage import media_store
+from services.imaging import available_formats
+from services.realtime import SubscriberLimitReached, notification_hub, sse_frame
+from services.uploads import upload_details, upload_limit
+from services.identity import issue_stream_token, load_current_user, stream_token_user
+from services.cache import response_cache
+import json
 import time
-import uuid
 
 profile_bp = Blueprint('profile', __name__)
 
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'profile_images')
-THUMBNAIL_FOLDER = os.path.join(UPLOAD_FOLDER, 'thumbnails')
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+ALLOWED_MEDIA_TYPES = {'png', 'jpeg'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-MAX_IMAGE_DIMENSIONS = (1024, 1024)  # Max width/height
-THUMBNAIL_SIZE = (150, 150)  # Thumbnail size
 
-# Create directories if they don't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(THUMBNAIL_FOLDER, exist_ok=True)
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-def generate_unique_filename(user_id, extension):
-    """Generate a unique filename with UUID to prevent conflicts"""
-    unique_id = str(uuid.uuid4())[:8]
-    timestamp = int(time.time())
-    return f"profile_{user_id}_{timestamp}_{unique_id}.{extension}"
-
-def process_image(image_path, output_path, max_size=None, quality=85):
-    """Process image with compression, resizing, and format conversion"""
-    try:
-        with Image.open(image_path) as img:
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            
-            # Resize if max_size is specified
-            if max_size:
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save with compression
-            img.save(output_path, format='JPEG', quality=quality, optimize=True)
-            return True
-    except Exception as e:
-        print(f"Image processing error: {e}")
-        return False
+def identifiers_taken(user, update_data):
+    """Which of the changing ``username``/``email`` values another account already uses, in one query"""
+    wanted = {
+        field: normalize_identifier(update_data[field]) for field in ('username', 'email')
+        if isinstance(update_data.get(field), str) and normalize_identifier(update_data[field]) != getattr(user, f'{field}_lower')
+    }
+    if not wanted:
+        return set()
+    conditions = [getattr(User, f'{field}_lower') == value for field, value in wanted.items()]
+    taken = set()
+    for username_lower, email_lower in db.session.query(User.username_lower, User.email_lower) \
+            .filter(User.id != user.id, db.or_(*conditions)):
+        if username_lower == wanted.get('username'):
+            taken.add('username')
+        if email_lower == wanted.get('email'):
+            taken.add('email')
+    return taken
 
 @profile_bp.route('/api/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = load_current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
-    profile = {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'bio': user.bio,
-        'skills': user.skills,
-        'work_experience': user.work_experience,
-        'education': user.education,
-        'contact_info': user.contact_info,
-        'image_url': user.image_url
-    }
-    return jsonify(profile), 200
+    return jsonify(profile_serializer.dump(user)), 200
 
 @profile_bp.route('/api/profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = load_current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     data = request.get_json()
     allowed_fields = ["username", "email", "bio", "skills", "work_experience", "education", "contact_info", "image_url"]
     update_data = {k: v for k, v in data.items() if k in allowed_fields}
+    # One query checks both identifiers, and only the ones actually changing
+    taken = identifiers_taken(user, update_data)
     # Validation rules
     for field, value in update_data.items():
         if not isinstance(value, str):
@@ -85,16 +64,14 @@ def update_profile():
         if field == 'username':
             if len(value) > 80:
                 return jsonify({'error': 'Username must be 80 characters or less.'}), 400
-            # Check uniqueness
-            existing = type(user).query.filter_by(username=value).filter(type(user).id != user_id).first()
-            if existing:
+            if '@' in value:
+                return jsonify({'error': 'Username cannot contain @'}), 400
+            if 'username' in taken:
                 return jsonify({'error': 'Username already exists.'}), 400
         if field == 'email':
             if len(value) > 120 or not ("@" in value and "." in value):
                 return jsonify({'error': 'Enter a valid email address (max 120 chars).'}), 400
-            # Check uniqueness
-            existing = type(user).query.filter_by(email=value).filter(type(user).id != user_id).first()
-            if existing:
+            if 'email' in taken:
                 return jsonify({'error': 'Email already exists.'}), 400
         if field == 'bio' and len(value) > 1000:
             return jsonify({'error': 'Bio too long (max 1000 chars)'}), 400
@@ -111,27 +88,23 @@ def update_profile():
     if not update_data:
         return jsonify({'error': 'No valid fields to update'}), 400
     # Actually update fields
+    released = []
+    if 'image_url' in update_data and update_data['image_url'] != user.image_url:
+        # A hand-set image replaces the processed avatar, which no longer needs its stored renditions
+        released = image_pipeline.detach(user)
     for field, value in update_data.items():
         setattr(user, field, value)
     db.session.commit()
-    profile = {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'bio': user.bio,
-        'skills': user.skills,
-        'work_experience': user.work_experience,
-        'education': user.education,
-        'contact_info': user.contact_info,
-        'image_url': user.image_url
-    }
-    return jsonify(profile), 200
+    media_store.collect_later(released)
+    if 'username' in update_data or 'email' in update_data:
+        response_cache.bump('users')  # shown in the admin user listing
+    return jsonify(profile_serializer.dump(user)), 200
 
 @profile_bp.route('/api/profile/image', methods=['POST'])
 @jwt_required()
+@upload_limit(MAX_FILE_SIZE)
 def upload_profile_image():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = load_current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
@@ -143,70 +116,43 @@ def upload_profile_image():
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
     
-    # Validate file type
-    if not allowed_file(file.filename):
+    # Validate file type from its magic bytes; size was enforced while the upload streamed in
+    _, _, media_type = upload_details(file)
+    if media_type not in ALLOWED_MEDIA_TYPES:
         return jsonify({'error': 'Invalid file type. Only jpg, jpeg, png allowed.'}), 400
     
-    # Check file size
-    file.seek(0, os.SEEK_END)
-    file_length = file.tell()
-    file.seek(0)
-    if file_length > MAX_FILE_SIZE:
-        return jsonify({'error': f'File too large (max {MAX_FILE_SIZE // (1024*1024)}MB)'}), 400
-    
-    # Generate unique filename
-    if not file.filename or '.' not in file.filename:
-        return jsonify({'error': 'Invalid filename'}), 400
-    ext = file.filename.rsplit('.', 1)[1].lower()
-    filename = generate_unique_filename(user_id, ext)
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    
-    try:
-        # Save original file temporarily
-        file.save(filepath)
-        
-        # Process the image (resize, compress, convert to JPEG)
-        processed_filename = f"{filename.rsplit('.', 1)[0]}.jpg"
-        processed_filepath = os.path.join(UPLOAD_FOLDER, processed_filename)
-        
-        if not process_image(filepath, processed_filepath, MAX_IMAGE_DIMENSIONS, quality=85):
-            # Clean up on failure
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            return jsonify({'error': 'Image processing failed'}), 400
-        
-        # Generate thumbnail
-        thumbnail_filename = f"thumb_{processed_filename}"
-        thumbnail_filepath = os.path.join(THUMBNAIL_FOLDER, thumbnail_filename)
-        
-        if not process_image(processed_filepath, thumbnail_filepath, THUMBNAIL_SIZE, quality=80):
-            # Clean up on failure
-            if os.path.exists(filepath):
-                os.remove(filepath)
-            if os.path.exists(processed_filepath):
-                os.remove(processed_filepath)
-            return jsonify({'error': 'Thumbnail generation failed'}), 400
-        
-        # Remove original file (keep only processed version)
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        
-        # Update user profile with new image URL
-        user.image_url = f'/uploads/profile_images/{processed_filename}'
-        db.session.commit()
-        
-        return jsonify({
-            'image_url': user.image_url,
-            'thumbnail_url': f'/uploads/profile_images/thumbnails/{thumbnail_filename}',
-            'message': 'Profile image uploaded successfully'
-        }), 200
-        
-    except Exception as e:
-        # Clean up any files that might have been created
-        for path in [filepath, processed_filepath, thumbnail_filepath]:
-            if 'path' in locals() and os.path.exists(path):
-                os.remove(path)
-        return jsonify({'error': 'Image upload failed', 'details': str(e)}), 400
+    # Every rendition is derived from one decode of the in-memory upload, in the image worker pool,
+    # and stored content-addressed in the media store
+    job_id = image_pipeline.submit(
+        user.id, file.read(), current_app.config['IMAGE_RENDITIONS'],
+        available_formats(current_app.config['IMAGE_FORMATS'])
+    )
+    status_url = f'/api/profile/image/jobs/{job_id}'
+    return jsonify({
+        'job_id': job_id,
+        'status_url': status_url,
+        'message': 'Profile image upload accepted for processing'
+    }), 202, {'Location': status_url}
+
+@profile_bp.route('/api/profile/image/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_image_job(job_id):
+    """Status of an image upload; ``image_url`` is set on the profile once it is ``done``"""
+    job = ImageJob.query.filter_by(id=job_id, user_id=int(get_jwt_identity())).first_or_404()
+    if job.status == 'queued':
+        # A job whose worker died would otherwise stay queued forever
+        image_pipeline.expire(job.id)
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'image_url': job.image_url,
+        'thumbnail_url': job.thumbnail_url,
+        'renditions': json.loads(job.renditions) if job.renditions else None,
+        'timings_ms': json.loads(job.timings) if job.timings else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    })
 
 @profile_bp.route('/api/users', methods=['GET'])
 def list_users():
@@ -216,23 +162,113 @@ def list_users():
 @profile_bp.route('/api/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
+    """Newest-first inbox page; pass ``cursor`` from X-Next-Cursor for the next one, ``unread=true`` to filter"""
     user_id = get_jwt_identity()
-    notifs = Notification.query.filter_by(user_id=user_id).order_by(Notification.created_at.desc()).all()
-    return jsonify([
-        {
-            'id': n.id,
-            'message': n.message,
-            'is_read': n.is_read,
-            'created_at': n.created_at.isoformat()
-        } for n in notifs
-    ])
+    max_per_page = current_app.config.get('NOTIFICATIONS_MAX_PER_PAGE', 50)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), max_per_page)
+    unread_only = request.args.get('unread', '').lower() in ('1', 'true')
+    try:
+        notifs, next_cursor = inbox_page(int(user_id), request.args.get('cursor'), per_page, unread_only)
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    response = jsonify(notification_serializer.dump_many(notifs))
+    response.headers['X-Next-Cursor'] = next_cursor or ''
+    return response
+
+@profile_bp.route('/api/notifications/stream-token', methods=['POST'])
+@jwt_required()
+def create_stream_token():
+    """EventSource can't send headers: it opens the stream with ``?token=`` from here, not the access token"""
+    return jsonify({
+        'token': issue_stream_token(get_jwt_identity()),
+        'expires_in': current_app.config.get('NOTIFICATION_STREAM_TOKEN_TTL', 60)
+    })
+
+@profile_bp.route('/api/notifications/stream', methods=['GET'])
+@jwt_required(optional=True)
+def stream_notifications():
+    """Server-Sent Events stream of new notifications, replaying from ``Last-Event-ID`` on reconnect"""
+    user_id = get_jwt_identity() or stream_token_user(request.args.get('token', ''))
+    if user_id is None:
+        return jsonify({'error': 'Missing or expired stream token.'}), 401
+    user_id = int(user_id)
+    config = current_app.config
+    heartbeat = config.get('NOTIFICATION_STREAM_HEARTBEAT', 15)
+    max_duration = config.get('NOTIFICATION_STREAM_MAX_DURATION', 300)
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id', 0, type=int))
+    try:
+        last_event_id = int(last_event_id)
+    except ValueError:
+        last_event_id = 0
+    try:
+        # Subscribe before the replay query so nothing committed in between is missed
+        subscription = notification_hub.subscribe(user_id)
+    except SubscriberLimitReached as e:
+        return jsonify({'error': str(e)}), 429
+    missed = []
+    if last_event_id:
+        missed = notification_serializer.query(Notification.query) \
+            .filter(Notification.user_id == user_id, Notification.id > last_event_id) \
+            .order_by(Notification.id).limit(notification_hub.backlog).all()
+    # Everything the generator needs is read here: it runs after the request context is gone
+    replay = [(row.id, sse_frame(row.id, 'notification', notification_serializer.dump(row))) for row in missed]
+
+    def generate():
+        sent = last_event_id
+        deadline = time.monotonic() + max_duration
+        try:
+            yield f'retry: {config.get("NOTIFICATION_STREAM_RETRY_MS", 3000)}\n\n'
+            for event_id, frame in replay:
+                sent = event_id
+                yield frame
+            while time.monotonic() < deadline and not subscription.overflowed:
+                items = subscription.wait(heartbeat)
+                if items is None:
+                    yield ': heartbeat\n\n'
+                    continue
+                for event_id, frame in items:
+                    if event_id > sent:
+                        sent = event_id
+                        yield frame
+        finally:
+            notification_hub.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # don't let nginx buffer the stream
+    })
+
+@profile_bp.route('/api/notifications/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    return jsonify({'unread': unread_count(int(get_jwt_identity()))})
+
+@profile_bp.route('/api/notifications', methods=['PATCH'])
+@jwt_required()
+def update_notifications():
+    """Mark many notifications read (or unread) in one statement: ``{"ids": [...]}`` or ``{"all": true}``"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    is_read = data.get('is_read', True)
+    if not isinstance(is_read, bool):
+        return jsonify({'error': 'is_read must be a boolean.'}), 400
+    if data.get('all') is True:
+        ids = None
+    else:
+        ids = data.get('ids')
+        max_ids = current_app.config.get('NOTIFICATIONS_MAX_BULK_IDS', 500)
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+            return jsonify({'error': 'Provide "ids" as a list of notification ids or "all": true.'}), 400
+        if len(ids) > max_ids:
+            return jsonify({'error': f'At most {max_ids} ids per request.'}), 400
+    updated = set_read_state(user_id, ids, is_read=is_read)
+    return jsonify({'updated': updated, 'unread': unread_count(user_id)})
 
 @profile_bp.route('/api/notifications/<int:notif_id>/read', methods=['PATCH'])
 @jwt_required()
 def mark_notification_read(notif_id):
     user_id = get_jwt_identity()
-    notif = Notification.query.filter_by(id=notif_id, user_id=user_id).first_or_404()
-    notif.is_read = True
-    db.session.commit()
+    if not set_read_state(int(user_id), [notif_id]):
+        # Nothing changed: either already read or not this user's notification
+        Notification.query.filter_by(id=notif_id, user_id=user_id).first_or_404()
     return jsonify({'message': 'Notification marked as read.'})
-
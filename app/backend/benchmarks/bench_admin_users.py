@@ -0,0 +1,89 @@
+"""Admin user listing: load-everything versus a projected, cursor-paginated page.
+
+Seeds ``--users`` users and ``--posts`` posts spread across them, then
+compares the old listing (``User.query.all()`` plus ``len(u.posts)`` per
+user, replayed on a bench endpoint) with ``GET /api/admin/users`` reading
+one page of ``--per-page`` users per sort. Reports SQL statements,
+response size and latency per request; the old listing also reads every
+post row, one lazy load per user.
+
+    python -m benchmarks.bench_admin_users --users 5000 --posts 50000
+"""
+import argparse
+import statistics
+import time
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from benchmarks.common import create_bench_app, seed_users, seed_posts, print_table
+from models.user import db, User
+from services.identity import user_claims
+
+REPEAT = 5
+
+
+def register_old_listing(app):
+    @app.route('/bench/admin/users-all')
+    def list_all_users():
+        users = User.query.all()
+        return jsonify([
+            {'id': u.id, 'username': u.username, 'email': u.email, 'is_admin': u.is_admin, 'post_count': len(u.posts)}
+            for u in users
+        ])
+
+
+def measure(client, engine, url, headers):
+    """Median latency in ms, SQL statements per request and response size"""
+    stats = {'statements': 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        stats['statements'] += 1
+
+    latencies = []
+    for i in range(REPEAT):
+        if i == 0:
+            event.listen(engine, 'before_cursor_execute', on_execute)
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if i == 0:
+            event.remove(engine, 'before_cursor_execute', on_execute)
+        assert response.status_code == 200, response.get_json()
+    return statistics.median(latencies), stats['statements'], len(response.get_data())
+
+
+def run(args):
+    app = create_bench_app()
+    register_old_listing(app)
+    client = app.test_client()
+    with app.app_context():
+        seed_users(args.users)
+        seed_posts(args.posts, user_count=args.users)
+        admin = db.session.get(User, 1)
+        admin.is_admin = True
+        db.session.commit()
+        headers = {'Authorization': 'Bearer ' + create_access_token(identity=str(admin.id),
+                                                                    additional_claims=user_claims(admin))}
+        engine = db.engine
+    # Requests run outside this app context, so each gets a fresh session like in production
+    variants = [('all users + len(u.posts) (before)', '/bench/admin/users-all')]
+    for sort in ('id', 'username', 'post_count'):
+        variants.append((f'page, sort={sort}', f'/api/admin/users?sort={sort}&per_page={args.per_page}'))
+    variants.append(('page, username prefix + min_posts',
+                     f'/api/admin/users?username=user1&min_posts=5&per_page={args.per_page}'))
+    rows = []
+    for name, url in variants:
+        latency, statements, size = measure(client, engine, url, headers)
+        rows.append((name, statements, size, f'{latency:.1f}'))
+    print(f'{args.users} users, {args.posts} posts, per_page={args.per_page}')
+    print_table(['listing', 'statements', 'response bytes', 'p50 ms'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--per-page', type=int, default=50)
+    run(parser.parse_args())
@@ -0,0 +1,94 @@
+"""Per-request cost of admin authorization: a users-table lookup versus role claims.
+
+Registers three bare endpoints on the bench app, so only authorization is
+measured: ``jwt only`` verifies the token and nothing else, ``db lookup``
+does what the admin views did before (load the user, check ``is_admin``)
+and ``require_role`` checks the token's roles claim against the
+role-revocation store, which reloads from the database every
+ROLE_REVOCATIONS_REFRESH seconds. Each is requested ``--requests`` times
+with an admin token against a file database of ``--users`` users.
+
+    python -m benchmarks.bench_auth --requests 5000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+
+from benchmarks.common import create_bench_app, count_queries, seed_users, print_table
+from models.user import db, User
+from services.identity import require_role, role_revocations, user_claims
+
+
+def register_endpoints(app):
+    @app.route('/bench/auth/jwt')
+    @jwt_required()
+    def jwt_only():
+        return jsonify({})
+
+    @app.route('/bench/auth/lookup')
+    @jwt_required()
+    def db_lookup():
+        user = User.query.get(get_jwt_identity())
+        if not user or not user.is_admin:
+            return jsonify({'error': 'Admin only'}), 403
+        return jsonify({})
+
+    @app.route('/bench/auth/claims')
+    @jwt_required()
+    @require_role('admin')
+    def claims():
+        return jsonify({})
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        app = create_bench_app(f'sqlite:///{os.path.join(workdir, "bench.db")}')
+        app.config['ROLE_REVOCATIONS_REFRESH'] = args.refresh
+        role_revocations.init_app(app)
+        register_endpoints(app)
+        client = app.test_client()
+        with app.app_context():
+            seed_users(args.users)
+            admin = db.session.get(User, args.users // 2)
+            admin.is_admin = True
+            db.session.commit()
+            headers = {'Authorization': 'Bearer ' + create_access_token(identity=str(admin.id),
+                                                                        additional_claims=user_claims(admin))}
+
+            endpoints = [('jwt only', '/bench/auth/jwt'), ('db lookup (before)', '/bench/auth/lookup'),
+                         ('require_role (after)', '/bench/auth/claims')]
+            latencies = {name: [] for name, _ in endpoints}
+            queries = {}
+            for i in range(args.requests // 10 + args.requests):
+                # Round-robin, so drift over the run (GC, page cache) hits every endpoint alike
+                for name, url in endpoints:
+                    with count_queries() as counter:
+                        start = time.perf_counter()
+                        response = client.get(url, headers=headers)
+                        elapsed = (time.perf_counter() - start) * 1e6
+                    assert response.status_code == 200, response.get_json()
+                    if i >= args.requests // 10:  # the first tenth is warm-up
+                        latencies[name].append(elapsed)
+                        queries[name] = queries.get(name, 0) + counter['queries']
+
+            rows = []
+            baseline = statistics.median(latencies['jwt only'])
+            for name, _ in endpoints:
+                median = statistics.median(latencies[name])
+                rows.append((name, f'{median:.0f}', f'{statistics.mean(latencies[name]):.0f}',
+                             f'{median - baseline:+.0f}', f'{queries[name] / args.requests:.3f}'))
+    print(f'{args.requests} requests per endpoint, {args.users} users, revocations reloaded every {args.refresh}s')
+    print_table(['authorization', 'p50 us', 'mean us', 'over jwt only', 'queries/request'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--refresh', type=float, default=2.0)
+    run(parser.parse_args())
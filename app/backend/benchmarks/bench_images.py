@@ -0,0 +1,84 @@
+"""CPU time per profile image upload: the old two-pass pipeline vs the rendition engine.
+
+"before" replays the original upload_profile_image path: save the upload
+to disk, decode it, LANCZOS-resize to 1024px and write a JPEG, then
+re-open and re-decode that JPEG for the 150px thumbnail. "after" runs
+services.imaging.render_renditions on the in-memory bytes: one
+(draft-mode, for JPEG) decode feeding every rendition.
+
+    python -m benchmarks.bench_images --repeat 5
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from PIL import Image
+
+from benchmarks.common import print_table
+from services.imaging import available_formats, render_renditions
+from config import Config
+
+
+def photo(size, fmt):
+    """A noisy gradient: compresses and decodes roughly like a camera photo"""
+    gradient = Image.linear_gradient('L').resize(size).convert('RGB')
+    noise = Image.effect_noise(size, 40).convert('RGB')
+    buffer = io.BytesIO()
+    Image.blend(gradient, noise, 0.35).save(buffer, format=fmt, quality=92)
+    return buffer.getvalue()
+
+
+def legacy_process_image(image_path, output_path, max_size=None, quality=85):
+    with Image.open(image_path) as img:
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        if max_size:
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        img.save(output_path, format='JPEG', quality=quality, optimize=True)
+
+
+def legacy_upload(data, workdir):
+    upload = os.path.join(workdir, 'upload')
+    full = os.path.join(workdir, 'full.jpg')
+    with open(upload, 'wb') as f:
+        f.write(data)
+    legacy_process_image(upload, full, (1024, 1024), quality=85)
+    legacy_process_image(full, os.path.join(workdir, 'thumb.jpg'), (150, 150), quality=80)
+    os.remove(upload)
+
+
+def cpu_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(repeat):
+    renditions = Config.IMAGE_RENDITIONS
+    basic = {name: renditions[name] for name in ('full', 'thumbnail')}
+    formats = available_formats(Config.IMAGE_FORMATS)
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, size, fmt in (('12MP JPEG', (4032, 3024), 'JPEG'), ('12MP PNG', (4032, 3024), 'PNG'),
+                                 ('2MP JPEG', (1600, 1200), 'JPEG')):
+            data = photo(size, fmt)
+            before = cpu_ms(lambda: legacy_upload(data, workdir), repeat)
+            rows.append((label, 'before: full + thumbnail, jpeg', f'{before:.0f}', '1.00x'))
+            for variant, sizes, fmts in (('after: full + thumbnail, jpeg', basic, ['jpeg']),
+                                         (f'after: {len(renditions)} renditions, jpeg', renditions, ['jpeg']),
+                                         (f'after: {len(renditions)} renditions, {"+".join(formats)}', renditions, formats)):
+                after = cpu_ms(lambda: render_renditions(data, sizes, fmts), repeat)
+                rows.append((label, variant, f'{after:.0f}', f'{before / after:.2f}x'))
+    print_table(['upload', 'pipeline', 'cpu ms', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    run(parser.parse_args().repeat)
@@ -0,0 +1,122 @@
+"""Login load test: throughput and tail latency with and without the password hashing pool.
+
+Requests are served by a fixed pool of ``--server-threads`` threads, the
+way gunicorn serves them with ``--threads``. ``--clients`` concurrent
+clients log in back to back for ``--duration`` seconds, waiting out
+``Retry-After`` when refused, while a probe requests ``GET /api/posts?per_page=1`` every 50ms, standing in for a
+health check. "inline" hashes on the request thread (the old behaviour);
+"pool" runs the KDF in services.passwords with admission control, so
+logins beyond the pool's queue are answered 429 straight away instead of
+holding a server thread.
+
+    python -m benchmarks.bench_login --clients 32 --duration 5
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash
+
+from benchmarks.common import create_bench_app, seed_users, print_table
+from models.user import db, User
+from services.passwords import password_hasher
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def run_scenario(app, backend, args):
+    app.config.update(PASSWORD_HASH_BACKEND=backend, PASSWORD_HASH_WORKERS=args.hash_workers,
+                      PASSWORD_HASH_MAX_QUEUE=args.max_queue)
+    password_hasher.init_app(app)
+    server = ThreadPoolExecutor(max_workers=args.server_threads)
+    local = threading.local()
+
+    def handle(method, url, **kwargs):
+        # One test client per server thread
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = getattr(local.client, method)(url, **kwargs)
+        return response.status_code, float(response.headers.get('Retry-After', 0))
+
+    results = {'latencies': [], 'statuses': {}, 'probe': []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def client(i):
+        body = {'username': f'user{i % args.users}', 'password': 'password'}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, retry_after = server.submit(handle, 'post', '/api/login', json=body).result()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                results['statuses'][status] = results['statuses'].get(status, 0) + 1
+                if status == 200:
+                    results['latencies'].append(elapsed)
+            time.sleep(retry_after)  # a well-behaved client backs off on 429/503
+
+    def probe():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            server.submit(handle, 'get', '/api/posts?per_page=1').result()
+            results['probe'].append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    threads.append(threading.Thread(target=probe))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    server.shutdown()
+    password_hasher.shutdown()
+
+    ok = results['latencies']
+    statuses = results['statuses']
+    return (
+        backend if backend == 'inline' else f'pool ({args.hash_workers} workers, queue {args.max_queue})',
+        f'{len(ok) / wall:.1f}',
+        f'{statistics.median(ok):.0f}' if ok else '-',
+        f'{percentile(ok, 95):.0f}',
+        f'{percentile(ok, 99):.0f}',
+        statuses.get(429, 0) + statuses.get(503, 0),
+        f'{percentile(results["probe"], 50):.0f}',
+        f'{percentile(results["probe"], 99):.0f}',
+    )
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as workdir:
+        # A file database, so the server threads each get their own connection
+        app = create_bench_app(f'sqlite:///{os.path.join(workdir, "bench.db")}')
+        app.config['PASSWORD_HASH_METHOD'] = args.method
+        with app.app_context():
+            seed_users(args.users)
+            # One hash shared by every user: seeding shouldn't take longer than the test
+            User.query.update({User.password_hash: generate_password_hash('password', args.method)})
+            db.session.commit()
+        rows = [run_scenario(app, backend, args) for backend in ('inline', 'thread')]
+    print(f'{args.clients} clients, {args.server_threads} server threads, {args.method}, {os.cpu_count()} CPUs')
+    print_table(['hashing', 'logins/s', 'p50 ms', 'p95 ms', 'p99 ms', '429/503', 'probe p50', 'probe p99'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--server-threads', type=int, default=8)
+    parser.add_argument('--hash-workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--max-queue', type=int, default=4)
+    parser.add_argument('--method', default='pbkdf2:sha256:600000')
+    run(parser.parse_args())
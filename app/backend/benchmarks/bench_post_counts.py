@@ -0,0 +1,51 @@
+"""Query count per page for the post listing endpoints as engagement grows.
+
+Before the batched counters each listed post lazy-loaded its reactions,
+comments and views, so queries grew with page size and rows loaded grew
+with engagement. The query count must now stay flat across every level.
+"""
+from benchmarks.common import (
+    create_bench_app, count_queries, timed, seed_users, seed_posts, seed_engagement, print_table
+)
+from models.user import db
+from services.trending import trending_leaderboard
+
+PAGE_SIZE = 20
+USERS = 50
+ENGAGEMENT_LEVELS = [1, 10, 100, 500]
+ENDPOINTS = [
+    f'/api/posts?per_page={PAGE_SIZE}',
+    f'/api/posts/search?per_page={PAGE_SIZE}',
+    '/api/posts/trending',
+]
+
+
+def run():
+    rows = []
+    for per_post in ENGAGEMENT_LEVELS:
+        app = create_bench_app()
+        with app.app_context():
+            seed_users(USERS)
+            seed_posts(PAGE_SIZE * 2, user_count=USERS)
+            seed_engagement(range(1, PAGE_SIZE * 2 + 1), per_post, user_count=USERS)
+            # Trending is served from the precomputed leaderboard; build it before measuring
+            trending_leaderboard.refresh()
+            client = app.test_client()
+            for url in ENDPOINTS:
+                timings = {}
+                with count_queries() as counter, timed(timings, 'ms'):
+                    response = client.get(url)
+                assert response.status_code == 200, response.data
+                rows.append((per_post, url, counter['queries'], f"{timings['ms']:.1f}"))
+            db.session.remove()
+            db.drop_all()
+
+    print_table(['engagement/post', 'endpoint', 'queries', 'ms'], rows)
+    for url in ENDPOINTS:
+        counts = {queries for _, u, queries, _ in rows if u == url}
+        assert len(counts) == 1, f'{url} query count varies with engagement: {sorted(counts)}'
+    print('OK: query count per page is constant across engagement levels')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,96 @@
+"""Post search latency: ILIKE '%q%' scans vs the full-text index.
+
+Seeds ``--posts`` posts (default 1M) of random vocabulary into a temporary
+SQLite file (the FTS5 triggers index them as they are inserted) and reports
+p50/p99 latency of the ranked search query for both backends.
+
+    python -m benchmarks.bench_search --posts 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_bench_app, seed_users, print_table
+from models.user import db
+from models.post import Post
+from services.search import LikeSearchBackend, SqliteFtsSearchBackend
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_POST = 40
+
+
+def make_vocabulary(rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(VOCABULARY_SIZE)]
+
+
+def seed_posts(total, vocabulary, rng, batch_size=50000):
+    now = datetime.utcnow()
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for start in range(0, total, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, total)):
+                # Zipf-ish word choice so some terms are common and most are rare
+                words = [vocabulary[int(len(vocabulary) * rng.random() ** 2)] for _ in range(WORDS_PER_POST)]
+                rows.append((1, ' '.join(words[:6]), ' '.join(words), 'public', (now - timedelta(seconds=i)).isoformat(sep=' ')))
+            cursor.executemany(
+                'INSERT INTO posts (user_id, title, content, visibility, created_at, like_count, comment_count, view_count) '
+                'VALUES (?, ?, ?, ?, ?, 0, 0, 0)', rows
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def measure(backend, queries, page_size=10):
+    """Time what /api/posts/search does for page 1: total count, ranked page, snippets"""
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        query = backend.filter(Post.query, q, ranked=True)
+        query.order_by(None).count()
+        posts = query.order_by(Post.created_at.desc()).limit(page_size).all() if backend.name == 'like' \
+            else query.limit(page_size).all()
+        backend.snippets(q, posts)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--like-queries', type=int, default=20, help='ILIKE is slow; sample fewer queries')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocabulary = make_vocabulary(rng)
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        app = create_bench_app(f'sqlite:///{path}')
+        with app.app_context():
+            started = time.perf_counter()
+            seed_users(1)
+            seed_posts(args.posts, vocabulary, rng)
+            print(f'Seeded and indexed {args.posts:,} posts in {time.perf_counter() - started:.1f}s')
+
+            queries = [rng.choice(vocabulary) for _ in range(args.queries)]
+            rows = []
+            for backend, sample in ((LikeSearchBackend(), queries[:args.like_queries]), (SqliteFtsSearchBackend(), queries)):
+                p50, p99 = measure(backend, sample)
+                rows.append((backend.name, len(sample), f'{p50:.2f}', f'{p99:.2f}'))
+            print_table(['backend', 'queries', 'p50 ms', 'p99 ms'], rows)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    run()
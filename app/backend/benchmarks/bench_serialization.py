@@ -0,0 +1,85 @@
+"""Per-item serialization cost and response size for a 100-post page.
+
+Compares the old hand-built dicts over hydrated ORM objects with the
+precompiled post_serializer over ORM objects and over column-only
+(with_entities) rows, then encodes the page with the stdlib and orjson
+JSON providers.
+
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+
+from benchmarks.common import create_bench_app, seed_users, seed_posts, print_table
+from models.user import db
+from models.post import Post
+from services.serializers import post_serializer, orjson
+
+PAGE_SIZE = 100
+REPEAT = 200
+
+
+def legacy_page():
+    posts = Post.query.order_by(Post.created_at.desc()).limit(PAGE_SIZE).all()
+    return [
+        {
+            'id': post.id,
+            'user_id': post.user_id,
+            'title': post.title,
+            'content': post.content,
+            'tags': post.tags,
+            'visibility': post.visibility,
+            'media_url': post.media_url,
+            'created_at': post.created_at.isoformat(),
+            'like_count': post.like_count,
+            'comment_count': post.comment_count,
+            'view_count': post.view_count
+        } for post in posts
+    ]
+
+
+def serializer_orm_page():
+    return post_serializer.dump_many(Post.query.order_by(Post.created_at.desc()).limit(PAGE_SIZE).all())
+
+
+def serializer_rows_page():
+    return post_serializer.dump_many(
+        post_serializer.query(Post.query).order_by(Post.created_at.desc()).limit(PAGE_SIZE).all()
+    )
+
+
+def per_item_us(fn):
+    def run():
+        fn()
+        db.session.expunge_all()  # don't let the identity map hide hydration cost
+    seconds = min(timeit.repeat(run, number=REPEAT, repeat=3)) / REPEAT
+    return seconds / PAGE_SIZE * 1e6
+
+
+def run():
+    app = create_bench_app()
+    with app.app_context():
+        seed_users(1)
+        seed_posts(PAGE_SIZE * 5)
+
+        rows = [(name, f'{per_item_us(fn):.2f}') for name, fn in (
+            ('hand-built dict, ORM objects', legacy_page),
+            ('post_serializer, ORM objects', serializer_orm_page),
+            ('post_serializer, with_entities rows', serializer_rows_page),
+        )]
+        print_table(['query + serialize', 'us/item'], rows)
+        print()
+
+        page = {'posts': serializer_rows_page(), 'total': PAGE_SIZE * 5, 'page': 1, 'per_page': PAGE_SIZE, 'pages': 5}
+        encoders = [('stdlib json (sort_keys)', lambda: json.dumps(page, sort_keys=True, separators=(',', ':')).encode())]
+        if orjson is not None:
+            encoders.append(('orjson', lambda: orjson.dumps(page, option=orjson.OPT_SORT_KEYS)))
+        rows = []
+        for name, encode in encoders:
+            seconds = min(timeit.repeat(encode, number=REPEAT, repeat=3)) / REPEAT
+            rows.append((name, f'{seconds / PAGE_SIZE * 1e6:.2f}', len(encode())))
+        print_table(['encode 100-post page', 'us/item', 'response bytes'], rows)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,68 @@
+"""Payload and row size of GET /api/posts with sparse fieldsets.
+
+Seeds ``--posts`` posts with ``--content-len`` characters of content and
+pages through the listing with the full payload, a mobile-style
+``fields=id,title,content,like_count,comment_count&preview_len=140`` and an
+id/title-only projection. Reports response bytes, bytes of column data
+read from the database and median request latency per page.
+
+    python -m benchmarks.bench_sparse_fields --posts 5000
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import create_bench_app, seed_users, seed_posts, print_table
+from models.post import Post
+from api.posts import post_projection
+
+PER_PAGE = 50
+VARIANTS = [
+    ('full', {}),
+    ('mobile preview', {'fields': 'id,title,content,like_count,comment_count', 'preview_len': '140'}),
+    ('id,title', {'fields': 'id,title'}),
+]
+
+
+def row_bytes(app, args):
+    """Bytes of column data one page's query reads, using the same projection the endpoint builds"""
+    with app.test_request_context(query_string=args):
+        _, query, _ = post_projection()
+        rows = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(PER_PAGE).all()
+    return sum(len(str(value)) for row in rows for value in row if value is not None)
+
+
+def run(post_count, content_len):
+    app = create_bench_app()
+    client = app.test_client()
+    with app.app_context():
+        seed_users(1)
+        seed_posts(post_count, content=('Lorem ipsum dolor sit amet. ' * (content_len // 28 + 1))[:content_len])
+
+        rows = []
+        baseline = None
+        for name, args in VARIANTS:
+            args = {**args, 'per_page': PER_PAGE, 'include_total': 'false', 'cursor': ''}
+            latencies, payload = [], 0
+            cursor = ''
+            for _ in range(post_count // PER_PAGE):
+                start = time.perf_counter()
+                response = client.get('/api/posts', query_string={**args, 'cursor': cursor})
+                latencies.append((time.perf_counter() - start) * 1000)
+                payload += len(response.get_data())
+                cursor = response.get_json()['next_cursor']
+                if not cursor:
+                    break
+            page_bytes = payload // len(latencies)
+            baseline = baseline or page_bytes
+            rows.append((name, page_bytes, f'{100 * (1 - page_bytes / baseline):.0f}%', row_bytes(app, args),
+                         f'{statistics.median(latencies):.2f}'))
+        print_table(['variant', 'response bytes/page', 'saved', 'db bytes/page', 'p50 ms/page'], rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--content-len', type=int, default=2000)
+    options = parser.parse_args()
+    run(options.posts, options.content_len)
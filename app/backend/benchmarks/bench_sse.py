@@ -0,0 +1,129 @@
+"""Load test for the SSE notification stream: idle subscribers and fan-out.
+
+Serves a bench app from a threaded Werkzeug server (one thread per open
+stream, as with gunicorn ``--threads``), opens ``--connections`` idle
+streams spread over ``--users`` users, and reports the connection count the
+hub sees, memory per idle subscriber (process RSS and Python heap via
+tracemalloc) and the latency until every stream has received one
+notification per user.
+
+    python -m benchmarks.bench_sse --connections 1000
+"""
+import argparse
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+
+from benchmarks.common import create_bench_app, seed_users, print_table
+from models.user import db
+from services.notifications import notify_users
+from services.realtime import notification_hub
+
+
+def rss_kb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def open_stream(port, token):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall(
+        f'GET /api/notifications/stream HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n'
+        f'Accept: text/event-stream\r\n\r\n'.encode()
+    )
+    return sock
+
+
+def read_until(sock, marker, timeout=30):
+    sock.settimeout(timeout)
+    data = b''
+    while marker not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError('stream closed')
+        data += chunk
+    return data
+
+
+def wait_for(predicate, timeout=60):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.05)
+
+
+def run(connections, users):
+    # A file database, so the server threads and this one share it
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = create_bench_app(f'sqlite:///{path}')
+    app.config['NOTIFICATION_STREAM_MAX_PER_USER'] = connections
+    # Short heartbeat: a server only notices a closed client when it next writes to it
+    app.config['NOTIFICATION_STREAM_HEARTBEAT'] = 1
+    app.config['NOTIFICATION_STREAM_MAX_DURATION'] = 3600
+    notification_hub.init_app(app)
+    with app.app_context():
+        seed_users(users)
+        tokens = [create_access_token(identity=str(user_id)) for user_id in range(1, users + 1)]
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    tracemalloc.start()
+    heap_before, rss_before = tracemalloc.get_traced_memory()[0], rss_kb()
+    start = time.perf_counter()
+    sockets = [open_stream(port, tokens[i % users]) for i in range(connections)]
+    for sock in sockets:
+        read_until(sock, b'retry:')
+    connect_s = time.perf_counter() - start
+    wait_for(lambda: notification_hub.stats()['subscribers'] == connections)
+    heap_after, rss_after = tracemalloc.get_traced_memory()[0], rss_kb()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    with app.app_context():
+        notify_users(list(range(1, users + 1)), 'Load test notification')
+        db.session.commit()
+    for sock in sockets:
+        read_until(sock, b'event: notification')
+    fanout_ms = (time.perf_counter() - start) * 1000
+
+    stats = notification_hub.stats()
+    for sock in sockets:
+        sock.close()
+    wait_for(lambda: notification_hub.stats()['subscribers'] == 0)
+    server.shutdown()
+    os.remove(path)
+
+    print_table(['metric', 'value'], [
+        ('open streams (hub subscribers)', stats['subscribers']),
+        ('users with streams', stats['users']),
+        ('connect time, all streams (s)', f'{connect_s:.2f}'),
+        ('RSS per idle subscriber (KiB)', f'{(rss_after - rss_before) / connections:.1f}'),
+        ('Python heap per idle subscriber (KiB)', f'{(heap_after - heap_before) / connections / 1024:.1f}'),
+        ('fan-out to every stream (ms)', f'{fanout_ms:.1f}'),
+        ('events delivered', stats['delivered']),
+        ('streams open after disconnect', notification_hub.stats()['subscribers']),
+    ])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=500)
+    parser.add_argument('--users', type=int, default=100)
+    options = parser.parse_args()
+    run(options.connections, options.users)
@@ -0,0 +1,108 @@
+"""Trending query latency: raw post_views scan vs the hourly rollup.
+
+Seeds ``--views`` rows (default 10M) spread over 14 days into a temporary
+SQLite file, builds the post_view_counts rollup from them, then times the
+old join/group-by over post_views against the top-K read of the rollup.
+
+    python -m benchmarks.bench_trending --views 10000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import create_bench_app, seed_users, seed_posts, print_table
+from models.user import db
+from models.post import Post, PostView
+from services.view_rollup import top_viewed_posts
+
+WINDOW = timedelta(days=7)
+
+
+def seed_views(total, post_count, days=14, batch_size=200000):
+    now = datetime.utcnow()
+    span = int(timedelta(days=days).total_seconds())
+    rng = random.Random(42)
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for start in range(0, total, batch_size):
+            rows = [
+                # Skew views towards low post ids so there is a clear top-K
+                (int(post_count * rng.random() ** 3) + 1, None, (now - timedelta(seconds=rng.randrange(span))).isoformat(sep=' '))
+                for _ in range(min(batch_size, total - start))
+            ]
+            cursor.executemany('INSERT INTO post_views (post_id, user_id, viewed_at) VALUES (?, ?, ?)', rows)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def build_rollup():
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO post_view_counts (post_id, bucket_start, count) "
+            "SELECT post_id, strftime('%Y-%m-%d %H:00:00.000000', viewed_at), COUNT(*) "
+            "FROM post_views GROUP BY 1, 2"
+        )
+
+
+def old_trending(since):
+    return [
+        post.id for post in
+        Post.query.join(PostView).filter(PostView.viewed_at >= since)
+        .group_by(Post.id).order_by(db.func.count(PostView.id).desc()).limit(5).all()
+    ]
+
+
+def new_trending(since):
+    return [post_id for post_id, _ in top_viewed_posts(since, limit=5)]
+
+
+def measure(fn, since, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(since)
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, samples
+
+
+def run():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--views', type=int, default=10_000_000)
+    parser.add_argument('--posts', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        app = create_bench_app(f'sqlite:///{path}')
+        with app.app_context():
+            started = time.perf_counter()
+            seed_users(1)
+            seed_posts(args.posts)
+            seed_views(args.views, args.posts)
+            build_rollup()
+            rollup_rows = db.session.execute(db.text('SELECT COUNT(*) FROM post_view_counts')).scalar()
+            print(f'Seeded {args.views:,} views / {rollup_rows:,} rollup rows in {time.perf_counter() - started:.1f}s')
+
+            since = datetime.utcnow() - WINDOW
+            old_ids, old_samples = measure(old_trending, since, args.repeat)
+            new_ids, new_samples = measure(new_trending, since, args.repeat)
+            print_table(['query', 'p50 ms', 'max ms'], [
+                ('post_views join/group-by', f'{statistics.median(old_samples):.1f}', f'{max(old_samples):.1f}'),
+                ('post_view_counts top-K', f'{statistics.median(new_samples):.1f}', f'{max(new_samples):.1f}'),
+            ])
+            # The rollup window starts at the hour boundary, so rankings can differ only at the edges
+            print(f'Top-5 overlap: {len(set(old_ids) & set(new_ids))}/5')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    run()
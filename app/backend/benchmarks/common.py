@@ -0,0 +1,112 @@
+"""Shared helpers for the backend benchmarks.
+
+Run benchmarks from app/backend, e.g. ``python -m benchmarks.bench_post_counts``.
+"""
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import event, insert
+
+from config import Config
+from models.user import db, User
+from models.post import Post, PostReaction, PostComment, PostView
+from api.auth import auth_bp
+from api.profile import profile_bp
+from api.posts import posts_bp
+from api.admin import admin_bp
+from services.counters import reconcile_post_counters, reconcile_user_post_counts
+from services.identity import jwt
+
+
+def create_bench_app(database_uri='sqlite://'):
+    """Build an app wired like main.py but against a throwaway database"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    jwt.init_app(app)
+    db.init_app(app)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(profile_bp)
+    app.register_blueprint(posts_bp)
+    app.register_blueprint(admin_bp)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements sent to the database inside the block"""
+    counter = {'queries': 0}
+
+    def on_execute(*args):
+        counter['queries'] += 1
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_execute)
+
+
+@contextmanager
+def timed(results, key):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        results[key] = (time.perf_counter() - start) * 1000
+
+
+def seed_users(count):
+    db.session.execute(insert(User), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x', 'is_admin': False}
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def seed_posts(count, user_count=1, tags='python,flask', content='Benchmark post body. ' * 20):
+    now = datetime.utcnow()
+    db.session.execute(insert(Post), [
+        {
+            'user_id': (i % user_count) + 1,
+            'title': f'Post {i}',
+            'content': content,
+            'tags': tags,
+            'visibility': 'public',
+            'created_at': now - timedelta(minutes=i),
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+    reconcile_user_post_counts()
+
+
+def seed_engagement(post_ids, per_post, user_count=1, batch_size=50000):
+    """Insert ``per_post`` reactions, comments and views for every post id"""
+    now = datetime.utcnow()
+    reactions, comments, views = [], [], []
+    for post_id in post_ids:
+        for i in range(per_post):
+            user_id = (i % user_count) + 1
+            if i < user_count:
+                reactions.append({'post_id': post_id, 'user_id': user_id, 'created_at': now})
+            comments.append({'post_id': post_id, 'user_id': user_id, 'content': 'Nice post', 'created_at': now})
+            views.append({'post_id': post_id, 'user_id': user_id, 'viewed_at': now - timedelta(seconds=i)})
+    for model, rows in ((PostReaction, reactions), (PostComment, comments), (PostView, views)):
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(insert(model), rows[start:start + batch_size])
+    db.session.commit()
+    # Rows were bulk-inserted behind the API's back, so bring the Post counters in line
+    reconcile_post_counters()
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,79 @@
+import click
+from datetime import timedelta
+from services.counters import reconcile_post_counters, reconcile_user_post_counts
+from services.view_rollup import compact_view_counts
+from services.search import get_search_backend
+from services.tags import reconcile_tag_counts
+from services.notifications import prune_notifications, reconcile_unread_counts
+from services.storage import media_store, reconcile_media_refs
+from services.image_jobs import image_pipeline
+from services.identity import role_revocations
+from models.user import db, User, normalize_identifier
+
+@click.command('reconcile-counters')
+@click.option('--batch-size', default=500, show_default=True, help='Posts recounted per transaction.')
+def reconcile_counters_command(batch_size):
+    """Recount likes, comments, views, posts per user, tag usage, unread notifications and media references and repair drifted counters"""
+    checked, repaired = reconcile_post_counters(batch_size=batch_size)
+    click.echo(f"✅ Checked {checked} posts, repaired {repaired}.")
+    click.echo(f"✅ Repaired {reconcile_user_post_counts()} user post counts.")
+    click.echo(f"✅ Repaired {reconcile_tag_counts()} tag counts.")
+    click.echo(f"✅ Repaired {reconcile_unread_counts()} unread notification counts.")
+    click.echo(f"✅ Repaired {reconcile_media_refs()} media reference counts.")
+
+@click.command('compact-view-counts')
+@click.option('--retention-days', default=7, show_default=True, help='Keep hourly view buckets this many days.')
+def compact_view_counts_command(retention_days):
+    """Drop expired hourly buckets from the post_view_counts rollup"""
+    removed = compact_view_counts(retention=timedelta(days=retention_days))
+    click.echo(f"✅ Removed {removed} expired view-count buckets.")
+
+@click.command('prune-notifications')
+@click.option('--retention-days', default=90, show_default=True, help='Keep read notifications this many days.')
+@click.option('--batch-size', default=1000, show_default=True, help='Notifications deleted per transaction.')
+def prune_notifications_command(retention_days, batch_size):
+    """Delete old read notifications in batches; unread ones are kept"""
+    removed = prune_notifications(retention=timedelta(days=retention_days), batch_size=batch_size)
+    click.echo(f"✅ Removed {removed} read notifications older than {retention_days} days.")
+
+@click.command('collect-media')
+def collect_media_command():
+    """Delete stored media blobs that no post or avatar references any more"""
+    collected = media_store.collect()
+    click.echo(f"✅ Deleted {collected} unreferenced media blobs ({media_store.backend.name}).")
+
+@click.command('expire-image-jobs')
+def expire_image_jobs_command():
+    """Fail profile image jobs that have been queued for longer than IMAGE_JOB_TIMEOUT"""
+    expired = image_pipeline.expire()
+    click.echo(f"✅ Failed {expired} stale image jobs.")
+
+@click.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Create the post full-text index if missing and rebuild it from the posts table"""
+    backend = get_search_backend()
+    backend.setup()
+    backend.rebuild()
+    click.echo(f"✅ Rebuilt post search index ({backend.name}).")
+
+@click.command('set-admin')
+@click.argument('username')
+@click.option('--revoke', is_flag=True, help='Remove admin instead of granting it.')
+def set_admin_command(username, revoke):
+    """Grant or remove admin for a user; their existing tokens pick the change up without re-login"""
+    user = User.query.filter_by(username_lower=normalize_identifier(username)).first()
+    if user is None:
+        raise click.ClickException(f'No user named {username}.')
+    user.is_admin = not revoke
+    role_revocations.revoke(user)
+    db.session.commit()
+    click.echo(f"✅ {user.username} is {'no longer' if revoke else 'now'} an admin.")
+
+def register_commands(app):
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(compact_view_counts_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(prune_notifications_command)
+    app.cli.add_command(collect_media_command)
+    app.cli.add_command(expire_image_jobs_command)
+    app.cli.add_command(set_admin_command)
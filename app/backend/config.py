@@ -16,6 +16,125 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     
+    # Password hashing (services/passwords.py): Werkzeug method string with its parameters, e.g.
+    # 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'; older hashes are upgraded on the next login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_SALT_LENGTH = 16
+    # KDF pool: 'thread', 'process' or 'inline'; at most WORKERS run and MAX_QUEUE wait, the rest get 429
+    PASSWORD_HASH_BACKEND = os.environ.get('PASSWORD_HASH_BACKEND', 'thread')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 16))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 5))  # seconds waited before a 503
+    PASSWORD_HASH_RETRY_AFTER = 1  # seconds, sent with 429/503
+
+    # Login attempt limits (services/ratelimit.py) as (attempts, seconds), per process; behind a
+    # proxy, wrap the app in werkzeug's ProxyFix so the per-IP bucket sees client addresses
+    LOGIN_RATE_LIMIT_ENABLED = os.environ.get('LOGIN_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    LOGIN_RATE_PER_IDENTIFIER = (5, 60)
+    LOGIN_RATE_PER_IP = (30, 60)
+    LOGIN_RATE_LIMIT_MAX_KEYS = 10000
+
+    # Per-process cache of hot users rows behind the current-user resolver (services/identity.py)
+    USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', 'true').lower() == 'true'
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 10))  # seconds; bounds staleness across workers
+    USER_CACHE_MAX_ENTRIES = 10000
+
+    # Demotions and promotions override older tokens' roles claim (services/identity.py); persisted
+    # rows let other workers pick changes up within ROLE_REVOCATIONS_REFRESH seconds
+    ROLE_REVOCATIONS_PERSIST = os.environ.get('ROLE_REVOCATIONS_PERSIST', 'true').lower() == 'true'
+    ROLE_REVOCATIONS_REFRESH = float(os.environ.get('ROLE_REVOCATIONS_REFRESH', 2))
+
+    # Hard cap on per_page for post listings
+    POSTS_MAX_PER_PAGE = int(os.environ.get('POSTS_MAX_PER_PAGE', 100))
+    # Same for the admin user listing
+    ADMIN_USERS_MAX_PER_PAGE = int(os.environ.get('ADMIN_USERS_MAX_PER_PAGE', 200))
+
+    # Comment threads: page size cap and max subtree depth per request
+    COMMENTS_MAX_PER_PAGE = 50
+    COMMENTS_MAX_DEPTH = 10
+
+    # Post view write-behind buffer (services/view_buffer.py)
+    VIEW_BUFFER_MAX_SIZE = int(os.environ.get('VIEW_BUFFER_MAX_SIZE', 10000))
+    VIEW_BUFFER_FLUSH_SIZE = int(os.environ.get('VIEW_BUFFER_FLUSH_SIZE', 500))
+    VIEW_BUFFER_FLUSH_INTERVAL = float(os.environ.get('VIEW_BUFFER_FLUSH_INTERVAL', 2.0))  # seconds
+    VIEW_BUFFER_FULL_POLICY = os.environ.get('VIEW_BUFFER_FULL_POLICY', 'drop')  # 'drop' or 'block'
+    VIEW_BUFFER_BLOCK_TIMEOUT = float(os.environ.get('VIEW_BUFFER_BLOCK_TIMEOUT', 0.05))  # seconds
+
+    # Trending leaderboard (services/trending.py)
+    TRENDING_REFRESH_INTERVAL = float(os.environ.get('TRENDING_REFRESH_INTERVAL', 60))  # seconds
+    TRENDING_TTL = float(os.environ.get('TRENDING_TTL', 300))  # seconds before a stale board wakes the refresher early
+    TRENDING_WINDOW_DAYS = 7
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+    TRENDING_MAX_K = int(os.environ.get('TRENDING_MAX_K', 50))
+    TRENDING_WEIGHTS = {'views': 1.0, 'likes': 3.0, 'comments': 5.0}
+
+    # Background task queue (services/tasks.py): 'thread', 'database' or 'inline'
+    TASK_QUEUE_BACKEND = os.environ.get('TASK_QUEUE_BACKEND', 'thread')
+    TASK_QUEUE_WORKERS = int(os.environ.get('TASK_QUEUE_WORKERS', 4))
+    TASK_QUEUE_POLL_INTERVAL = float(os.environ.get('TASK_QUEUE_POLL_INTERVAL', 1.0))  # seconds
+    TASK_QUEUE_BATCH_SIZE = 20
+    TASK_QUEUE_MAX_ATTEMPTS = 3
+
+    # Notification inbox page size cap and ids per bulk read/unread request
+    NOTIFICATIONS_MAX_PER_PAGE = 50
+    NOTIFICATIONS_MAX_BULK_IDS = 500
+
+    # Server-Sent Events notification stream (services/realtime.py); run gunicorn with
+    # gevent or threaded workers (-k gevent / --threads N), each open stream holds one
+    NOTIFICATION_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+    NOTIFICATION_STREAM_MAX_DURATION = 300  # seconds before the stream closes and the client reconnects
+    NOTIFICATION_STREAM_RETRY_MS = 3000
+    NOTIFICATION_STREAM_TOKEN_TTL = 60  # seconds a stream token can open (not keep open) a stream
+    NOTIFICATION_STREAM_MAX_PER_USER = 5
+    NOTIFICATION_STREAM_BACKLOG = 100  # queued events per stream, and max replayed on reconnect
+
+    # Uploads (services/uploads.py) are streamed to UPLOAD_TMP_FOLDER with per-route size limits;
+    # MAX_CONTENT_LENGTH caps every request body, routes without a limit included
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # bytes
+    UPLOAD_TMP_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads', 'tmp')
+    UPLOAD_FORM_OVERHEAD = 64 * 1024  # bytes of non-file form fields allowed on top of a route's file limit
+
+    # Content-addressed media storage (services/storage.py): 'local' or 's3'
+    MEDIA_STORAGE_BACKEND = os.environ.get('MEDIA_STORAGE_BACKEND', 'local')
+    MEDIA_STORAGE_ROOT = os.path.join(os.path.dirname(__file__), 'uploads', 'media')  # served by /uploads/<path>
+    MEDIA_STORAGE_URL = '/uploads/media'
+    MEDIA_S3_BUCKET = os.environ.get('MEDIA_S3_BUCKET')
+    MEDIA_S3_PREFIX = os.environ.get('MEDIA_S3_PREFIX', 'media/')
+    MEDIA_S3_ENDPOINT_URL = os.environ.get('MEDIA_S3_ENDPOINT_URL')  # MinIO or a moto server; unset for AWS
+    MEDIA_S3_PUBLIC_URL = os.environ.get('MEDIA_S3_PUBLIC_URL')  # CDN in front of the bucket, if any
+
+    # Profile image processing (services/image_jobs.py): 'process' pool or 'inline'
+    IMAGE_PIPELINE_BACKEND = os.environ.get('IMAGE_PIPELINE_BACKEND', 'process')
+    IMAGE_PIPELINE_WORKERS = int(os.environ.get('IMAGE_PIPELINE_WORKERS', 2))
+    IMAGE_PIPELINE_START_METHOD = 'spawn'  # don't fork a process that is running threads
+    IMAGE_JOB_TIMEOUT = int(os.environ.get('IMAGE_JOB_TIMEOUT', 120))  # seconds queued before a job is failed
+    # Bounding boxes rendered from each upload; 'full' and 'thumbnail' back image_url/thumbnail_url
+    IMAGE_RENDITIONS = {
+        'full': (1024, 1024),
+        'mid': (480, 480),
+        'thumbnail_2x': (300, 300),
+        'thumbnail': (150, 150),
+    }
+    # Encoded for every rendition when the Pillow build supports them (JPEG always)
+    IMAGE_FORMATS = ['jpeg', 'webp', 'avif']
+
+    # Anonymous GET /api/posts response cache (services/cache.py)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 30))  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL')  # optional shared backend
+
+    # Compression and ETag/304 layer for GET responses (services/responses.py)
+    RESPONSE_LAYER_ENABLED = os.environ.get('RESPONSE_LAYER_ENABLED', 'true').lower() == 'true'
+    RESPONSE_COMPRESSION_ENABLED = os.environ.get('RESPONSE_COMPRESSION_ENABLED', 'true').lower() == 'true'
+    RESPONSE_COMPRESSION_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024))  # bytes
+    RESPONSE_GZIP_LEVEL = 6
+    RESPONSE_BROTLI_QUALITY = 5  # used when the brotli package is installed
+    RESPONSE_ETAGS_ENABLED = True
+
+    # Use orjson for jsonify() when it is installed (services/serializers.py)
+    JSON_FAST_ENCODER = os.environ.get('JSON_FAST_ENCODER', 'true').lower() == 'true'
+
     # CORS
     CORS_HEADERS = 'Content-Type' 
     # 
\ No newline at end of file
@@ -2,7 +2,6 @@
 
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager
 from config import Config
 from dotenv import load_dotenv
 from flask_migrate import Migrate
@@ -12,6 +11,21 @@ from models.user import db, User
 from api.auth import auth_bp
 from api.profile import profile_bp
 from api.posts import posts_bp
+from api.admin import admin_bp
+from commands import register_commands
+from services.view_buffer import view_buffer
+from services.trending import trending_leaderboard
+from services.tasks import task_queue
+from services.cache import response_cache
+from services.responses import response_layer
+from services.realtime import notification_hub
+from services.image_jobs import image_pipeline
+from services.serializers import init_json_provider
+from services.uploads import init_uploads
+from services.storage import media_store
+from services.passwords import password_hasher
+from services.ratelimit import login_rate_limiter
+from services.identity import jwt, role_revocations, user_cache
 
 
 load_dotenv()
@@ -24,21 +38,50 @@ load_dotenv()
 app = Flask(__name__)
 app.config.from_object(Config)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'  # Force SQLite, ignore env
+init_json_provider(app)
 
 # Initialize extensions
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173,http://127.0.0.1:5173,https://your-frontend-url.onrender.com').split(',')
 CORS(app,
      origins=ALLOWED_ORIGINS,
-     methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+     methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
      allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
+     expose_headers=['X-Page', 'X-Has-More', 'X-Next-Cursor'],  # comment and notification paging
      supports_credentials=True,
      max_age=3600)
-JWTManager(app)
+jwt.init_app(app)
 
 # Initialize database
 db.init_app(app)
 migrate = Migrate(app, db)
 
+# Buffer post views and write them in bulk
+view_buffer.init_app(app)
+# Precompute trending leaderboards in the background
+trending_leaderboard.init_app(app)
+# Run notification fan-out and other deferred work in the background
+task_queue.init_app(app)
+# Cache anonymous post listings, invalidated by post writes
+response_cache.init_app(app)
+# Compress large GET responses and answer conditional GETs with 304s
+response_layer.init_app(app)
+# Push new notifications to connected SSE streams
+notification_hub.init_app(app)
+# Resize and encode uploaded profile images in a process pool
+image_pipeline.init_app(app)
+# Stream uploads to disk and reject oversize bodies before reading them
+init_uploads(app)
+# Store post media and profile images by content hash, shared and reference-counted
+media_store.init_app(app)
+# Hash passwords in a bounded pool, refusing work beyond its queue
+password_hasher.init_app(app)
+# Refuse login bursts per account and per client before any hashing
+login_rate_limiter.init_app(app)
+# Serve the current user's row from a short-TTL cache, invalidated on profile writes
+user_cache.init_app(app)
+# Role changes override the roles claim of tokens issued before them
+role_revocations.init_app(app)
+
 # Serve uploaded files
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
@@ -55,6 +98,10 @@ def setup_database():
 app.register_blueprint(auth_bp)
 app.register_blueprint(profile_bp)
 app.register_blueprint(posts_bp)
+app.register_blueprint(admin_bp)
+
+# Register CLI commands (flask reconcile-counters, ...)
+register_commands(app)
 
 # Create a function to initialize the app
 def create_app():
@@ -0,0 +1,45 @@
+"""Add notification inbox index and per-user unread counter
+
+Revision ID: 0b7d4e2a91c3
+Revises: f5c0a7e39d21
+Create Date: 2026-10-17 18:21:05.402816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7d4e2a91c3'
+down_revision = 'f5c0a7e39d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_notification_count', sa.Integer(), server_default='0', nullable=False))
+
+    notifications = sa.table('notifications', sa.column('is_read', sa.Boolean), sa.column('created_at', sa.DateTime))
+    # The inbox seeks per read state, so legacy NULLs must become unread
+    op.execute(notifications.update().where(notifications.c.is_read.is_(None)).values(is_read=False))
+    if op.get_bind().dialect.name == 'sqlite':
+        # func.now() stored second precision; pad to the microsecond format cursors compare against
+        op.execute("UPDATE notifications SET created_at = created_at || '.000000' WHERE length(created_at) = 19")
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_id_is_read_created_at', ['user_id', 'is_read', 'created_at', 'id'], unique=False)
+
+    # Backfill; `flask reconcile-counters` repairs any later drift
+    op.execute(
+        "UPDATE users SET unread_notification_count = "
+        "(SELECT COUNT(*) FROM notifications WHERE notifications.user_id = users.id AND notifications.is_read = false)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_id_is_read_created_at')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_notification_count')
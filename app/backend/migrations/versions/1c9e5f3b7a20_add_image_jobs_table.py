@@ -0,0 +1,41 @@
+"""Add image_jobs table for background profile image processing
+
+Revision ID: 1c9e5f3b7a20
+Revises: 0b7d4e2a91c3
+Create Date: 2026-10-17 19:40:12.551904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c9e5f3b7a20'
+down_revision = '0b7d4e2a91c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('image_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('image_url', sa.String(length=256), nullable=True),
+    sa.Column('thumbnail_url', sa.String(length=256), nullable=True),
+    sa.Column('timings', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_image_jobs_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_image_jobs_user_id'))
+
+    op.drop_table('image_jobs')
@@ -0,0 +1,26 @@
+"""Add renditions to image_jobs
+
+Revision ID: 2d4a8c6e1f57
+Revises: 1c9e5f3b7a20
+Create Date: 2026-10-17 20:32:47.190254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d4a8c6e1f57'
+down_revision = '1c9e5f3b7a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('renditions', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.drop_column('renditions')
@@ -0,0 +1,35 @@
+"""Add denormalized engagement counters to posts
+
+Revision ID: 3b8d2f61a9c4
+Revises: ec5f4cd1dc2f
+Create Date: 2026-10-17 09:12:44.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8d2f61a9c4'
+down_revision = 'ec5f4cd1dc2f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('view_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the engagement tables; `flask reconcile-counters` repairs any later drift
+    op.execute("UPDATE posts SET like_count = (SELECT COUNT(*) FROM post_reactions WHERE post_reactions.post_id = posts.id)")
+    op.execute("UPDATE posts SET comment_count = (SELECT COUNT(*) FROM post_comments WHERE post_comments.post_id = posts.id)")
+    op.execute("UPDATE posts SET view_count = (SELECT COUNT(*) FROM post_views WHERE post_views.post_id = posts.id)")
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('view_count')
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('like_count')
@@ -0,0 +1,48 @@
+"""Add media_blobs for content-addressed media and the references to it
+
+Revision ID: 3e6f0a9c4b82
+Revises: 2d4a8c6e1f57
+Create Date: 2026-10-17 22:05:31.406218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e6f0a9c4b82'
+down_revision = '2d4a8c6e1f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_blobs',
+    sa.Column('key', sa.String(length=160), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('content_type', sa.String(length=64), nullable=True),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('media_key', sa.String(length=160), nullable=True))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_job_id', sa.String(length=32), nullable=True))
+
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('media_keys', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('image_jobs', schema=None) as batch_op:
+        batch_op.drop_column('media_keys')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('image_job_id')
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('media_key')
+
+    op.drop_table('media_blobs')
@@ -0,0 +1,88 @@
+"""Add case-folded username/email columns with unique indexes for login lookups
+
+Revision ID: 4a7c1e5d9b36
+Revises: 3e6f0a9c4b82
+Create Date: 2026-10-17 23:12:44.918305
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.user import normalize_identifier
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7c1e5d9b36'
+down_revision = '3e6f0a9c4b82'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+log = logging.getLogger('alembic.runtime.migration')
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('username_lower', sa.String(length=80), nullable=True))
+        batch_op.add_column(sa.Column('email_lower', sa.String(length=120), nullable=True))
+
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('username', sa.String),
+                     sa.column('email', sa.String), sa.column('username_lower', sa.String),
+                     sa.column('email_lower', sa.String))
+    bind = op.get_bind()
+
+    # Backfill with the same normalization the app uses; SQL lower()/trim() differ from str.lower()/strip()
+    backfill = users.update().where(users.c.id == sa.bindparam('b_id')).values(
+        username_lower=sa.bindparam('b_username_lower'), email_lower=sa.bindparam('b_email_lower'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(users.c.id, users.c.username, users.c.email)
+            .where(users.c.id > last_id).order_by(users.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(backfill, [
+            {'b_id': id, 'b_username_lower': normalize_identifier(username),
+             'b_email_lower': normalize_identifier(email)}
+            for id, username, email in rows
+        ])
+        last_id = rows[-1].id
+
+    # Accounts differing only by case can't both keep their identifier; refuse rather than pick one
+    for column in ('username_lower', 'email_lower'):
+        clashes = bind.execute(
+            sa.select(users.c[column]).group_by(users.c[column]).having(sa.func.count() > 1)
+        ).scalars().all()
+        if clashes:
+            raise RuntimeError(f'Rename users sharing a case-insensitive {column[:-6]} before upgrading: {clashes[:20]}')
+
+    # Login treats identifiers containing '@' as emails, so such usernames could never sign in
+    for id, username in bind.execute(
+        sa.select(users.c.id, users.c.username).where(users.c.username.contains('@')).order_by(users.c.id)
+    ).all():
+        renamed = username.replace('@', '_')
+        if bind.execute(sa.select(users.c.id).where(
+                users.c.username_lower == normalize_identifier(renamed))).first() is not None:
+            suffix = f'_{id}'
+            renamed = renamed[:80 - len(suffix)] + suffix
+        bind.execute(users.update().where(users.c.id == id).values(
+            username=renamed, username_lower=normalize_identifier(renamed)))
+        log.warning('Renamed user %d from %r to %r: usernames cannot contain @', id, username, renamed)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('username_lower', existing_type=sa.String(length=80), nullable=False)
+        batch_op.alter_column('email_lower', existing_type=sa.String(length=120), nullable=False)
+        batch_op.create_index(batch_op.f('ix_users_username_lower'), ['username_lower'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_email_lower'), ['email_lower'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email_lower'))
+        batch_op.drop_index(batch_op.f('ix_users_username_lower'))
+        batch_op.drop_column('email_lower')
+        batch_op.drop_column('username_lower')
@@ -0,0 +1,35 @@
+"""Add role_revocations table overriding the roles claim of tokens issued before a role change
+
+Revision ID: 5b2e9d7c3f18
+Revises: 4a7c1e5d9b36
+Create Date: 2026-10-17 23:58:06.274119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e9d7c3f18'
+down_revision = '4a7c1e5d9b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('role_revocations',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('roles', sa.String(length=255), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    with op.batch_alter_table('role_revocations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_role_revocations_revoked_at'), ['revoked_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('role_revocations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_role_revocations_revoked_at'))
+
+    op.drop_table('role_revocations')
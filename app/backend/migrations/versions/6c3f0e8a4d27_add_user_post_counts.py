@@ -0,0 +1,38 @@
+"""Add users.post_count and indexes for the admin user listing's sorts and filters
+
+Revision ID: 6c3f0e8a4d27
+Revises: 5b2e9d7c3f18
+Create Date: 2026-10-18 00:41:19.530862
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c3f0e8a4d27'
+down_revision = '5b2e9d7c3f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('post_count', sa.Integer))
+    posts = sa.table('posts', sa.column('user_id', sa.Integer))
+    op.execute(users.update().values(
+        post_count=sa.select(sa.func.count()).where(posts.c.user_id == users.c.id).scalar_subquery()
+    ))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_post_count_id', ['post_count', 'id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_is_admin'), ['is_admin'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_is_admin'))
+        batch_op.drop_index('ix_users_post_count_id')
+        batch_op.drop_column('post_count')
@@ -0,0 +1,55 @@
+"""Add hourly post_view_counts rollup
+
+Revision ID: 7e1c5a90d2b3
+Revises: 3b8d2f61a9c4
+Create Date: 2026-10-17 10:41:07.582911
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1c5a90d2b3'
+down_revision = '3b8d2f61a9c4'
+branch_labels = None
+depends_on = None
+
+HOUR_BUCKET = {
+    'sqlite': "strftime('%Y-%m-%d %H:00:00.000000', viewed_at)",
+    'mysql': "DATE_FORMAT(viewed_at, '%Y-%m-%d %H:00:00')",
+    'postgresql': "date_trunc('hour', viewed_at)",
+}
+RECENT_CUTOFF = {
+    'sqlite': "datetime('now', '-8 days')",
+    'mysql': "NOW() - INTERVAL 8 DAY",
+    'postgresql': "NOW() - INTERVAL '8 days'",
+}
+
+
+def upgrade():
+    op.create_table('post_view_counts',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.PrimaryKeyConstraint('post_id', 'bucket_start')
+    )
+    with op.batch_alter_table('post_view_counts', schema=None) as batch_op:
+        batch_op.create_index('ix_post_view_counts_bucket_start', ['bucket_start', 'post_id', 'count'], unique=False)
+
+    # Backfill the trending window (plus a day of slack) from the raw views
+    dialect = op.get_bind().dialect.name
+    bucket, cutoff = HOUR_BUCKET[dialect], RECENT_CUTOFF[dialect]
+    op.execute(
+        f"INSERT INTO post_view_counts (post_id, bucket_start, count) "
+        f"SELECT post_id, {bucket}, COUNT(*) FROM post_views "
+        f"WHERE viewed_at >= {cutoff} GROUP BY post_id, {bucket}"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('post_view_counts', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_view_counts_bucket_start')
+
+    op.drop_table('post_view_counts')
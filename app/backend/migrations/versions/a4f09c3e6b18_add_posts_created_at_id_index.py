@@ -0,0 +1,26 @@
+"""Add (created_at, id) index for keyset pagination of posts
+
+Revision ID: a4f09c3e6b18
+Revises: 7e1c5a90d2b3
+Create Date: 2026-10-17 11:58:31.204476
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f09c3e6b18'
+down_revision = '7e1c5a90d2b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index('ix_posts_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_created_at_id')
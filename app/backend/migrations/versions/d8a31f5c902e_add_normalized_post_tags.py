@@ -0,0 +1,73 @@
+"""Add tags and post_tags tables, backfilled from posts.tags
+
+Revision ID: d8a31f5c902e
+Revises: c62e8b1d47f5
+Create Date: 2026-10-17 14:47:55.316027
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a31f5c902e'
+down_revision = 'c62e8b1d47f5'
+branch_labels = None
+depends_on = None
+
+
+def parse_tags(raw):
+    # Same normalization as services/tags.parse_tags
+    names = []
+    for part in (raw or '').split(','):
+        name = part.strip().lstrip('#').lower()[:64]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    tags = op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('post_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tags_post_count'), ['post_count'], unique=False)
+
+    post_tags = op.create_table('post_tags',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ),
+    sa.PrimaryKeyConstraint('post_id', 'tag_id')
+    )
+    with op.batch_alter_table('post_tags', schema=None) as batch_op:
+        batch_op.create_index('ix_post_tags_tag_id_post_id', ['tag_id', 'post_id'], unique=False)
+
+    # Backfill from the comma-separated posts.tags column. Ids come from the database, so
+    # PostgreSQL's tags_id_seq stays ahead of them
+    bind = op.get_bind()
+    tagged = {}
+    for post_id, raw in bind.execute(sa.text('SELECT id, tags FROM posts WHERE tags IS NOT NULL')):
+        for name in parse_tags(raw):
+            tagged.setdefault(name, []).append(post_id)
+    if tagged:
+        op.bulk_insert(tags, [{'name': name, 'post_count': len(post_ids)} for name, post_ids in tagged.items()])
+        tag_ids = dict(bind.execute(sa.text('SELECT name, id FROM tags')).all())
+        op.bulk_insert(post_tags, [
+            {'post_id': post_id, 'tag_id': tag_ids[name]} for name, post_ids in tagged.items() for post_id in post_ids
+        ])
+
+
+def downgrade():
+    with op.batch_alter_table('post_tags', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_tags_tag_id_post_id')
+
+    op.drop_table('post_tags')
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tags_post_count'))
+
+    op.drop_table('tags')
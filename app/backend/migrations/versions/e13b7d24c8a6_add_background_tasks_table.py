@@ -0,0 +1,39 @@
+"""Add background_tasks table for the database-backed task queue
+
+Revision ID: e13b7d24c8a6
+Revises: d8a31f5c902e
+Create Date: 2026-10-17 15:33:09.771842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e13b7d24c8a6'
+down_revision = 'd8a31f5c902e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('background_tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('background_tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_background_tasks_status_run_after', ['status', 'run_after'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('background_tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_background_tasks_status_run_after')
+
+    op.drop_table('background_tasks')
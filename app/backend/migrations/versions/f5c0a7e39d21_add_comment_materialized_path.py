@@ -0,0 +1,64 @@
+"""Add materialized path, depth and reply_count to post_comments
+
+Revision ID: f5c0a7e39d21
+Revises: e13b7d24c8a6
+Create Date: 2026-10-17 16:52:40.118307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c0a7e39d21'
+down_revision = 'e13b7d24c8a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post_comments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('path', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_post_comments_post_id_depth_path', ['post_id', 'depth', 'path'], unique=False)
+        batch_op.create_index('ix_post_comments_post_id_path', ['post_id', 'path'], unique=False)
+
+    # Backfill paths parent-first (ids increase down a thread); replies whose
+    # parent is missing or on another post become top-level comments
+    bind = op.get_bind()
+    comments = sa.table('post_comments',
+        sa.column('id', sa.Integer), sa.column('post_id', sa.Integer), sa.column('parent_id', sa.Integer),
+        sa.column('path', sa.String), sa.column('depth', sa.Integer), sa.column('reply_count', sa.Integer))
+    known, reply_counts, updates = {}, {}, []
+    for comment_id, post_id, parent_id in bind.execute(
+            sa.select(comments.c.id, comments.c.post_id, comments.c.parent_id).order_by(comments.c.id)):
+        parent = known.get(parent_id)
+        if parent is None or parent[0] != post_id:
+            parent_id, path, depth = None, '', -1
+        else:
+            path, depth = parent[1], parent[2]
+            reply_counts[parent_id] = reply_counts.get(parent_id, 0) + 1
+        path, depth = path + f'{comment_id:010d}/', depth + 1
+        known[comment_id] = (post_id, path, depth)
+        updates.append({'b_id': comment_id, 'b_parent_id': parent_id, 'b_path': path, 'b_depth': depth})
+    if updates:
+        bind.execute(
+            comments.update().where(comments.c.id == sa.bindparam('b_id'))
+            .values(parent_id=sa.bindparam('b_parent_id'), path=sa.bindparam('b_path'), depth=sa.bindparam('b_depth')),
+            updates
+        )
+    if reply_counts:
+        bind.execute(
+            comments.update().where(comments.c.id == sa.bindparam('b_id')).values(reply_count=sa.bindparam('b_count')),
+            [{'b_id': comment_id, 'b_count': count} for comment_id, count in reply_counts.items()]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('post_comments', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_comments_post_id_path')
+        batch_op.drop_index('ix_post_comments_post_id_depth_path')
+        batch_op.drop_column('reply_count')
+        batch_op.drop_column('depth')
+        batch_op.drop_column('path')
@@ -0,0 +1,11 @@
+from datetime import datetime
+from models.user import db
+
+class MediaBlob(db.Model):
+    """A stored media object, addressed by content hash; ``ref_count`` is kept by services/storage.py"""
+    __tablename__ = 'media_blobs'
+    key = db.Column(db.String(160), primary_key=True)  # '<sha[:2]>/<sha[2:4]>/<sha256>.<ext>'
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(64), nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
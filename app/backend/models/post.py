@@ -8,24 +8,48 @@ class Post(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
     media_url = db.Column(db.String(255), nullable=True)
+    media_key = db.Column(db.String(160), nullable=True)  # MediaBlob holding a reference (see services/storage.py)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     title = db.Column(db.String(120), nullable=False)
     tags = db.Column(db.String(255), nullable=True, index=True)
     visibility = db.Column(db.String(10), default='public', index=True)
     category = db.Column(db.String(64), nullable=True, index=True)
+    # Denormalized engagement counters, maintained with atomic UPDATEs (see services/counters.py)
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    view_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     # Add metadata fields as needed for future search/indexing
     # e.g., tags, is_public, etc.
 
     user = db.relationship('User', backref=db.backref('posts', lazy=True))
 
-    def __init__(self, user_id, content, media_url=None, title='', tags='', visibility='public'):
+    # Keyset pagination seeks on (created_at, id); see services/pagination.py
+    __table_args__ = (db.Index('ix_posts_created_at_id', 'created_at', 'id'),)
+
+    def __init__(self, user_id, content, media_url=None, title='', tags='', visibility='public', media_key=None):
         self.user_id = user_id
         self.content = content
         self.media_url = media_url
+        self.media_key = media_key
         self.title = title
         self.tags = tags
         self.visibility = visibility
 
+# Normalized post <-> tag association; (tag_id, post_id) index serves tag lookups
+post_tags = db.Table(
+    'post_tags',
+    db.Column('post_id', db.Integer, db.ForeignKey('posts.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    db.Index('ix_post_tags_tag_id_post_id', 'tag_id', 'post_id'),
+)
+
+class Tag(db.Model):
+    __tablename__ = 'tags'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), unique=True, nullable=False)
+    # Number of posts carrying the tag, maintained by services/tags.py
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+
 class PostReaction(db.Model):
     __tablename__ = 'post_reactions'
     id = db.Column(db.Integer, primary_key=True)
@@ -46,11 +70,21 @@ class PostComment(db.Model):
     content = db.Column(db.Text, nullable=False)
     parent_id = db.Column(db.Integer, db.ForeignKey('post_comments.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Materialized path of zero-padded ancestor ids ('0000000012/0000000034/'), see services/comments.py
+    path = db.Column(db.String(255), nullable=True)
+    depth = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    reply_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # direct replies
 
     user = db.relationship('User', backref=db.backref('comments', lazy=True))
     post = db.relationship('Post', backref=db.backref('comments', lazy=True))
     replies = db.relationship('PostComment', backref=db.backref('parent', remote_side=[id]), lazy=True)
 
+    # Pages of one level come from (post_id, depth, path); subtrees are one (post_id, path) range scan
+    __table_args__ = (
+        db.Index('ix_post_comments_post_id_depth_path', 'post_id', 'depth', 'path'),
+        db.Index('ix_post_comments_post_id_path', 'post_id', 'path'),
+    )
+
     def __init__(self, user_id, post_id, content, parent_id=None):
         self.user_id = user_id
         self.post_id = post_id
@@ -65,3 +99,12 @@ class PostView(db.Model):
     viewed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     post = db.relationship('Post', backref=db.backref('views', lazy=True))
+
+class PostViewCount(db.Model):
+    """Hourly rollup of post views, maintained as views are flushed (see services/view_rollup.py)"""
+    __tablename__ = 'post_view_counts'
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.Index('ix_post_view_counts_bucket_start', 'bucket_start', 'post_id', 'count'),)
@@ -0,0 +1,31 @@
+from datetime import datetime
+from models.user import db
+
+class BackgroundTask(db.Model):
+    """Queued work for the database-backed task queue (see services/tasks.py)"""
+    __tablename__ = 'background_tasks'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON-encoded keyword arguments
+    status = db.Column(db.String(16), nullable=False, default='pending')  # pending, running, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('ix_background_tasks_status_run_after', 'status', 'run_after'),)
+
+class ImageJob(db.Model):
+    """A profile image upload being processed in the image pool (see services/image_jobs.py)"""
+    __tablename__ = 'image_jobs'
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, handed to the client
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    status = db.Column(db.String(16), nullable=False, default='queued')  # queued, done, failed
+    image_url = db.Column(db.String(256), nullable=True)
+    thumbnail_url = db.Column(db.String(256), nullable=True)
+    renditions = db.Column(db.Text, nullable=True)  # JSON: rendition -> format -> URL
+    media_keys = db.Column(db.Text, nullable=True)  # JSON list of MediaBlob keys referenced by the renditions
+    timings = db.Column(db.Text, nullable=True)  # JSON: milliseconds per stage
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
@@ -1,13 +1,26 @@
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+def normalize_identifier(value):
+    """Case-folded form of a username or email, as stored in the ``*_lower`` columns"""
+    return value.strip().lower() if value is not None else None
+
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    # Case-folded copies for login lookups and case-insensitive uniqueness; kept in sync by
+    # the validators below, and by the defaults for Core inserts that bypass the ORM
+    username_lower = db.Column(db.String(80), unique=True, index=True, nullable=False,
+                               default=lambda ctx: normalize_identifier(ctx.get_current_parameters()['username']))
+    email_lower = db.Column(db.String(120), unique=True, index=True, nullable=False,
+                            default=lambda ctx: normalize_identifier(ctx.get_current_parameters()['email']))
     password_hash = db.Column(db.String(512), nullable=False)
     bio = db.Column(db.Text, default="")
     skills = db.Column(db.Text, default="")  # Comma-separated skills
@@ -15,7 +28,15 @@ class User(db.Model):
     education = db.Column(db.Text, default="")
     contact_info = db.Column(db.Text, default="")
     image_url = db.Column(db.String(256), default="")
-    is_admin = db.Column(db.Boolean, default=False)
+    image_job_id = db.Column(db.String(32), nullable=True)  # ImageJob whose renditions back image_url
+    is_admin = db.Column(db.Boolean, default=False, index=True)
+    # Maintained by services/notifications.py so the unread badge is a primary-key read
+    unread_notification_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Maintained by services/counters.py on post create/delete, so the admin listing sorts and filters on it
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Admin listing sorted by post count; id breaks ties for cursors
+    __table_args__ = (db.Index('ix_users_post_count_id', 'post_count', 'id'),)
 
     def __init__(self, username, email, password_hash=None, bio="", skills="", work_experience="", education="", contact_info="", image_url="", is_admin=False):
         self.username = username
@@ -30,6 +51,11 @@ class User(db.Model):
         self.image_url = image_url
         self.is_admin = is_admin
 
+    @validates('username', 'email')
+    def _sync_lower(self, key, value):
+        setattr(self, f'{key}_lower', normalize_identifier(value))
+        return value
+
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
@@ -48,4 +74,15 @@ class Notification(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     message = db.Column(db.String(255), nullable=False)
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    # Python-side like the other models, so SQLite stores microseconds and cursor comparisons are exact
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Inbox pages (optionally unread-only) seek on this; id breaks created_at ties for cursors
+    __table_args__ = (db.Index('ix_notifications_user_id_is_read_created_at', 'user_id', 'is_read', 'created_at', 'id'),)
+
+class RoleRevocation(db.Model):
+    """A user's roles as of their last change, overriding the claim in tokens issued before it (see services/identity.py)"""
+    __tablename__ = 'role_revocations'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    roles = db.Column(db.String(255), nullable=False, default='')  # Comma-separated, like User.skills
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
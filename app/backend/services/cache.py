@@ -0,0 +1,181 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+try:
+    import redis
+except ImportError:  # optional shared backend
+    redis = None
+
+
+class LocalCacheBackend:
+    """In-process LRU with per-entry TTL"""
+
+    name = 'local'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl if ttl else None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        # Counters live outside the LRU so a generation can never be evicted and reset
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared backend for any redis-py compatible client, so every worker sees the same entries"""
+
+    name = 'redis'
+
+    def __init__(self, client, prefix='prok:cache:'):
+        self.client = client
+        self.prefix = prefix
+        self.evictions = 0  # evictions happen inside redis (maxmemory policy)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def get_counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+    """Whole-response cache for anonymous GETs, invalidated by per-namespace generation counters"""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 30
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'bypassed': 0, 'invalidations': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('RESPONSE_CACHE_ENABLED', True):
+            self.backend = None
+            return
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 30)
+        redis_url = app.config.get('RESPONSE_CACHE_REDIS_URL')
+        if redis_url:
+            if redis is None:
+                raise RuntimeError('RESPONSE_CACHE_REDIS_URL is set but the redis package is not installed')
+            self.backend = RedisCacheBackend(redis.Redis.from_url(redis_url))
+        else:
+            self.backend = LocalCacheBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+        app.extensions['response_cache'] = self
+
+    def generation(self, namespace):
+        return self.backend.get_counter(f'gen:{namespace}')
+
+    def version(self, *namespaces):
+        """Validator for responses built from ``namespaces`` and the current TTL window, or None when caching is off"""
+        if self.backend is None:
+            return None
+        return (*(self.generation(namespace) for namespace in namespaces), int(time.time() // self.ttl))
+
+    def bump(self, namespace):
+        """Invalidate every cached response in ``namespace``"""
+        if self.backend is not None:
+            self.backend.incr(f'gen:{namespace}')
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['backend'] = self.backend.name if self.backend is not None else None
+        stats['evictions'] = self.backend.evictions if self.backend is not None else 0
+        stats['entries'] = self.backend.size() if self.backend is not None else 0
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    @staticmethod
+    def _pack(etag, mimetype, body):
+        return json.dumps([etag, mimetype]).encode() + b'\n' + body
+
+    @staticmethod
+    def _unpack(blob):
+        header, body = blob.split(b'\n', 1)
+        etag, mimetype = json.loads(header)
+        return etag, mimetype, body
+
+    def cached(self, namespace, vary_args):
+        """Cache a view's 200 responses for anonymous callers, keyed by the normalized ``vary_args``"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None or request.headers.get('Authorization'):
+                    self._stats['bypassed'] += 1
+                    return view(*args, **kwargs)
+                normalized = sorted((name, request.args.getlist(name)) for name in vary_args if name in request.args)
+                key = f'{namespace}:{self.generation(namespace)}:{json.dumps(normalized, separators=(",", ":"))}'
+                blob = self.backend.get(key)
+                if blob is None:
+                    self._stats['misses'] += 1
+                    response = current_app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+                    self.backend.set(key, self._pack(etag, response.mimetype, body), self.ttl)
+                    status = 'MISS'
+                else:
+                    self._stats['hits'] += 1
+                    etag, mimetype, body = self._unpack(blob)
+                    response = current_app.response_class(body, mimetype=mimetype)
+                    status = 'HIT'
+                response.set_etag(etag, weak=True)
+                response.headers['X-Cache'] = status
+                if request.if_none_match.contains_weak(etag):
+                    self._stats['not_modified'] += 1
+                    response.status_code = 304
+                    response.set_data(b'')
+                return response
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
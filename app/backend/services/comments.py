@@ -0,0 +1,77 @@
+from models.user import db
+from models.post import PostComment
+from services.serializers import comment_serializer
+
+PATH_SEGMENT_WIDTH = 10
+# A path segment is 11 chars, so String(255) holds 23 levels; stop well before that
+MAX_COMMENT_DEPTH = 20
+
+
+def path_segment(comment_id):
+    return f'{comment_id:0{PATH_SEGMENT_WIDTH}d}/'
+
+
+def subtree_upper_bound(path):
+    # Every descendant path is ``path`` + digits; '/' < '0', so swapping the last '/' bounds them all
+    return path[:-1] + '0'
+
+
+def create_comment(post_id, user_id, content, parent=None):
+    """Insert a comment with its materialized path and bump the parent's reply counter"""
+    comment = PostComment(user_id=user_id, post_id=post_id, content=content, parent_id=parent.id if parent else None)
+    comment.depth = parent.depth + 1 if parent else 0
+    db.session.add(comment)
+    db.session.flush()
+    comment.path = (parent.path if parent else '') + path_segment(comment.id)
+    if parent:
+        PostComment.query.filter(PostComment.id == parent.id) \
+            .update({PostComment.reply_count: PostComment.reply_count + 1}, synchronize_session=False)
+    return comment
+
+
+def serialize_comment(comment):
+    node = comment_serializer.dump(comment)
+    node['replies'] = []
+    return node
+
+
+def load_threads(post_id, parent=None, page=1, per_page=20, max_depth=3, max_nodes=500):
+    """One page of comments (or replies of ``parent``) with capped subtrees; returns ``(threads, has_more)``"""
+    level = parent.depth + 1 if parent else 0
+    # Column-only rows: the serializer's fields plus the path used to bound the subtree scan
+    rows = comment_serializer.query(PostComment.query, PostComment.path)
+    roots = rows.filter(PostComment.post_id == post_id, PostComment.depth == level)
+    if parent:
+        roots = roots.filter(PostComment.path > parent.path, PostComment.path < subtree_upper_bound(parent.path))
+    roots = roots.order_by(PostComment.path).offset((page - 1) * per_page).limit(per_page + 1).all()
+    has_more = len(roots) > per_page
+    roots = roots[:per_page]
+    if not roots:
+        return [], False
+
+    nodes = {root.id: serialize_comment(root) for root in roots}
+    if max_depth > 0:
+        # Siblings sort by path, so the page's subtrees form one contiguous range of the index
+        descendants = (
+            rows
+            .filter(PostComment.post_id == post_id,
+                    PostComment.path > roots[0].path,
+                    PostComment.path < subtree_upper_bound(roots[-1].path),
+                    PostComment.depth > level,
+                    PostComment.depth <= level + max_depth)
+            .order_by(PostComment.path)
+            .limit(max_nodes)
+            .all()
+        )
+        for comment in descendants:
+            # Pre-order means the parent was already placed unless it fell outside the cut
+            if comment.parent_id in nodes:
+                node = serialize_comment(comment)
+                nodes[comment.parent_id]['replies'].append(node)
+                nodes[comment.id] = node
+
+    for node in nodes.values():
+        missing = node['reply_count'] - len(node['replies'])
+        if missing > 0:
+            node['more_replies'] = missing
+    return [nodes[root.id] for root in roots], has_more
@@ -0,0 +1,80 @@
+from sqlalchemy import literal, union_all
+from models.user import db, User
+from models.post import Post, PostReaction, PostComment, PostView
+from services.identity import user_cache
+
+# Denormalized counter column on Post -> table whose rows it counts
+COUNTER_SOURCES = {
+    'like_count': PostReaction,
+    'comment_count': PostComment,
+    'view_count': PostView,
+}
+
+def increment_counter(post_id, counter, amount=1):
+    """Atomically apply ``UPDATE posts SET <counter> = <counter> + amount`` in the current transaction"""
+    column = getattr(Post, counter)
+    query = Post.query.filter(Post.id == post_id)
+    if amount < 0:
+        # Never let a counter go negative if it had already drifted low
+        query = query.filter(column >= -amount)
+    return query.update({column: column + amount}, synchronize_session=False)
+
+def increment_user_post_count(user_id, amount=1):
+    """Atomically apply ``UPDATE users SET post_count = post_count + amount`` in the current transaction"""
+    query = User.query.filter(User.id == user_id)
+    if amount < 0:
+        query = query.filter(User.post_count >= -amount)
+    user_cache.invalidate_on_commit(user_id)
+    return query.update({User.post_count: User.post_count + amount}, synchronize_session=False)
+
+def count_engagement(post_ids):
+    """Count reactions, comments and views for a set of posts in a single grouped query"""
+    counts = {pid: {counter: 0 for counter in COUNTER_SOURCES} for pid in post_ids}
+    if not counts:
+        return counts
+    ids = list(counts)
+    stmt = union_all(*[
+        db.select(model.post_id.label('post_id'), literal(counter).label('counter'), db.func.count().label('n'))
+        .where(model.post_id.in_(ids))
+        .group_by(model.post_id)
+        for counter, model in COUNTER_SOURCES.items()
+    ])
+    for post_id, counter, n in db.session.execute(stmt):
+        counts[post_id][counter] = n
+    return counts
+
+def reconcile_post_counters(batch_size=500):
+    """Recount engagement in batches and repair drifted counters; returns ``(posts_checked, posts_repaired)``"""
+    checked = repaired = 0
+    last_id = 0
+    columns = [getattr(Post, counter) for counter in COUNTER_SOURCES]
+    while True:
+        rows = (
+            db.session.query(Post.id, *columns)
+            .filter(Post.id > last_id)
+            .order_by(Post.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        actual = count_engagement([row.id for row in rows])
+        for row in rows:
+            stored = {counter: getattr(row, counter) for counter in COUNTER_SOURCES}
+            if stored != actual[row.id]:
+                Post.query.filter(Post.id == row.id).update(actual[row.id], synchronize_session=False)
+                repaired += 1
+        db.session.commit()
+        checked += len(rows)
+        last_id = rows[-1].id
+    return checked, repaired
+
+def reconcile_user_post_counts():
+    """Recount posts per user and repair drifted ``users.post_count``; returns users repaired"""
+    actual = db.session.query(db.func.count(Post.id)).filter(Post.user_id == User.id).scalar_subquery()
+    repaired = User.query.filter(User.post_count != actual) \
+        .update({User.post_count: actual}, synchronize_session=False)
+    db.session.commit()
+    if repaired:
+        user_cache.clear()  # the repaired ids aren't known
+    return repaired
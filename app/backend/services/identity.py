@@ -0,0 +1,253 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, g, jsonify
+from flask_jwt_extended import JWTManager, get_jwt, get_jwt_identity
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from werkzeug.local import LocalProxy
+
+from models.user import db, RoleRevocation, User
+
+jwt = JWTManager()
+
+
+def user_roles(user):
+    return ['admin'] if user.is_admin else []
+
+
+def user_claims(user):
+    """Claims embedded in the access token, so authorization checks need no user lookup"""
+    return {'roles': user_roles(user), 'username': user.username}
+
+
+class RoleRevocations:
+    """Current roles of users whose roles changed after their tokens were issued, preferred over the token's claim"""
+
+    def __init__(self, app=None):
+        self.persist = False
+        self.refresh = 2.0
+        self.max_age = timedelta(hours=1)
+        self._roles = {}  # user_id -> (frozenset of roles, revoked_at)
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        self._stats = {'checks': 0, 'overridden': 0, 'revoked': 0, 'syncs': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.persist = app.config.get('ROLE_REVOCATIONS_PERSIST', True)
+        self.refresh = app.config.get('ROLE_REVOCATIONS_REFRESH', 2.0)
+        self.max_age = app.config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+        self._next_sync = 0.0
+        app.extensions['role_revocations'] = self
+
+    def revoke(self, user):
+        """Record ``user``'s current roles; takes effect when the session commits"""
+        now = datetime.utcnow()
+        db.session.info.setdefault('revoked_roles', {})[user.id] = (frozenset(user_roles(user)), now)
+        if self.persist:
+            # Rows past the token lifetime override nothing; drop them while we're writing anyway
+            RoleRevocation.query.filter(RoleRevocation.revoked_at < now - self.max_age).delete(synchronize_session=False)
+            db.session.merge(RoleRevocation(user_id=user.id, roles=','.join(user_roles(user)), revoked_at=now))
+
+    def _apply(self, entries):
+        self._merge(entries)
+        self._stats['revoked'] += len(entries)
+
+    def _merge(self, entries):
+        cutoff = datetime.utcnow() - self.max_age
+        with self._lock:
+            for user_id, entry in entries.items():
+                current = self._roles.get(user_id)
+                if current is None or current[1] <= entry[1]:
+                    self._roles[user_id] = entry
+            for user_id in [u for u, (_, revoked_at) in self._roles.items() if revoked_at < cutoff]:
+                del self._roles[user_id]
+
+    def _sync(self):
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + self.refresh
+        rows = db.session.query(RoleRevocation.user_id, RoleRevocation.roles, RoleRevocation.revoked_at) \
+            .filter(RoleRevocation.revoked_at >= datetime.utcnow() - self.max_age).all()
+        self._stats['syncs'] += 1
+        self._merge({user_id: (frozenset(filter(None, roles.split(','))), revoked_at)
+                     for user_id, roles, revoked_at in rows})
+
+    def roles_for(self, user_id, claimed):
+        """The roles to authorize ``user_id`` with: their recorded current roles, else the token's claim"""
+        if self.persist:
+            self._sync()
+        self._stats['checks'] += 1
+        entry = self._roles.get(user_id)
+        if entry is None:
+            return claimed
+        self._stats['overridden'] += 1
+        return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._roles.clear()
+        self._next_sync = 0.0
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats.update(persist=self.persist, entries=len(self._roles))
+        return stats
+
+
+role_revocations = RoleRevocations()
+
+
+def current_roles():
+    return role_revocations.roles_for(int(get_jwt_identity()), get_jwt().get('roles', ()))
+
+
+def require_role(role):
+    """Answer 403 unless the token grants ``role``; decorate views below ``@jwt_required()``"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if role not in current_roles():
+                return jsonify({'error': f'{role.capitalize()} only'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _stream_tokens():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='notification-stream')
+
+
+def issue_stream_token(user_id):
+    """Short-lived token that only opens the notification stream, safe to put in its URL"""
+    return _stream_tokens().dumps(int(user_id))
+
+
+def stream_token_user(token):
+    """User id a stream token was issued to, or None if it is invalid or expired"""
+    try:
+        return _stream_tokens().loads(token, max_age=current_app.config.get('NOTIFICATION_STREAM_TOKEN_TTL', 60))
+    except BadSignature:
+        return None
+
+
+class UserCache:
+    """Short-TTL, per-process LRU of ``users`` row snapshots, invalidated when a changed row commits"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.ttl = 10
+        self.max_entries = 10000
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('USER_CACHE_ENABLED', True)
+        self.ttl = app.config.get('USER_CACHE_TTL', 10)
+        self.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', 10000)
+        app.extensions['user_cache'] = self
+
+    def get(self, user_id):
+        """The ``User`` with ``user_id`` attached to the current session, or None"""
+        if not self.enabled:
+            return db.session.get(User, user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                snapshot = entry[1]
+            else:
+                snapshot = None
+        if snapshot is not None:
+            self._stats['hits'] += 1
+            return self._attach(snapshot)
+        self._stats['misses'] += 1
+        user = db.session.get(User, user_id)
+        if user is not None:
+            self._store(user)
+        return user
+
+    def _store(self, user):
+        snapshot = {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _attach(snapshot):
+        user = User.__mapper__.class_manager.new_instance()
+        for key, value in snapshot.items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self._stats['invalidations'] += 1
+
+    def invalidate_on_commit(self, *user_ids):
+        """Invalidate ``user_ids`` when the current transaction commits; for bulk updates the flush hook can't see"""
+        db.session.info.setdefault('changed_user_ids', set()).update(user_ids)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats.update(enabled=self.enabled, entries=len(self._entries), ttl=self.ttl)
+        return stats
+
+
+user_cache = UserCache()
+
+
+def load_current_user():
+    """The authenticated ``User``, loaded at most once per request; None if the account is gone"""
+    if '_current_user' not in g:
+        g._current_user = user_cache.get(int(get_jwt_identity()))
+    return g._current_user
+
+
+@jwt.user_lookup_loader
+def _lookup_user(jwt_header, jwt_data):
+    # Lazy, so routes that only check claims never load the row; flask_jwt_extended.current_user resolves it on use
+    return LocalProxy(load_current_user)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault('changed_user_ids', set())
+    changed.update(obj.id for obj in (*session.dirty, *session.deleted) if isinstance(obj, User))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('changed_user_ids', None)
+    if changed:
+        user_cache.invalidate(*changed)
+    revoked = session.info.pop('revoked_roles', None)
+    if revoked:
+        role_revocations._apply(revoked)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changed_users(session, previous_transaction):
+    if previous_transaction.parent is None:  # outermost transaction only, not a savepoint
+        session.info.pop('changed_user_ids', None)
+        session.info.pop('revoked_roles', None)
@@ -0,0 +1,198 @@
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from functools import partial
+
+from models.user import db, User
+from models.task import ImageJob
+from services.imaging import FORMATS, process_profile_image
+from services.storage import media_store
+from services.identity import user_cache
+
+
+class ImagePipeline:
+    """Processes profile image uploads in a process pool, tracked as ``ImageJob`` rows"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = 'process'
+        self.workers = 2
+        self.start_method = 'spawn'
+        self.timeout = 120
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'done': 0, 'failed': 0, 'expired': 0, 'late': 0, 'pool_restarts': 0}
+        self._stage_totals = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.backend = app.config.get('IMAGE_PIPELINE_BACKEND', 'process')
+        self.workers = app.config.get('IMAGE_PIPELINE_WORKERS', 2)
+        self.start_method = app.config.get('IMAGE_PIPELINE_START_METHOD', 'spawn')
+        self.timeout = app.config.get('IMAGE_JOB_TIMEOUT', 120)
+        app.extensions['image_pipeline'] = self
+        atexit.register(self.shutdown)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method)
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _replace_executor(self, broken):
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+                self._stats['pool_restarts'] += 1
+        broken.shutdown(wait=False)
+
+    def submit(self, user_id, data, renditions, formats):
+        """Record a queued job and hand the uploaded bytes to the pool; returns the job id"""
+        job = ImageJob(id=uuid.uuid4().hex, user_id=user_id, status='queued')
+        db.session.add(job)
+        db.session.commit()
+        self._stats['submitted'] += 1
+        args = (data, renditions, formats, time.time())
+        on_done = partial(self._on_done, job.id, user_id)
+        if self.backend == 'inline':
+            on_done(lambda: process_profile_image(*args))
+        else:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(process_profile_image, *args)
+                except BrokenProcessPool as e:
+                    # A worker died and took the pool with it (its jobs were failed by their callbacks);
+                    # start a fresh pool and retry once
+                    self._replace_executor(executor)
+                    if attempt:
+                        self.fail(job.id, e)
+                else:
+                    future.add_done_callback(lambda future: self._run_callback(on_done, future.result))
+                    break
+        return job.id
+
+    def _run_callback(self, on_done, result):
+        # Called on the executor's management thread, outside any app context
+        with self.app.app_context():
+            try:
+                on_done(result)
+            finally:
+                db.session.remove()
+
+    def _on_done(self, job_id, user_id, result):
+        try:
+            rendered, timings = result()
+            released = self.complete(job_id, user_id, rendered, timings)
+        except Exception as e:
+            self.fail(job_id, e)
+        else:
+            media_store.collect(released)
+
+    def complete(self, job_id, user_id, rendered, timings):
+        job = db.session.get(ImageJob, job_id)
+        if job is None or job.status != 'queued':
+            # Expired while it waited; the client was told it failed, so don't swap the avatar now
+            self._stats['late'] += 1
+            return []
+        start = time.perf_counter()
+        keys, urls = [], {}
+        for name, encoded in rendered.items():
+            urls[name] = {}
+            for fmt, body in encoded.items():
+                key = media_store.store(body, FORMATS[fmt][1])
+                keys.append(key)
+                urls[name][fmt] = media_store.url(key)
+        timings['store'] = round((time.perf_counter() - start) * 1000, 2)
+        image_url = urls['full']['jpeg']
+        newer = db.session.query(ImageJob.id).filter(
+            ImageJob.user_id == user_id, ImageJob.status == 'done', ImageJob.created_at > job.created_at
+        ).exists()
+        previous_job_id = db.session.query(User.image_job_id).filter(User.id == user_id).with_for_update().scalar()
+        swapped = User.query.filter(User.id == user_id, ~newer).update(
+            {User.image_url: image_url, User.image_job_id: job_id}, synchronize_session=False
+        )
+        # The replaced avatar's blobs, or this job's own if a newer upload already won
+        released = media_store.release(self.job_media_keys(previous_job_id) if swapped else keys)
+        job.status = 'done'
+        job.image_url = image_url
+        job.thumbnail_url = urls['thumbnail']['jpeg']
+        job.renditions = json.dumps(urls)
+        job.media_keys = json.dumps(keys)
+        job.timings = json.dumps(timings)
+        job.finished_at = datetime.utcnow()
+        if swapped:
+            user_cache.invalidate_on_commit(user_id)
+        db.session.commit()
+        self._stats['done'] += 1
+        for stage, ms in timings.items():
+            count, total, worst = self._stage_totals.get(stage, (0, 0.0, 0.0))
+            self._stage_totals[stage] = (count + 1, total + ms, max(worst, ms))
+        return released
+
+    @staticmethod
+    def job_media_keys(job_id):
+        media_keys = db.session.query(ImageJob.media_keys).filter(ImageJob.id == job_id).scalar() if job_id else None
+        return json.loads(media_keys) if media_keys else []
+
+    def detach(self, user):
+        """Release the blobs behind ``user``'s processed avatar; returns the keys to collect after committing"""
+        released = media_store.release(self.job_media_keys(user.image_job_id))
+        user.image_job_id = None
+        return released
+
+    def fail(self, job_id, error):
+        db.session.rollback()
+        ImageJob.query.filter_by(id=job_id, status='queued').update(
+            {ImageJob.status: 'failed', ImageJob.error: str(error), ImageJob.finished_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        self._stats['failed'] += 1
+        if self.app is not None:
+            self.app.logger.warning('Image job %s failed: %s', job_id, error)
+
+    def expire(self, job_id=None):
+        """Fail jobs queued for longer than ``timeout`` seconds (or just ``job_id``); commits, returns the count"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout)
+        query = ImageJob.query.filter(ImageJob.status == 'queued', ImageJob.created_at < cutoff)
+        if job_id is not None:
+            query = query.filter(ImageJob.id == job_id)
+        expired = query.update(
+            {ImageJob.status: 'failed', ImageJob.error: 'Timed out waiting for processing.',
+             ImageJob.finished_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        self._stats['expired'] += expired
+        return expired
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['backend'] = self.backend
+        stats['stages_ms'] = {
+            stage: {'avg': round(total / count, 2), 'max': worst}
+            for stage, (count, total, worst) in self._stage_totals.items()
+        }
+        return stats
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,71 @@
+# Runs inside the image worker processes: no Flask or database imports, so a
+# freshly spawned worker starts quickly and every entry point is picklable.
+import io
+import time
+
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401  registers an AVIF codec on Pillow versions without one
+except ImportError:  # optional, AVIF variants are skipped
+    pass
+
+# format -> (PIL format name, file extension, save options)
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'avif': ('AVIF', 'avif', {'quality': 60}),
+}
+# Thumbnails keep the JPEG quality the original pipeline wrote them at
+THUMBNAIL_OPTIONS = {'jpeg': {'quality': 80}}
+
+
+def available_formats(formats):
+    """``formats`` filtered to those this Pillow build can encode; JPEG is always included"""
+    Image.init()
+    return ['jpeg'] + [name for name in formats if name != 'jpeg' and FORMATS[name][0] in Image.SAVE]
+
+
+def fit(size, box):
+    """``size`` scaled down, keeping its aspect ratio, to fit inside ``box`` (never up)"""
+    width, height = size
+    scale = min(box[0] / width, box[1] / height, 1)
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+def render_renditions(data, renditions, formats, timings=None):
+    """Decode ``data`` once and encode every rendition in every format; returns ``{name: {format: bytes}}``"""
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as img:
+        largest = max(renditions.values(), key=lambda size: size[0] * size[1])
+        if img.format == 'JPEG':
+            img.draft('RGB', largest)
+        img.load()
+        source = img.convert('RGB') if img.mode != 'RGB' else img.copy()
+    timings['decode'] = round((time.perf_counter() - start) * 1000, 2)
+
+    output = {}
+    for name, size in sorted(renditions.items(), key=lambda item: item[1][0] * item[1][1], reverse=True):
+        start = time.perf_counter()
+        target = fit(source.size, size)
+        if target != source.size:
+            source = source.resize(target, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        timings[f'resize_{name}'] = round((time.perf_counter() - start) * 1000, 2)
+        output[name] = {}
+        for fmt in formats:
+            start = time.perf_counter()
+            pil_format, _, options = FORMATS[fmt]
+            if name.startswith('thumbnail'):
+                options = {**options, **THUMBNAIL_OPTIONS.get(fmt, {})}
+            buffer = io.BytesIO()
+            source.save(buffer, format=pil_format, **options)
+            output[name][fmt] = buffer.getvalue()
+            timings[f'encode_{name}_{fmt}'] = round((time.perf_counter() - start) * 1000, 2)
+    return output
+
+
+def process_profile_image(data, renditions, formats, submitted_at):
+    """Worker entry point: render the uploaded bytes; returns ``(rendered, timings)``"""
+    timings = {'queue_wait': round((time.time() - submitted_at) * 1000, 2)}
+    return render_renditions(data, renditions, formats, timings), timings
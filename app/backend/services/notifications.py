@@ -0,0 +1,117 @@
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from models.user import db, User, Notification
+from services.identity import user_cache
+from services.pagination import encode_cursor, keyset_paginate
+from services.realtime import notification_hub
+from services.serializers import notification_serializer
+from services.tasks import task_queue
+
+MENTION_PATTERN = re.compile(r'@([A-Za-z0-9_]+)')
+
+
+def extract_mentions(content):
+    return sorted(set(MENTION_PATTERN.findall(content or '')))
+
+
+@task_queue.task('notify_mentions')
+def send_mention_notifications(usernames, actor_id, context):
+    """Resolve all mentioned usernames in one IN query and bulk-insert their notifications"""
+    recipients = [
+        user_id for (user_id,) in
+        db.session.query(User.id).filter(User.username.in_(usernames), User.id != int(actor_id))
+    ]
+    if not recipients:
+        return 0
+    notify_users(recipients, f'You were mentioned in a {context}.')
+    db.session.commit()
+    return len(recipients)
+
+
+def notify_users(user_ids, message):
+    """Bulk-insert one notification per user and bump their unread counters, in the current transaction"""
+    now = datetime.utcnow()
+    rows = [{'user_id': user_id, 'message': message, 'is_read': False, 'created_at': now} for user_id in user_ids]
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        stmt = insert(Notification).returning(*notification_serializer.columns, Notification.user_id)
+        created = db.session.execute(stmt, rows).all()
+    else:
+        db.session.execute(insert(Notification), rows)
+        created = notification_serializer.query(Notification.query, Notification.user_id) \
+            .filter(Notification.user_id.in_(user_ids), Notification.is_read.is_(False), Notification.created_at == now) \
+            .all()
+    User.query.filter(User.id.in_(user_ids)).update(
+        {User.unread_notification_count: User.unread_notification_count + 1}, synchronize_session=False
+    )
+    user_cache.invalidate_on_commit(*user_ids)
+    notification_hub.stage(db.session, [
+        (row.user_id, row.id, 'notification', notification_serializer.dump(row)) for row in created
+    ])
+
+
+def inbox_page(user_id, cursor=None, per_page=20, unread_only=False):
+    """One newest-first page of a user's notifications; returns ``(rows, next_cursor)``"""
+    rows, more = [], False
+    for is_read in ((False,) if unread_only else (False, True)):
+        query = notification_serializer.query(Notification.query.filter_by(user_id=user_id, is_read=is_read))
+        items, next_cursor = keyset_paginate(query, Notification.created_at, Notification.id, cursor, per_page)
+        rows.extend(items)
+        more = more or next_cursor is not None
+    rows.sort(key=lambda row: (row.created_at, row.id), reverse=True)
+    more = more or len(rows) > per_page
+    rows = rows[:per_page]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id) if more and rows else None
+
+
+def set_read_state(user_id, ids=None, is_read=True):
+    """Mark ``ids`` (or all, when None) read/unread in one UPDATE; commits and returns the number changed"""
+    query = Notification.query.filter(Notification.user_id == user_id, Notification.is_read == (not is_read))
+    if ids is not None:
+        query = query.filter(Notification.id.in_(ids))
+    changed = query.update({Notification.is_read: is_read}, synchronize_session=False)
+    if changed:
+        delta = -changed if is_read else changed
+        User.query.filter(User.id == user_id).update(
+            {User.unread_notification_count: User.unread_notification_count + delta}, synchronize_session=False
+        )
+        user_cache.invalidate_on_commit(user_id)
+    db.session.commit()
+    return changed
+
+
+def unread_count(user_id):
+    return db.session.query(User.unread_notification_count).filter(User.id == user_id).scalar() or 0
+
+
+def prune_notifications(retention=timedelta(days=90), batch_size=1000, now=None):
+    """Delete read notifications older than ``retention`` in batches; returns the number removed"""
+    cutoff = (now or datetime.utcnow()) - retention
+    removed = 0
+    while True:
+        ids = [
+            row.id for row in
+            db.session.query(Notification.id)
+            .filter(Notification.is_read.is_(True), Notification.created_at < cutoff)
+            .order_by(Notification.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            return removed
+        removed += Notification.query.filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+
+
+def reconcile_unread_counts():
+    """Recount unread notifications per user and repair drifted counters; returns users repaired"""
+    actual = db.session.query(db.func.count(Notification.id)) \
+        .filter(Notification.user_id == User.id, Notification.is_read.is_(False)) \
+        .scalar_subquery()
+    repaired = User.query.filter(User.unread_notification_count != actual) \
+        .update({User.unread_notification_count: actual}, synchronize_session=False)
+    db.session.commit()
+    if repaired:
+        user_cache.clear()  # the repaired ids aren't known
+    return repaired
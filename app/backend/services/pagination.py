@@ -0,0 +1,74 @@
+import base64
+import json
+import operator
+from datetime import datetime
+
+from models.user import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    """Pack sort-key values into an opaque, URL-safe cursor string"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Reverse of ``encode_cursor`` for a ``(created_at, id)`` cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+
+
+def keyset_paginate(query, created_column, id_column, cursor, per_page):
+    """One page ordered by ``(created_at, id)`` descending after ``cursor``; returns ``(items, next_cursor)``"""
+    query = query.order_by(created_column.desc(), id_column.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(db.or_(
+            created_column < created_at,
+            db.and_(created_column == created_at, id_column < row_id)
+        ))
+    items = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+
+def decode_key_cursor(cursor):
+    """Reverse of ``encode_cursor`` for a ``(sort key, id)`` cursor whose key is a number or string"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(key, (int, float, str)) or isinstance(key, bool):
+            raise ValueError(key)
+        return key, int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+
+
+def keyset_paginate_by(query, sort_column, id_column, cursor, per_page, descending=True):
+    """``keyset_paginate`` for any ``(sort_column, id)`` order; rows must expose both columns"""
+    direction = (lambda column: column.desc()) if descending else (lambda column: column.asc())
+    past = operator.lt if descending else operator.gt
+    query = query.order_by(direction(sort_column), direction(id_column))
+    if cursor:
+        key, row_id = decode_key_cursor(cursor)
+        query = query.filter(db.or_(
+            past(sort_column, key),
+            db.and_(sort_column == key, past(id_column, row_id))
+        ))
+    items = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(getattr(items[-1], sort_column.key), getattr(items[-1], id_column.key))
+    return items, next_cursor
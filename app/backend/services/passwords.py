@@ -0,0 +1,147 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Werkzeug's shorthand method names and the full parameter strings it stores in the hash
+METHOD_DEFAULTS = {
+    'pbkdf2': f'pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}',
+    'scrypt': 'scrypt:32768:8:1',
+}
+
+
+def normalize_method(method):
+    if method.startswith('pbkdf2:') and method.count(':') == 1:
+        return f'{method}:{DEFAULT_PBKDF2_ITERATIONS}'
+    return METHOD_DEFAULTS.get(method, method)
+
+
+class HashingUnavailable(Exception):
+    """Raised instead of queueing more KDF work; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs password hashing and verification in a bounded pool, refusing work beyond its queue"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.method = METHOD_DEFAULTS['pbkdf2']
+        self.salt_length = 16
+        self.backend = 'inline'
+        self.workers = 2
+        self.max_queue = 32
+        self.timeout = 5.0
+        self.retry_after = 1
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = None
+        self._in_flight = 0
+        self._stats = {'completed': 0, 'rejected': 0, 'timed_out': 0, 'rehashed': 0, 'peak_in_flight': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2'))
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', 16)
+        self.backend = app.config.get('PASSWORD_HASH_BACKEND', 'thread')
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 32)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5.0)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        app.extensions['password_hasher'] = self
+        atexit.register(self.shutdown)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                if self.backend == 'process':
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if self.backend == 'inline' or self._slots is None:
+            result = fn(*args)
+            self._count('completed')
+            return result
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise HashingUnavailable('Too many sign-in attempts in progress, try again shortly.', 429, self.retry_after)
+        with self._lock:
+            self._in_flight += 1
+            self._stats['peak_in_flight'] = max(self._stats['peak_in_flight'], self._in_flight)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._done()
+            raise
+        # The slot is held until the hash actually finishes, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._done())
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._count('timed_out')
+            raise HashingUnavailable('Sign-in is temporarily unavailable, try again shortly.', 503, self.retry_after)
+        self._count('completed')
+        return result
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _done(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` wasn't made with the configured method, parameters and salt length"""
+        method, _, rest = pwhash.partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.method or len(salt) != self.salt_length
+
+    def rehash_if_needed(self, user, password):
+        """Upgrade ``user``'s stored hash to the current parameters, unless the pool is saturated"""
+        if not self.needs_rehash(user.password_hash):
+            return False
+        try:
+            user.password_hash = self.hash(password)
+        except HashingUnavailable:
+            return False
+        self._count('rehashed')
+        return True
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, in_flight=self._in_flight)
+        stats.update(backend=self.backend, method=self.method, workers=self.workers, max_queue=self.max_queue)
+        return stats
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,81 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Per-process token buckets keyed by string, held in an LRU of ``max_keys``"""
+
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """Spend one token for ``key``; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class LoginRateLimiter:
+    """Per-identifier and per-IP token buckets for login attempts, checked before any hashing"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.by_identifier = None
+        self.by_ip = None
+        self._stats = {'allowed': 0, 'limited_identifier': 0, 'limited_ip': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LOGIN_RATE_LIMIT_ENABLED', True)
+        max_keys = app.config.get('LOGIN_RATE_LIMIT_MAX_KEYS', 10000)
+        per_identifier = app.config.get('LOGIN_RATE_PER_IDENTIFIER', (5, 60))
+        per_ip = app.config.get('LOGIN_RATE_PER_IP', (30, 60))
+        # (attempts, seconds): a full burst of `attempts`, refilled evenly over `seconds`
+        self.by_identifier = TokenBucket(per_identifier[0] / per_identifier[1], per_identifier[0], max_keys)
+        self.by_ip = TokenBucket(per_ip[0] / per_ip[1], per_ip[0], max_keys)
+        app.extensions['login_rate_limiter'] = self
+
+    def check(self, identifier, ip):
+        """Seconds the caller must wait before another attempt, or 0 if this one may proceed"""
+        if not self.enabled:
+            return 0
+        wait = self.by_ip.take(ip)
+        if wait:
+            self._stats['limited_ip'] += 1
+            return math.ceil(wait)
+        wait = self.by_identifier.take(identifier)
+        if wait:
+            self._stats['limited_identifier'] += 1
+            return math.ceil(wait)
+        self._stats['allowed'] += 1
+        return 0
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['enabled'] = self.enabled
+        if self.enabled:
+            stats['tracked'] = {'identifiers': len(self.by_identifier), 'ips': len(self.by_ip)}
+        return stats
+
+
+login_rate_limiter = LoginRateLimiter()
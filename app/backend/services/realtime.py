@@ -0,0 +1,123 @@
+import json
+import threading
+from collections import deque
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class SubscriberLimitReached(Exception):
+    pass
+
+
+class Subscription:
+    """One connected stream: a bounded backlog of encoded events plus a wake-up flag"""
+
+    __slots__ = ('user_id', 'events', 'ready', 'overflowed')
+
+    def __init__(self, user_id, backlog):
+        self.user_id = user_id
+        self.events = deque(maxlen=backlog)
+        self.ready = threading.Event()
+        self.overflowed = False
+
+    def push(self, item):
+        if len(self.events) == self.events.maxlen:
+            self.overflowed = True
+        self.events.append(item)
+        self.ready.set()
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds; returns queued ``(id, frame)`` items, or None on timeout"""
+        if not self.ready.wait(timeout):
+            return None
+        self.ready.clear()
+        items = []
+        while self.events:
+            items.append(self.events.popleft())
+        return items
+
+
+def sse_frame(event_id, name, data):
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+class NotificationHub:
+    """In-process pub/sub with one channel per user, fanned out when the session commits"""
+
+    def __init__(self, app=None):
+        self.max_per_user = 5
+        self.backlog = 100
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._stats = {'published': 0, 'delivered': 0, 'rejected': 0, 'overflowed': 0, 'peak_subscribers': 0}
+        self._subscribers = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_per_user = app.config.get('NOTIFICATION_STREAM_MAX_PER_USER', 5)
+        self.backlog = app.config.get('NOTIFICATION_STREAM_BACKLOG', 100)
+        app.extensions['notification_hub'] = self
+
+    def subscribe(self, user_id):
+        with self._lock:
+            channel = self._channels.setdefault(user_id, set())
+            if len(channel) >= self.max_per_user:
+                self._stats['rejected'] += 1
+                raise SubscriberLimitReached(f'At most {self.max_per_user} notification streams per user.')
+            subscription = Subscription(user_id, self.backlog)
+            channel.add(subscription)
+            self._subscribers += 1
+            self._stats['peak_subscribers'] = max(self._stats['peak_subscribers'], self._subscribers)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            channel = self._channels.get(subscription.user_id)
+            if channel is None or subscription not in channel:
+                return
+            channel.discard(subscription)
+            self._subscribers -= 1
+            if subscription.overflowed:
+                self._stats['overflowed'] += 1
+            if not channel:
+                del self._channels[subscription.user_id]
+
+    def publish(self, user_id, event_id, name, data):
+        with self._lock:
+            subscribers = list(self._channels.get(user_id, ()))
+        self._stats['published'] += 1
+        if not subscribers:
+            return 0
+        frame = sse_frame(event_id, name, data)
+        for subscription in subscribers:
+            subscription.push((event_id, frame))
+        self._stats['delivered'] += len(subscribers)
+        return len(subscribers)
+
+    def stage(self, session, events):
+        """Queue ``(user_id, event_id, name, data)`` events to publish when ``session`` commits"""
+        session.info.setdefault('notification_hub_events', []).extend(events)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['subscribers'] = self._subscribers
+            stats['users'] = len(self._channels)
+        return stats
+
+
+notification_hub = NotificationHub()
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_staged(session):
+    for user_id, event_id, name, data in session.info.pop('notification_hub_events', ()):
+        notification_hub.publish(user_id, event_id, name, data)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_staged(session, previous_transaction):
+    if previous_transaction.parent is None:  # outermost transaction only, not a savepoint
+        session.info.pop('notification_hub_events', None)
@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+from functools import wraps
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip from the stdlib otherwise
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/javascript', 'image/svg+xml'}
+
+
+def etag_digest(data):
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+class ResponseLayer:
+    """After-request layer that adds ETags, answers 304s and compresses bodies"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.compression = True
+        self.etags = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        self._stats = {'gzip': 0, 'br': 0, 'bytes_in': 0, 'bytes_out': 0, 'not_modified': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_LAYER_ENABLED', True)
+        self.compression = app.config.get('RESPONSE_COMPRESSION_ENABLED', True)
+        self.etags = app.config.get('RESPONSE_ETAGS_ENABLED', True)
+        self.min_size = app.config.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('RESPONSE_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('RESPONSE_BROTLI_QUALITY', 5)
+        app.after_request(self.process_response)
+        app.extensions['response_layer'] = self
+
+    def options(self, compress=True, min_size=None, etag=True, version=None):
+        """Per-route settings; ``version`` returns a value that changes whenever the response can"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                tag = None
+                if self.enabled and self.etags and etag and version is not None and request.method == 'GET':
+                    current = version()
+                    if current is not None:
+                        tag = etag_digest(repr((current, request.path, sorted(request.args.items(multi=True)))).encode())
+                        if request.if_none_match.contains_weak(tag):
+                            self._stats['not_modified'] += 1
+                            response = current_app.response_class(status=304)
+                            response.set_etag(tag, weak=True)
+                            return response
+                response = current_app.make_response(view(*args, **kwargs))
+                if tag is not None and response.status_code == 200:
+                    # Weak, so the same validator holds for the gzip and br encodings of the body
+                    response.set_etag(tag, weak=True)
+                return response
+            wrapper.response_options = {'compress': compress, 'min_size': min_size, 'etag': etag}
+            return wrapper
+        return decorator
+
+    def _route_options(self):
+        view = current_app.view_functions.get(request.endpoint)
+        return getattr(view, 'response_options', {})
+
+    def process_response(self, response):
+        if not self.enabled or request.method != 'GET' or response.status_code != 200 \
+                or response.direct_passthrough or response.is_streamed:
+            return response
+        options = self._route_options()
+        if self.etags and options.get('etag', True):
+            if 'ETag' not in response.headers:
+                response.set_etag(etag_digest(response.get_data()), weak=True)
+            tag, _ = response.get_etag()
+            if request.if_none_match.contains_weak(tag):
+                self._stats['not_modified'] += 1
+                response.status_code = 304
+                response.set_data(b'')
+                return response
+        if self.compression and options.get('compress', True):
+            self._compress(response, options.get('min_size') or self.min_size)
+        return response
+
+    def _compress(self, response, min_size):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES and not response.mimetype.startswith('text/'):
+            return
+        if 'Content-Encoding' in response.headers:
+            return
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        if len(body) < min_size:
+            return
+        encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        elif encoding == 'gzip':
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        else:
+            return
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        self._stats[encoding] += 1
+        self._stats['bytes_in'] += len(body)
+        self._stats['bytes_out'] += len(compressed)
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['brotli_available'] = brotli is not None
+        stats['compression_ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 4) if stats['bytes_in'] else None
+        return stats
+
+
+response_layer = ResponseLayer()
@@ -0,0 +1,186 @@
+import re
+
+import sqlalchemy as sa
+from markupsafe import escape
+from sqlalchemy import DDL, event
+
+from models.user import db
+from models.post import Post
+
+SNIPPET_TOKENS = 12
+SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS = '<mark>', '</mark>', '…'
+# Hits are marked with private-use characters first, so the content can be escaped before <mark> goes in
+HIT_OPEN, HIT_CLOSE = '\ue000', '\ue001'
+
+# SQLite: external-content FTS5 table over posts(title, content), kept in sync by triggers
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "title, content, content='posts', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+]
+SQLITE_DROP_DDL = ["DROP TABLE IF EXISTS posts_fts"]
+
+# Postgres: generated, weighted tsvector column with a GIN index (always in sync by definition)
+POSTGRES_DDL = [
+    "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)",
+]
+
+for statement in SQLITE_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in SQLITE_DROP_DDL:
+    event.listen(Post.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+for statement in POSTGRES_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+
+
+def _terms(q):
+    return re.findall(r'\w+', q or '', flags=re.UNICODE)
+
+
+def highlight(snippet):
+    """HTML-escape a snippet whose hits are marked with HIT_OPEN/HIT_CLOSE, then mark them up"""
+    return str(escape(snippet)).replace(HIT_OPEN, SNIPPET_OPEN).replace(HIT_CLOSE, SNIPPET_CLOSE)
+
+
+class LikeSearchBackend:
+    """Fallback for databases without a full-text backend: unranked substring matching"""
+
+    name = 'like'
+
+    def filter(self, query, q, ranked=False):
+        pattern = f'%{q}%'
+        return query.filter(sa.or_(Post.title.ilike(pattern), Post.content.ilike(pattern)))
+
+    def snippets(self, q, posts):
+        needle = (q or '').lower()
+        ids = [post.id for post in posts]
+        if not needle or not ids:
+            return {}
+        # Read content by id: the page rows may be projected without it (or with only a preview)
+        result = {}
+        for post_id, content in db.session.query(Post.id, Post.content).filter(Post.id.in_(ids)):
+            index = content.lower().find(needle)
+            if index >= 0:
+                start, end = max(index - 60, 0), index + len(needle) + 60
+                result[post_id] = highlight(
+                    (SNIPPET_ELLIPSIS if start else '') + content[start:index] + HIT_OPEN
+                    + content[index:index + len(needle)] + HIT_CLOSE
+                    + content[index + len(needle):end] + (SNIPPET_ELLIPSIS if end < len(content) else '')
+                )
+        return result
+
+    def setup(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SqliteFtsSearchBackend:
+    """SQLite FTS5 with bm25 ranking and snippet()"""
+
+    name = 'sqlite-fts5'
+
+    @staticmethod
+    def match_expression(q):
+        # Quote every term so user input can't inject FTS syntax; prefix-match the last one
+        terms = ['"{}"'.format(term.replace('"', '')) for term in _terms(q)]
+        if terms:
+            terms[-1] += '*'
+        return ' '.join(terms)
+
+    def filter(self, query, q, ranked=False):
+        match = self.match_expression(q)
+        if not match:
+            return query.filter(sa.false())
+        hits = (
+            sa.select(sa.literal_column('rowid').label('post_id'), sa.literal_column('bm25(posts_fts, 2.0, 1.0)').label('rank'))
+            .select_from(sa.text('posts_fts'))
+            .where(sa.text('posts_fts MATCH :fts_match').bindparams(fts_match=match))
+            .subquery('fts_hits')
+        )
+        query = query.join(hits, hits.c.post_id == Post.id)
+        return query.order_by(hits.c.rank, Post.id.desc()) if ranked else query
+
+    def snippets(self, q, posts):
+        match = self.match_expression(q)
+        ids = [post.id for post in posts]
+        if not match or not ids:
+            return {}
+        rows = db.session.execute(
+            sa.text(
+                "SELECT rowid, snippet(posts_fts, 1, :open, :close, :ellipsis, :tokens) FROM posts_fts "
+                "WHERE posts_fts MATCH :fts_match AND rowid IN :ids"
+            ).bindparams(sa.bindparam('ids', expanding=True)),
+            {'open': HIT_OPEN, 'close': HIT_CLOSE, 'ellipsis': SNIPPET_ELLIPSIS,
+             'tokens': SNIPPET_TOKENS, 'fts_match': match, 'ids': ids}
+        )
+        return {post_id: highlight(snippet) for post_id, snippet in rows}
+
+    def setup(self):
+        for statement in SQLITE_DDL:
+            db.session.execute(sa.text(statement))
+        db.session.commit()
+
+    def rebuild(self):
+        db.session.execute(sa.text("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')"))
+        db.session.execute(sa.text("INSERT INTO posts_fts(posts_fts) VALUES ('optimize')"))
+        db.session.commit()
+
+
+class PostgresFtsSearchBackend:
+    """Postgres tsvector/GIN with ts_rank_cd ranking and ts_headline()"""
+
+    name = 'postgres-tsvector'
+    search_vector = sa.literal_column('posts.search_vector')
+
+    @staticmethod
+    def tsquery(q):
+        return sa.func.websearch_to_tsquery('english', q)
+
+    def filter(self, query, q, ranked=False):
+        if not _terms(q):
+            return query.filter(sa.false())
+        tsquery = self.tsquery(q)
+        query = query.filter(self.search_vector.op('@@')(tsquery))
+        if ranked:
+            query = query.order_by(sa.func.ts_rank_cd(self.search_vector, tsquery).desc(), Post.id.desc())
+        return query
+
+    def snippets(self, q, posts):
+        ids = [post.id for post in posts]
+        if not _terms(q) or not ids:
+            return {}
+        options = f'StartSel={HIT_OPEN}, StopSel={HIT_CLOSE}, MaxWords={SNIPPET_TOKENS * 2}, MinWords={SNIPPET_TOKENS}'
+        rows = db.session.query(Post.id, sa.func.ts_headline('english', Post.content, self.tsquery(q), options)) \
+            .filter(Post.id.in_(ids))
+        return {post_id: highlight(snippet) for post_id, snippet in rows}
+
+    def setup(self):
+        for statement in POSTGRES_DDL:
+            db.session.execute(sa.text(statement))
+        db.session.commit()
+
+    def rebuild(self):
+        db.session.execute(sa.text('REINDEX INDEX ix_posts_search_vector'))
+        db.session.commit()
+
+
+BACKENDS = {
+    'sqlite': SqliteFtsSearchBackend(),
+    'postgresql': PostgresFtsSearchBackend(),
+}
+
+
+def get_search_backend():
+    """Pick the full-text backend for the bound database, falling back to ILIKE"""
+    return BACKENDS.get(db.engine.dialect.name, LikeSearchBackend())
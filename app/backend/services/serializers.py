@@ -0,0 +1,121 @@
+from operator import attrgetter
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+from models.user import User, Notification
+from models.post import Post, PostComment
+
+
+class InvalidFields(ValueError):
+    """Raised for a ``fields``/``preview_len`` request the serializer can't satisfy"""
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class Serializer:
+    """Precompiled field spec for one model, dumping rows or ORM instances"""
+
+    def __init__(self, model, fields, transforms=None, columns=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.transforms = tuple((name, fn) for name, fn in (transforms or {}).items() if name in self.fields)
+        get = attrgetter(*self.fields)
+        # attrgetter returns a bare value, not a 1-tuple, for a single field
+        self._get = get if len(self.fields) > 1 else lambda obj: (get(obj),)
+        columns = columns or {}
+        self.columns = tuple(
+            columns[name].label(name) if name in columns else getattr(model, name) for name in self.fields
+        )
+
+    def dump(self, obj):
+        data = dict(zip(self.fields, obj if isinstance(obj, Row) else self._get(obj)))
+        for name, fn in self.transforms:
+            data[name] = fn(data[name])
+        return data
+
+    def dump_many(self, objs):
+        return [self.dump(obj) for obj in objs]
+
+    def query(self, query, *extra_columns):
+        """Narrow a model query to this serializer's columns (rows, not ORM objects)"""
+        return query.with_entities(*self.columns, *extra_columns)
+
+    def project(self, fields=None, columns=None):
+        """Serializer for a subset of the fields, selecting ``columns`` overrides in their place"""
+        if fields is None:
+            names = self.fields
+        else:
+            unknown = set(fields).difference(self.fields)
+            if unknown:
+                raise InvalidFields(f'Unknown fields: {", ".join(sorted(unknown))}')
+            names = [name for name in self.fields if name in fields]
+            if not names:
+                raise InvalidFields('fields must name at least one field.')
+        return Serializer(self.model, names, dict(self.transforms), columns)
+
+
+post_serializer = Serializer(
+    Post,
+    ['id', 'user_id', 'title', 'content', 'tags', 'visibility', 'media_url', 'created_at',
+     'like_count', 'comment_count', 'view_count'],
+    transforms={'created_at': isoformat}
+)
+
+profile_serializer = Serializer(
+    User,
+    ['id', 'username', 'email', 'bio', 'skills', 'work_experience', 'education', 'contact_info', 'image_url']
+)
+
+# created_at is left as a datetime so it keeps the HTTP-date format comments always had
+comment_serializer = Serializer(
+    PostComment,
+    ['id', 'user_id', 'post_id', 'parent_id', 'content', 'created_at', 'depth', 'reply_count']
+)
+
+notification_serializer = Serializer(
+    Notification,
+    ['id', 'message', 'is_read', 'created_at'],
+    transforms={'created_at': isoformat}
+)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, output-compatible with the stdlib provider"""
+
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    # Datetimes are passed through to the stdlib provider's default() so they keep the HTTP-date format
+    _default = staticmethod(DefaultJSONProvider.default)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # indent, sort_keys, default, ...: orjson can't honour them all, so keep the stdlib meaning
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self._default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self._default, option=self.options),
+            mimetype=self.mimetype
+        )
+
+
+def init_json_provider(app):
+    """Use orjson for jsonify() when installed and JSON_FAST_ENCODER allows it; stdlib otherwise"""
+    if orjson is not None and app.config.get('JSON_FAST_ENCODER', True):
+        app.json = OrjsonProvider(app)
+    return app.json
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+from collections import Counter
+
+from sqlalchemy.exc import IntegrityError
+
+from models.user import db, User
+from models.media import MediaBlob
+from models.post import Post
+from models.task import ImageJob
+from services.tasks import task_queue
+from services.uploads import save_upload
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # optional S3 backend
+    boto3 = None
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads', 'media')
+# Objects never change under a content-addressed key
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class LocalStorage:
+    """Blobs on the local filesystem under ``root``, served from ``base_url``"""
+
+    name = 'local'
+
+    def __init__(self, root=DEFAULT_ROOT, base_url='/uploads/media'):
+        self.root = root
+        self.base_url = base_url.rstrip('/')
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, source, content_type=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(source, bytes):
+            # Write beside the target and rename, so a reader never sees a partial blob
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+                f.write(source)
+            os.replace(f.name, path)
+        else:
+            save_upload(source, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key):
+        return f'{self.base_url}/{key}'
+
+
+class S3Storage:
+    """Blobs in an S3-compatible bucket; ``endpoint_url`` points at MinIO or a moto server"""
+
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, public_url=None, client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client or boto3.client('s3', endpoint_url=endpoint_url)
+        if public_url is None:
+            public_url = f'{endpoint_url}/{bucket}' if endpoint_url else f'https://{bucket}.s3.amazonaws.com'
+        self.public_url = public_url.rstrip('/')
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
+
+    def put(self, key, source, content_type=None):
+        extra = {'CacheControl': IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            extra['ContentType'] = content_type
+        if isinstance(source, bytes):
+            self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=source, **extra)
+        else:
+            stream = getattr(source, 'stream', source)
+            stream.seek(0)
+            self.client.upload_fileobj(stream, self.bucket, self.prefix + key, ExtraArgs=extra)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def url(self, key):
+        return f'{self.public_url}/{self.prefix}{key}'
+
+
+class MediaStore:
+    """Content-addressed, reference-counted media storage"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.backend = LocalStorage()
+        self._stats = {'stored': 0, 'deduplicated': 0, 'released': 0, 'collected': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        backend = app.config.get('MEDIA_STORAGE_BACKEND', 'local')
+        if backend == 's3':
+            if boto3 is None:
+                raise RuntimeError('MEDIA_STORAGE_BACKEND is s3 but the boto3 package is not installed')
+            self.backend = S3Storage(
+                app.config['MEDIA_S3_BUCKET'],
+                prefix=app.config.get('MEDIA_S3_PREFIX', ''),
+                endpoint_url=app.config.get('MEDIA_S3_ENDPOINT_URL'),
+                public_url=app.config.get('MEDIA_S3_PUBLIC_URL'),
+            )
+        else:
+            self.backend = LocalStorage(
+                app.config.get('MEDIA_STORAGE_ROOT', DEFAULT_ROOT), app.config.get('MEDIA_STORAGE_URL', '/uploads/media')
+            )
+        app.extensions['media_store'] = self
+
+    @staticmethod
+    def key_for(digest, extension):
+        return f'{digest[:2]}/{digest[2:4]}/{digest}.{extension}'
+
+    def url(self, key):
+        return self.backend.url(key)
+
+    def store(self, source, extension, digest=None, size=None):
+        """Take a reference to the blob for ``source`` (bytes or an upload), writing it if new; returns its key"""
+        if isinstance(source, bytes):
+            digest, size = hashlib.sha256(source).hexdigest(), len(source)
+        key = self.key_for(digest, extension)
+        content_type = mimetypes.guess_type(key)[0]
+        self.acquire(key, size, content_type)
+        if self.backend.exists(key):
+            self._stats['deduplicated'] += 1
+        else:
+            self.backend.put(key, source, content_type)
+            self._stats['stored'] += 1
+        return key
+
+    def acquire(self, key, size, content_type=None):
+        updated = MediaBlob.query.filter_by(key=key) \
+            .update({MediaBlob.ref_count: MediaBlob.ref_count + 1}, synchronize_session=False)
+        if updated:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(MediaBlob(key=key, size=size, content_type=content_type, ref_count=1))
+        except IntegrityError:
+            # Created concurrently by another upload of the same content
+            MediaBlob.query.filter_by(key=key) \
+                .update({MediaBlob.ref_count: MediaBlob.ref_count + 1}, synchronize_session=False)
+
+    def release(self, keys):
+        """Drop one reference per entry in ``keys``; returns the distinct keys to pass to ``collect()`` after committing"""
+        counts = Counter(key for key in keys if key)
+        # One UPDATE per distinct multiplicity: a key stored twice (identical renditions) drops two references
+        for n in set(counts.values()):
+            batch = [key for key, count in counts.items() if count == n]
+            MediaBlob.query.filter(MediaBlob.key.in_(batch), MediaBlob.ref_count >= n) \
+                .update({MediaBlob.ref_count: MediaBlob.ref_count - n}, synchronize_session=False)
+        self._stats['released'] += sum(counts.values())
+        return list(counts)
+
+    def collect_later(self, keys):
+        """Queue ``collect(keys)`` on the task queue"""
+        if keys:
+            task_queue.enqueue('collect_media', keys=list(keys))
+
+    def collect(self, keys=None):
+        """Delete unreferenced blobs (among ``keys``, or all of them) and their objects; returns how many"""
+        query = db.session.query(MediaBlob.key).filter(MediaBlob.ref_count == 0)
+        if keys is not None:
+            query = query.filter(MediaBlob.key.in_(keys))
+        collected = 0
+        for key in [key for (key,) in query]:
+            # Re-checked under the row's write lock: a concurrent store() may have just referenced it
+            if MediaBlob.query.filter_by(key=key, ref_count=0).delete(synchronize_session=False):
+                try:
+                    self.backend.delete(key)
+                except Exception:
+                    db.session.rollback()
+                    if self.app is not None:
+                        self.app.logger.exception('Could not delete media blob %s', key)
+                    continue
+                collected += 1
+            db.session.commit()
+        self._stats['collected'] += collected
+        return collected
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['backend'] = self.backend.name
+        return stats
+
+
+media_store = MediaStore()
+
+
+def reconcile_media_refs():
+    """Recount references from posts and current avatars and repair drifted blob counts; returns blobs repaired"""
+    expected = Counter(key for (key,) in db.session.query(Post.media_key).filter(Post.media_key.isnot(None)))
+    avatars = db.session.query(ImageJob.media_keys).join(User, User.image_job_id == ImageJob.id) \
+        .filter(ImageJob.media_keys.isnot(None))
+    for (media_keys,) in avatars:
+        expected.update(json.loads(media_keys))
+    repaired = 0
+    for key, ref_count in db.session.query(MediaBlob.key, MediaBlob.ref_count).all():
+        if expected[key] != ref_count:
+            MediaBlob.query.filter_by(key=key).update({MediaBlob.ref_count: expected[key]}, synchronize_session=False)
+            repaired += 1
+    db.session.commit()
+    return repaired
+
+
+@task_queue.task('collect_media')
+def collect_media(keys):
+    return media_store.collect(keys)
@@ -0,0 +1,101 @@
+from sqlalchemy import bindparam, delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from models.user import db
+from models.post import Tag, post_tags
+
+MAX_TAG_LENGTH = 64
+
+
+def parse_tags(raw):
+    """Split a comma-separated tag string into unique, lowercased names (order kept)"""
+    names = []
+    for part in (raw or '').split(','):
+        name = part.strip().lstrip('#').lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _get_or_create_tag_ids(names):
+    existing = dict(db.session.query(Tag.name, Tag.id).filter(Tag.name.in_(names)))
+    for name in names:
+        if name in existing:
+            continue
+        try:
+            with db.session.begin_nested():
+                tag = Tag(name=name, post_count=0)
+                db.session.add(tag)
+            existing[name] = tag.id
+        except IntegrityError:
+            # Created concurrently by another request
+            existing[name] = db.session.query(Tag.id).filter(Tag.name == name).scalar()
+    return [existing[name] for name in names]
+
+
+def _bump_post_counts(tag_ids, amount):
+    if not tag_ids:
+        return
+    tags = Tag.__table__
+    db.session.execute(
+        update(tags).where(tags.c.id == bindparam('b_tag_id')).values(post_count=tags.c.post_count + amount),
+        [{'b_tag_id': tag_id} for tag_id in tag_ids]
+    )
+
+
+def set_post_tags(post_id, raw):
+    """Replace a post's tags with those in ``raw``, adjusting tag counters, in the current transaction"""
+    names = parse_tags(raw)
+    wanted = set(_get_or_create_tag_ids(names)) if names else set()
+    current = {row.tag_id for row in db.session.execute(
+        db.select(post_tags.c.tag_id).where(post_tags.c.post_id == post_id)
+    )}
+    added, removed = wanted - current, current - wanted
+    if added:
+        db.session.execute(insert(post_tags), [{'post_id': post_id, 'tag_id': tag_id} for tag_id in added])
+        _bump_post_counts(added, 1)
+    if removed:
+        db.session.execute(
+            delete(post_tags).where(post_tags.c.post_id == post_id, post_tags.c.tag_id.in_(removed))
+        )
+        _bump_post_counts(removed, -1)
+
+
+def clear_post_tags(post_id):
+    set_post_tags(post_id, '')
+
+
+def filter_by_tags(query, post_id_column, names, match_all=False):
+    """Restrict ``query`` to posts tagged with any (or all) of ``names`` via the post_tags index"""
+    if not names:
+        return query
+    tagged = (
+        db.select(post_tags.c.post_id)
+        .join(Tag, Tag.id == post_tags.c.tag_id)
+        .where(Tag.name.in_(names))
+    )
+    if match_all:
+        tagged = tagged.group_by(post_tags.c.post_id).having(db.func.count(post_tags.c.tag_id) == len(names))
+    return query.filter(post_id_column.in_(tagged))
+
+
+def top_tags(limit=50, prefix=None):
+    """Most used tags from the maintained counters, no scan of posts"""
+    query = db.session.query(Tag.name, Tag.post_count).filter(Tag.post_count > 0)
+    if prefix:
+        query = query.filter(Tag.name.startswith(prefix.lower(), autoescape=True))
+    return query.order_by(Tag.post_count.desc(), Tag.name).limit(limit).all()
+
+
+def reconcile_tag_counts():
+    """Recompute every Tag.post_count from post_tags; returns the number repaired"""
+    actual = dict(db.session.execute(
+        db.select(post_tags.c.tag_id, db.func.count()).group_by(post_tags.c.tag_id)
+    ).all())
+    repaired = 0
+    for tag_id, stored in db.session.query(Tag.id, Tag.post_count):
+        if stored != actual.get(tag_id, 0):
+            Tag.query.filter(Tag.id == tag_id).update({Tag.post_count: actual.get(tag_id, 0)}, synchronize_session=False)
+            repaired += 1
+    db.session.commit()
+    return repaired
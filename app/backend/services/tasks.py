@@ -0,0 +1,159 @@
+import atexit
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models.user import db
+from models.task import BackgroundTask
+from services.background import PeriodicThread
+
+
+class InlineBackend:
+    """Runs tasks immediately in the caller; used when the queue isn't configured"""
+
+    name = 'inline'
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def submit(self, name, kwargs):
+        self.queue.run(name, kwargs)
+
+    def shutdown(self):
+        pass
+
+
+class ThreadPoolBackend:
+    """Runs tasks on an in-process thread pool; queued work is lost if the process dies"""
+
+    name = 'thread'
+
+    def __init__(self, queue, workers):
+        self.queue = queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task-worker')
+
+    def submit(self, name, kwargs):
+        self.executor.submit(self._run, name, kwargs)
+
+    def _run(self, name, kwargs):
+        with self.queue.app.app_context():
+            try:
+                self.queue.run(name, kwargs)
+            except Exception:
+                db.session.rollback()
+                self.queue.app.logger.exception('Task %s failed', name)
+            finally:
+                db.session.remove()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+class DatabaseBackend:
+    """Persists tasks to the background_tasks table and runs them from a polling thread, with retries"""
+
+    name = 'database'
+
+    def __init__(self, queue, poll_interval, batch_size, max_attempts):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poller = PeriodicThread('task-poller', self.drain, poll_interval)
+
+    def submit(self, name, kwargs):
+        db.session.add(BackgroundTask(name=name, payload=json.dumps(kwargs)))
+        db.session.commit()
+        self.poller.ensure_started()
+        self.poller.wake()
+
+    def drain(self):
+        with self.queue.app.app_context():
+            try:
+                while self._run_batch():
+                    pass
+            finally:
+                db.session.remove()
+
+    def _run_batch(self):
+        now = datetime.utcnow()
+        candidates = [
+            task_id for (task_id,) in
+            db.session.query(BackgroundTask.id)
+            .filter(BackgroundTask.status == 'pending', BackgroundTask.run_after <= now)
+            .order_by(BackgroundTask.id)
+            .limit(self.batch_size)
+        ]
+        ran = 0
+        for task_id in candidates:
+            # Claim with a conditional UPDATE so concurrent pollers never run a task twice
+            claimed = BackgroundTask.query.filter_by(id=task_id, status='pending') \
+                .update({'status': 'running', 'attempts': BackgroundTask.attempts + 1}, synchronize_session=False)
+            db.session.commit()
+            if not claimed:
+                continue
+            task = db.session.get(BackgroundTask, task_id)
+            try:
+                self.queue.run(task.name, json.loads(task.payload))
+                db.session.delete(task)
+            except Exception as e:
+                db.session.rollback()
+                task = db.session.get(BackgroundTask, task_id)
+                task.last_error = repr(e)
+                if task.attempts >= self.max_attempts:
+                    task.status = 'failed'
+                else:
+                    task.status = 'pending'
+                    task.run_after = datetime.utcnow() + timedelta(seconds=30 * task.attempts)
+                self.queue.app.logger.exception('Task %s (#%d) failed', task.name, task_id)
+            db.session.commit()
+            ran += 1
+        return ran
+
+    def shutdown(self):
+        self.poller.stop(timeout=5)
+
+
+class TaskQueue:
+    """Named background tasks with a swappable execution backend (TASK_QUEUE_BACKEND)"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.tasks = {}
+        self.backend = InlineBackend(self)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        backend = app.config.get('TASK_QUEUE_BACKEND', 'thread')
+        if backend == 'thread':
+            self.backend = ThreadPoolBackend(self, app.config.get('TASK_QUEUE_WORKERS', 4))
+        elif backend == 'database':
+            self.backend = DatabaseBackend(
+                self,
+                poll_interval=app.config.get('TASK_QUEUE_POLL_INTERVAL', 1.0),
+                batch_size=app.config.get('TASK_QUEUE_BATCH_SIZE', 20),
+                max_attempts=app.config.get('TASK_QUEUE_MAX_ATTEMPTS', 3),
+            )
+        else:
+            self.backend = InlineBackend(self)
+        app.extensions['task_queue'] = self
+        atexit.register(self.backend.shutdown)
+
+    def task(self, name):
+        """Register a function as a task under ``name``"""
+        def decorator(fn):
+            self.tasks[name] = fn
+            return fn
+        return decorator
+
+    def enqueue(self, name, **kwargs):
+        if name not in self.tasks:
+            raise KeyError(f'Unknown task: {name}')
+        self.backend.submit(name, kwargs)
+
+    def run(self, name, kwargs):
+        return self.tasks[name](**kwargs)
+
+
+task_queue = TaskQueue()
@@ -0,0 +1,152 @@
+import atexit
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models.user import db
+from models.post import Post, PostViewCount
+from services.background import PeriodicThread
+from services.tags import parse_tags
+from services.view_rollup import bucket_start
+
+
+class TrendingLeaderboard:
+    """Precomputed trending leaderboards, refreshed by a background thread"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._boards = None
+        self._built_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._worker = None
+        self._stats = {'refreshes': 0, 'failures': 0, 'last_refresh_ms': 0.0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._worker = PeriodicThread('trending-refresher', self.refresh, self._config('TRENDING_REFRESH_INTERVAL'))
+        app.extensions['trending_leaderboard'] = self
+        atexit.register(self._worker.stop)
+
+    def top(self, k=5, tag=None, category=None):
+        """Return up to ``k`` ``(post_id, score)`` pairs, best first"""
+        stale = self._boards is None or time.monotonic() - self._built_at > self._config('TRENDING_TTL')
+        if self._worker is None:
+            # Not configured (scripts, tests): build inline
+            if stale:
+                self.refresh()
+        else:
+            self._worker.ensure_started()
+            if self._boards is None:
+                # Cold start: build once here instead of serving empty boards until the worker's first pass
+                self.refresh(only_if_missing=True)
+            elif stale:
+                # Refresh early and keep serving the previous snapshot meanwhile
+                self._worker.wake()
+        if tag and parse_tags(tag):
+            key = ('tag', parse_tags(tag)[0])
+        elif category:
+            key = ('category', category)
+        else:
+            key = ('all', None)
+        return (self._boards or {}).get(key, [])[:k]
+
+    def discard(self, post_id):
+        """Drop a deleted post from every board now and rebuild them early"""
+        boards = self._boards
+        if boards is not None:
+            self._boards = {
+                key: [entry for entry in entries if entry[0] != post_id]
+                for key, entries in boards.items()
+            }
+        if self._worker is not None:
+            self._worker.wake()
+
+    def refresh(self, only_if_missing=False):
+        """Rebuild every board; on failure the previous snapshot keeps being served"""
+        with self._refresh_lock:
+            if only_if_missing and self._boards is not None:
+                return
+            started = time.perf_counter()
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        try:
+                            boards = self._build()
+                        finally:
+                            db.session.remove()
+                else:
+                    boards = self._build()
+            except Exception:
+                self._stats['failures'] += 1
+                if self.app is not None:
+                    self.app.logger.exception('Failed to refresh trending boards')
+                return
+            self._boards = boards
+            self._built_at = time.monotonic()
+            self._stats['refreshes'] += 1
+            self._stats['last_refresh_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['age_seconds'] = round(time.monotonic() - self._built_at, 3) if self._boards is not None else None
+        stats['boards'] = len(self._boards) if self._boards is not None else 0
+        return stats
+
+    def _config(self, key):
+        defaults = {
+            'TRENDING_REFRESH_INTERVAL': 60,
+            'TRENDING_TTL': 300,
+            'TRENDING_WINDOW_DAYS': 7,
+            'TRENDING_HALF_LIFE_HOURS': 24,
+            'TRENDING_MAX_K': 50,
+            'TRENDING_WEIGHTS': {'views': 1.0, 'likes': 3.0, 'comments': 5.0},
+        }
+        config = self.app.config if self.app is not None else {}
+        return config.get(key, defaults[key])
+
+    def _build(self):
+        now = datetime.utcnow()
+        since = now - timedelta(days=self._config('TRENDING_WINDOW_DAYS'))
+        half_life = self._config('TRENDING_HALF_LIFE_HOURS') * 3600.0
+        weights = self._config('TRENDING_WEIGHTS')
+        max_k = self._config('TRENDING_MAX_K')
+
+        def decay(moment):
+            return math.pow(0.5, max((now - moment).total_seconds(), 0.0) / half_life)
+
+        scores = {}
+        buckets = (
+            db.session.query(PostViewCount.post_id, PostViewCount.bucket_start, PostViewCount.count)
+            .filter(PostViewCount.bucket_start >= bucket_start(since))
+        )
+        for post_id, start, count in buckets:
+            scores[post_id] = scores.get(post_id, 0.0) + count * weights['views'] * decay(start)
+
+        # Candidates are posts viewed or created inside the window
+        candidates = (
+            db.session.query(Post.id, Post.category, Post.tags, Post.like_count, Post.comment_count, Post.created_at)
+            .filter(db.or_(Post.id.in_(db.select(PostViewCount.post_id).where(PostViewCount.bucket_start >= bucket_start(since))),
+                           Post.created_at >= since))
+        )
+        boards = {}
+        for post_id, category, tags, likes, comments, created_at in candidates:
+            score = scores.get(post_id, 0.0)
+            score += (likes * weights['likes'] + comments * weights['comments']) * decay(created_at or now)
+            if score <= 0:
+                continue
+            keys = [('all', None)]
+            if category:
+                keys.append(('category', category))
+            keys.extend(('tag', tag) for tag in parse_tags(tags))
+            for key in keys:
+                boards.setdefault(key, []).append((post_id, score))
+        for key, entries in boards.items():
+            entries.sort(key=lambda entry: (-entry[1], -entry[0]))
+            del entries[max_k:]
+        return boards
+
+
+trending_leaderboard = TrendingLeaderboard()
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# (offset, signature, media type); checked against the first bytes of each upload
+# media type, and every (offset, bytes) its leading bytes must match
+MAGIC_SIGNATURES = [
+    ('jpeg', ((0, b'\xff\xd8\xff'),)),
+    ('png', ((0, b'\x89PNG\r\n\x1a\n'),)),
+    ('gif', ((0, b'GIF87a'),)),
+    ('gif', ((0, b'GIF89a'),)),
+    ('webp', ((0, b'RIFF'), (8, b'WEBP'))),
+    ('avi', ((0, b'RIFF'), (8, b'AVI '))),
+]
+# ISO base media files share the ftyp box at bytes 4-8; the major brand at bytes 8-12
+# tells MP4 and QuickTime apart from HEIC, AVIF and the other formats built on it
+FTYP_BRANDS = {
+    b'qt  ': 'mov',
+    **dict.fromkeys([b'isom', b'iso2', b'iso4', b'iso5', b'iso6', b'mp41', b'mp42', b'avc1', b'M4V ', b'dash',
+                     b'mmp4', b'MSNV', b'f4v '], 'mp4'),
+}
+SNIFF_BYTES = 16
+
+
+def sniff_media_type(head):
+    """Media type from a file's leading bytes, or None if it isn't a format we accept"""
+    for media_type, parts in MAGIC_SIGNATURES:
+        if all(head[offset:offset + len(signature)] == signature for offset, signature in parts):
+            return media_type
+    if head[4:8] == b'ftyp':
+        return FTYP_BRANDS.get(head[8:12])
+    return None
+
+
+def upload_limit(max_file_size):
+    """Cap each file in this route's uploads, and the whole body, at ``max_file_size`` bytes"""
+    def decorator(view):
+        view.upload_limit = max_file_size
+        return view
+    return decorator
+
+
+class StreamedUpload:
+    """Write target for one multipart file part: a temp file plus a rolling SHA-256"""
+
+    def __init__(self, directory, limit=None):
+        self._file = tempfile.NamedTemporaryFile(dir=directory, prefix='upload-', delete=False)
+        self.path = self._file.name
+        self.limit = limit
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._head = b''
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.limit is not None and self.size > self.limit:
+            self.discard()
+            raise RequestEntityTooLarge(f'File too large (max {self.limit // (1024 * 1024)}MB).')
+        if len(self._head) < SNIFF_BYTES:
+            self._head += chunk[:SNIFF_BYTES - len(self._head)]
+        self._hash.update(chunk)
+        return self._file.write(chunk)
+
+    def __getattr__(self, name):
+        # read/seek/tell/close for FileStorage and PIL
+        return getattr(self._file, name)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    @property
+    def media_type(self):
+        return sniff_media_type(self._head)
+
+    def move_to(self, path):
+        """Move the finished upload to ``path`` (a rename when on the same filesystem)"""
+        self._file.close()
+        os.replace(self.path, path)
+        self.path = None
+
+    def discard(self):
+        self._file.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+
+class UploadRequest(Request):
+    """Request class that streams file uploads to disk and enforces per-route size limits"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._uploads = []
+
+    def _route_upload_limit(self):
+        view = current_app.view_functions.get(self.endpoint) if self.endpoint else None
+        return getattr(view, 'upload_limit', None)
+
+    @property
+    def max_content_length(self):
+        limit = super().max_content_length
+        route_limit = self._route_upload_limit()
+        if route_limit is not None:
+            route_limit += current_app.config.get('UPLOAD_FORM_OVERHEAD', 64 * 1024)
+            limit = route_limit if limit is None else min(limit, route_limit)
+        return limit
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        directory = current_app.config['UPLOAD_TMP_FOLDER']
+        os.makedirs(directory, exist_ok=True)
+        upload = StreamedUpload(directory, self._route_upload_limit())
+        self._uploads.append(upload)
+        return upload
+
+    def close(self):
+        super().close()
+        # Anything not moved into place by the view is a leftover temp file
+        for upload in self._uploads:
+            upload.discard()
+
+
+def upload_details(file):
+    """``(size, sha256, media_type)`` for a FileStorage, streamed or not"""
+    stream = file.stream
+    if isinstance(stream, StreamedUpload):
+        return stream.size, stream.sha256, stream.media_type
+    # Fallback for apps without UploadRequest: hash the spooled file in chunks
+    digest, size, head = hashlib.sha256(), 0, b''
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        if not head:
+            head = chunk[:SNIFF_BYTES]
+        digest.update(chunk)
+        size += len(chunk)
+    stream.seek(0)
+    return size, digest.hexdigest(), sniff_media_type(head)
+
+
+def save_upload(file, path):
+    if isinstance(file.stream, StreamedUpload):
+        file.stream.move_to(path)
+    else:
+        file.save(path)
+
+
+def init_uploads(app):
+    """Stream uploads to UPLOAD_TMP_FOLDER and answer oversize requests with a JSON 413"""
+    app.request_class = UploadRequest
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_entity_too_large(e):
+        if e.description == RequestEntityTooLarge.description:
+            return jsonify({'error': 'Request body too large.'}), 413
+        return jsonify({'error': e.description}), 413
+
+    return app
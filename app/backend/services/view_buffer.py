@@ -0,0 +1,153 @@
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import bindparam, insert, update
+
+from models.user import db
+from models.post import Post, PostView
+from services.background import PeriodicThread
+from services.view_rollup import record_view_counts
+
+
+class ViewBuffer:
+    """Write-behind buffer for post views, flushed in bulk by a background thread"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._flusher = None
+        self._stats = {
+            'recorded': 0,
+            'dropped': 0,
+            'flushed': 0,
+            'orphaned': 0,
+            'failed': 0,
+            'flushes': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_size = app.config.get('VIEW_BUFFER_MAX_SIZE', 10000)
+        self.flush_size = app.config.get('VIEW_BUFFER_FLUSH_SIZE', 500)
+        self.flush_interval = app.config.get('VIEW_BUFFER_FLUSH_INTERVAL', 2.0)
+        self.full_policy = app.config.get('VIEW_BUFFER_FULL_POLICY', 'drop')
+        self.block_timeout = app.config.get('VIEW_BUFFER_BLOCK_TIMEOUT', 0.05)
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._flusher = PeriodicThread('view-buffer-flusher', self.flush, self.flush_interval)
+        app.extensions['view_buffer'] = self
+        atexit.register(self.shutdown)
+
+    def record(self, post_id, user_id=None):
+        """Queue a view. Falls back to an inline insert if the buffer isn't configured"""
+        view = (post_id, user_id, datetime.utcnow())
+        if self.app is None:
+            self._write([view])
+            db.session.commit()
+            return True
+        self._flusher.ensure_started()
+        try:
+            if self.full_policy == 'block':
+                self._queue.put(view, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(view)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('recorded')
+        if self._queue.qsize() >= self.flush_size:
+            self._flusher.wake()
+        return True
+
+    def flush(self):
+        """Drain the queue into the database in batches of ``flush_size``"""
+        if self._queue is None:
+            return 0
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = []
+                while len(batch) < self.flush_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    break
+                started = time.perf_counter()
+                with self.app.app_context():
+                    try:
+                        stored = self._write(batch)
+                        db.session.commit()
+                        self._count('flushed', stored)
+                        self._count('orphaned', len(batch) - stored)
+                        written += stored
+                    except Exception:
+                        db.session.rollback()
+                        self._count('failed', len(batch))
+                        self.app.logger.exception('Failed to flush %d post views', len(batch))
+                    finally:
+                        db.session.remove()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with self._stats_lock:
+                    self._stats['flushes'] += 1
+                    self._stats['last_flush_ms'] = elapsed_ms
+                    self._stats['total_flush_ms'] += elapsed_ms
+                    self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed_ms)
+        return written
+
+    def shutdown(self):
+        """Stop the flusher thread and write out everything still queued"""
+        if self._flusher is not None:
+            self._flusher.stop(timeout=max(self.flush_interval, 1) * 5)
+        self.flush()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        flushes = stats.pop('total_flush_ms')
+        stats['avg_flush_ms'] = round(flushes / stats['flushes'], 3) if stats['flushes'] else 0.0
+        stats['last_flush_ms'] = round(stats['last_flush_ms'], 3)
+        stats['max_flush_ms'] = round(stats['max_flush_ms'], 3)
+        stats['depth'] = self._queue.qsize() if self._queue is not None else 0
+        stats['max_size'] = self.max_size if self._queue is not None else 0
+        return stats
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _write(self, views):
+        """Store the views of posts that still exist; returns how many were stored"""
+        ids = {post_id for post_id, _, _ in views}
+        existing = set(db.session.scalars(db.select(Post.id).where(Post.id.in_(ids))))
+        views = [view for view in views if view[0] in existing]
+        if not views:
+            return 0
+        db.session.execute(insert(PostView), [
+            {'post_id': post_id, 'user_id': user_id, 'viewed_at': viewed_at}
+            for post_id, user_id, viewed_at in views
+        ])
+        per_post = Counter(post_id for post_id, _, _ in views)
+        posts = Post.__table__
+        db.session.execute(
+            update(posts)
+            .where(posts.c.id == bindparam('b_post_id'))
+            .values(view_count=posts.c.view_count + bindparam('b_views')),
+            [{'b_post_id': post_id, 'b_views': n} for post_id, n in per_post.items()]
+        )
+        record_view_counts((post_id, viewed_at) for post_id, _, viewed_at in views)
+        return len(views)
+
+
+view_buffer = ViewBuffer()
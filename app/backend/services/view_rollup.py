@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from models.user import db
+from models.post import PostViewCount
+
+BUCKET_SIZE = timedelta(hours=1)
+
+def bucket_start(moment):
+    """Truncate a timestamp to the start of its hourly bucket"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def _upsert(rows):
+    dialect = db.session.get_bind().dialect.name
+    table = PostViewCount.__table__
+    if dialect == 'mysql':
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(count=table.c.count + stmt.inserted.count)
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.post_id, table.c.bucket_start],
+        set_={'count': table.c.count + stmt.excluded.count}
+    )
+
+def record_view_counts(views):
+    """Add ``(post_id, viewed_at)`` pairs to the hourly rollup in the current transaction"""
+    buckets = {}
+    for post_id, viewed_at in views:
+        key = (post_id, bucket_start(viewed_at))
+        buckets[key] = buckets.get(key, 0) + 1
+    if not buckets:
+        return
+    db.session.execute(_upsert(buckets), [
+        {'post_id': post_id, 'bucket_start': start, 'count': count}
+        for (post_id, start), count in buckets.items()
+    ])
+
+def top_viewed_posts(since, limit=5):
+    """Return ``[(post_id, views)]`` for the most viewed posts since ``since``, best first"""
+    total = db.func.sum(PostViewCount.count).label('views')
+    return (
+        db.session.query(PostViewCount.post_id, total)
+        .filter(PostViewCount.bucket_start >= bucket_start(since))
+        .group_by(PostViewCount.post_id)
+        .order_by(total.desc(), PostViewCount.post_id.desc())
+        .limit(limit)
+        .all()
+    )
+
+def compact_view_counts(retention=timedelta(days=7), now=None):
+    """Delete rollup buckets older than ``retention``; returns the number removed"""
+    cutoff = bucket_start((now or datetime.utcnow()) - retention)
+    expired = [
+        row.bucket_start for row in
+        db.session.query(PostViewCount.bucket_start)
+        .filter(PostViewCount.bucket_start < cutoff)
+        .distinct()
+        .order_by(PostViewCount.bucket_start)
+    ]
+    removed = 0
+    for start in expired:
+        removed += PostViewCount.query.filter(PostViewCount.bucket_start == start).delete(synchronize_session=False)
+        db.session.commit()
+    return removed
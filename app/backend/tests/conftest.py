@@ -0,0 +1,142 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from models.user import db, User
+from models.post import Post
+from api.auth import auth_bp
+from api.profile import profile_bp
+from api.posts import posts_bp
+from api.admin import admin_bp
+from services.tasks import task_queue
+from services.cache import response_cache
+from services.responses import response_layer
+from services.realtime import notification_hub
+from services.image_jobs import image_pipeline
+from services.uploads import init_uploads
+from services.storage import media_store
+from services.passwords import password_hasher
+from services.ratelimit import login_rate_limiter
+from services.identity import jwt, role_revocations, user_cache
+from services.trending import trending_leaderboard
+from services.view_buffer import view_buffer
+
+
+def create_test_app(tmp_path, **config):
+    """An app wired like main.py, against an in-memory database, running background work inline"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        JWT_SECRET_KEY='test-secret-key-long-enough-for-hs256',
+        TASK_QUEUE_BACKEND='inline',
+        IMAGE_PIPELINE_BACKEND='inline',
+        PASSWORD_HASH_BACKEND='inline',
+        PASSWORD_HASH_METHOD='pbkdf2:sha256:1000',
+        MEDIA_STORAGE_ROOT=str(tmp_path / 'media'),
+        UPLOAD_TMP_FOLDER=str(tmp_path / 'tmp'),
+        IMAGE_FORMATS=['jpeg'],
+    )
+    app.config.update(config)
+    jwt.init_app(app)
+    db.init_app(app)
+    for extension in (task_queue, response_cache, response_layer, notification_hub, image_pipeline, media_store,
+                      password_hasher, login_rate_limiter, user_cache, role_revocations):
+        extension.init_app(app)
+    init_uploads(app)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(profile_bp)
+    app.register_blueprint(posts_bp)
+    app.register_blueprint(admin_bp)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_test_app(tmp_path)
+    yield app
+    # Module-level extensions outlive the app; don't let state leak into the next test
+    user_cache.clear()
+    role_revocations.clear()
+    if view_buffer._flusher is not None:
+        view_buffer._flusher.stop()
+    view_buffer.app = view_buffer._queue = view_buffer._flusher = None
+    trending_leaderboard.app = None
+    trending_leaderboard._boards = None
+    trending_leaderboard._worker = None
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def signup_and_login(client, username, password='pw'):
+    client.post('/api/signup', json={'username': username, 'email': f'{username}@example.com', 'password': password})
+    response = client.post('/api/login', json={'username': username, 'password': password})
+    return {'Authorization': 'Bearer ' + response.get_json()['token']}
+
+
+@pytest.fixture
+def alice(client):
+    return signup_and_login(client, 'alice')
+
+
+@pytest.fixture
+def bob(client):
+    return signup_and_login(client, 'bob')
+
+
+def make_admin(app, username):
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        user.is_admin = True
+        db.session.commit()
+
+
+def create_post(client, headers, title='Hello', content='Post body', **fields):
+    response = client.post('/api/posts', data={'title': title, 'content': content, **fields}, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['id']
+
+
+def get_post(app, post_id):
+    with app.app_context():
+        return db.session.get(Post, post_id)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __len__(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager factory counting SQL statements sent inside the block"""
+    @contextmanager
+    def counting():
+        with app.app_context():
+            engine = db.engine
+        counter = QueryCounter()
+        event.listen(engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, 'before_cursor_execute', counter)
+    return counting
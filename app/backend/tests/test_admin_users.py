@@ -0,0 +1,91 @@
+import pytest
+
+from conftest import create_post, make_admin, signup_and_login
+
+
+@pytest.fixture
+def admin(app, client):
+    signup_and_login(client, 'alice')
+    make_admin(app, 'alice')
+    return signup_and_login(client, 'alice')
+
+
+@pytest.fixture
+def users(client, admin):
+    bob = signup_and_login(client, 'bob')
+    carol = signup_and_login(client, 'Carol')
+    signup_and_login(client, 'dave')
+    for i in range(2):
+        create_post(client, bob, title=f'Bob {i}')
+    create_post(client, carol)
+
+
+def list_users(client, headers, **args):
+    response = client.get('/api/admin/users', query_string=args, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def walk(client, headers, **args):
+    """Usernames of every page, following next_cursor"""
+    names, cursor, pages = [], None, 0
+    while True:
+        data = list_users(client, headers, per_page=2, **args, **({'cursor': cursor} if cursor else {}))
+        names += [user['username'] for user in data['users']]
+        pages += 1
+        cursor = data['next_cursor']
+        if cursor is None:
+            return names, pages
+
+
+@pytest.mark.parametrize('sort, expected', [
+    ('id', ['dave', 'Carol', 'bob', 'alice']),
+    ('username', ['alice', 'bob', 'Carol', 'dave']),
+    ('post_count', ['bob', 'Carol', 'dave', 'alice']),
+])
+def test_cursor_pages_cover_every_user_once(client, admin, users, sort, expected):
+    names, pages = walk(client, admin, sort=sort)
+    assert names == expected
+    assert pages == 2
+
+
+def test_listing_reports_post_counts(client, admin, users):
+    data = list_users(client, admin, sort='post_count', per_page=1)
+    assert data['users'] == [{'id': 2, 'username': 'bob', 'email': 'bob@example.com', 'is_admin': False,
+                              'post_count': 2}]
+    assert data['per_page'] == 1
+
+
+def test_filters(client, admin, users):
+    assert walk(client, admin, username='CA')[0] == ['Carol']
+    assert walk(client, admin, is_admin='true')[0] == ['alice']
+    assert walk(client, admin, is_admin='false', sort='username')[0] == ['bob', 'Carol', 'dave']
+    assert walk(client, admin, min_posts=1, sort='username')[0] == ['bob', 'Carol']
+    assert walk(client, admin, max_posts=0, sort='username')[0] == ['alice', 'dave']
+
+
+def test_page_size_is_capped(app, client, admin, users):
+    app.config['ADMIN_USERS_MAX_PER_PAGE'] = 3
+    data = list_users(client, admin, per_page=1000)
+    assert data['per_page'] == 3
+    assert len(data['users']) == 3
+
+
+@pytest.mark.parametrize('args', [{'sort': 'email'}, {'min_posts': '-1'}, {'max_posts': 'many'},
+                                  {'cursor': 'not-a-cursor'}])
+def test_bad_arguments_are_rejected(client, admin, args):
+    response = client.get('/api/admin/users', query_string=args, headers=admin)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_listing_is_admin_only(client, admin, bob):
+    assert client.get('/api/admin/users', headers=bob).status_code == 403
+    assert client.get('/api/admin/users').status_code == 401
+
+
+def test_listing_runs_one_query_per_page(client, admin, users, count_queries):
+    with count_queries() as counter:
+        list_users(client, admin, sort='post_count', per_page=2)
+    selects = [s for s in counter.statements if 'FROM users' in s and 'role_revocations' not in s]
+    assert len(selects) == 1
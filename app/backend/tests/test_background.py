@@ -0,0 +1,24 @@
+import threading
+
+from services.background import PeriodicThread
+
+
+def test_worker_survives_a_failing_target():
+    first, second = threading.Event(), threading.Event()
+
+    def target():
+        if not first.is_set():
+            first.set()
+            raise RuntimeError('first pass fails')
+        second.set()
+
+    worker = PeriodicThread('test-worker', target, interval=60)
+    worker.ensure_started()
+    try:
+        worker.wake()
+        assert first.wait(5)
+        worker.wake()
+        assert second.wait(5)
+        assert worker.is_running()
+    finally:
+        worker.stop(timeout=5)
@@ -0,0 +1,53 @@
+from models.post import PostComment
+
+from conftest import create_post
+
+
+def comment(app, client, headers, post_id, content, parent_id=None):
+    response = client.post(f'/api/posts/{post_id}/comments', json={'content': content, 'parent_id': parent_id},
+                           headers=headers)
+    assert response.status_code == 201, response.get_json()
+    with app.app_context():
+        return PostComment.query.order_by(PostComment.id.desc()).first().id
+
+
+def test_top_level_comments_are_paged(app, client, alice):
+    post_id = create_post(client, alice)
+    ids = [comment(app, client, alice, post_id, f'Comment {i}') for i in range(3)]
+    first = client.get(f'/api/posts/{post_id}/comments?per_page=2')
+    assert [c['id'] for c in first.get_json()] == ids[:2]
+    assert (first.headers['X-Page'], first.headers['X-Has-More']) == ('1', 'true')
+    second = client.get(f'/api/posts/{post_id}/comments?per_page=2&page=2')
+    assert [c['id'] for c in second.get_json()] == ids[2:]
+    assert second.headers['X-Has-More'] == 'false'
+
+
+def test_threads_are_cut_at_max_depth_with_a_stub(app, client, alice):
+    post_id = create_post(client, alice)
+    root = comment(app, client, alice, post_id, 'Root')
+    child = comment(app, client, alice, post_id, 'Child', root)
+    grandchild = comment(app, client, alice, post_id, 'Grandchild', child)
+    comment(app, client, alice, post_id, 'Great-grandchild', grandchild)
+    [thread] = client.get(f'/api/posts/{post_id}/comments?depth=1').get_json()
+    [reply] = thread['replies']
+    assert reply['id'] == child and reply['replies'] == [] and reply['more_replies'] == 1
+    assert 'more_replies' not in thread
+
+
+def test_replies_endpoint_expands_one_thread(app, client, alice):
+    post_id = create_post(client, alice)
+    root = comment(app, client, alice, post_id, 'Root')
+    other = comment(app, client, alice, post_id, 'Other root')
+    replies = [comment(app, client, alice, post_id, f'Reply {i}', root) for i in range(3)]
+    comment(app, client, alice, post_id, 'Not in this thread', other)
+    response = client.get(f'/api/posts/{post_id}/comments/{root}/replies?per_page=2&page=2')
+    assert [c['id'] for c in response.get_json()] == replies[2:]
+    assert response.headers['X-Has-More'] == 'false'
+
+
+def test_reply_to_a_comment_of_another_post_is_rejected(app, client, alice):
+    post_id, other_post = create_post(client, alice), create_post(client, alice)
+    foreign = comment(app, client, alice, other_post, 'Elsewhere')
+    response = client.post(f'/api/posts/{post_id}/comments', json={'content': 'Hi', 'parent_id': foreign},
+                           headers=alice)
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+from models.user import db, User
+from models.post import Post
+from services.counters import increment_counter, reconcile_post_counters, reconcile_user_post_counts
+
+from conftest import create_post, get_post
+
+
+def test_like_and_unlike_keep_like_count(client, alice, bob):
+    post_id = create_post(client, alice)
+    response = client.post(f'/api/posts/{post_id}/like', headers=bob)
+    assert response.get_json()['like_count'] == 1
+    assert client.post(f'/api/posts/{post_id}/like', headers=bob).status_code == 400
+    response = client.delete(f'/api/posts/{post_id}/like', headers=bob)
+    assert response.get_json()['like_count'] == 0
+
+
+def test_comment_increments_comment_count(app, client, alice, bob):
+    post_id = create_post(client, alice)
+    client.post(f'/api/posts/{post_id}/comments', json={'content': 'Nice'}, headers=bob)
+    assert get_post(app, post_id).comment_count == 1
+
+
+def test_counter_never_goes_negative(app, client, alice):
+    post_id = create_post(client, alice)
+    with app.app_context():
+        assert increment_counter(post_id, 'like_count', -1) == 0
+        db.session.commit()
+    assert get_post(app, post_id).like_count == 0
+
+
+def test_user_post_count_follows_create_and_delete(app, client, alice):
+    post_id = create_post(client, alice)
+    create_post(client, alice)
+    client.delete(f'/api/posts/{post_id}', headers=alice)
+    with app.app_context():
+        assert User.query.filter_by(username='alice').one().post_count == 1
+
+
+def test_reconcile_repairs_drifted_counters(app, client, alice, bob):
+    post_id = create_post(client, alice)
+    client.post(f'/api/posts/{post_id}/like', headers=bob)
+    with app.app_context():
+        Post.query.filter_by(id=post_id).update({'like_count': 7, 'comment_count': 3})
+        User.query.filter_by(username='alice').update({'post_count': 0})
+        db.session.commit()
+        assert reconcile_post_counters() == (1, 1)
+        assert reconcile_user_post_counts() == 1
+    post = get_post(app, post_id)
+    assert (post.like_count, post.comment_count) == (1, 0)
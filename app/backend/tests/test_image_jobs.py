@@ -0,0 +1,106 @@
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+from conftest import create_test_app, signup_and_login
+from models.user import db, User
+from models.task import ImageJob
+from services import image_jobs
+from services.image_jobs import image_pipeline
+
+
+def jpeg_bytes(size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 80, 40)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+def upload(client, headers):
+    return client.post('/api/profile/image', data={'image': (io.BytesIO(jpeg_bytes()), 'me.jpg')}, headers=headers)
+
+
+def test_upload_is_processed_into_renditions(app, client, alice):
+    response = upload(client, alice)
+    assert response.status_code == 202
+    job = client.get(response.get_json()['status_url'], headers=alice).get_json()
+    assert job['status'] == 'done'
+    assert set(job['renditions']) >= {'full', 'thumbnail'}
+    with app.app_context():
+        assert User.query.filter_by(username='alice').one().image_url == job['image_url']
+
+
+
+def test_avatar_swap_refreshes_the_cached_user(app, client, alice):
+    client.get('/api/profile', headers=alice)
+    status_url = upload(client, alice).get_json()['status_url']
+    image_url = client.get(status_url, headers=alice).get_json()['image_url']
+    assert client.get('/api/profile', headers=alice).get_json()['image_url'] == image_url
+
+def add_queued_job(app, username, age):
+    with app.app_context():
+        user = User.query.filter_by(username=username).one()
+        job = ImageJob(id=f'stale{age}', user_id=user.id, status='queued',
+                       created_at=datetime.utcnow() - timedelta(seconds=age))
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+
+def test_status_endpoint_fails_a_job_queued_past_the_timeout(app, client, alice):
+    stale = add_queued_job(app, 'alice', image_pipeline.timeout + 5)
+    fresh = add_queued_job(app, 'alice', 1)
+    job = client.get(f'/api/profile/image/jobs/{stale}', headers=alice).get_json()
+    assert (job['status'], job['error']) == ('failed', 'Timed out waiting for processing.')
+    assert client.get(f'/api/profile/image/jobs/{fresh}', headers=alice).get_json()['status'] == 'queued'
+
+
+def test_late_completion_of_an_expired_job_is_ignored(app, client, alice):
+    stale = add_queued_job(app, 'alice', image_pipeline.timeout + 5)
+    with app.app_context():
+        assert image_pipeline.expire() == 1
+        user_id = User.query.filter_by(username='alice').one().id
+        assert image_pipeline.complete(stale, user_id, {'full': {'jpeg': jpeg_bytes()}}, {}) == []
+        assert db.session.get(ImageJob, stale).status == 'failed'
+        assert not db.session.get(User, user_id).image_url
+
+
+def exit_worker(*args):
+    os._exit(1)
+
+
+def wait_for_job(app, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        with app.app_context():
+            job = db.session.get(ImageJob, job_id)
+            status = job.status
+            db.session.remove()
+        if status != 'queued' or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+def test_pool_is_rebuilt_after_a_worker_dies(tmp_path, monkeypatch):
+    app = create_test_app(tmp_path, IMAGE_PIPELINE_BACKEND='process', IMAGE_PIPELINE_WORKERS=1)
+    client = app.test_client()
+    alice = signup_and_login(client, 'alice')
+    before = image_pipeline.stats()
+    try:
+        monkeypatch.setattr(image_jobs, 'process_profile_image', exit_worker)
+        killed = upload(client, alice).get_json()['job_id']
+        assert wait_for_job(app, killed) == 'failed'
+        monkeypatch.undo()
+
+        # The dead worker broke the pool; the next upload gets a fresh one
+        assert upload(client, alice).status_code == 202
+        with app.app_context():
+            job_id = db.session.scalar(db.select(ImageJob.id).filter(ImageJob.id != killed))
+        assert wait_for_job(app, job_id) == 'done'
+    finally:
+        image_pipeline.shutdown()
+    stats = image_pipeline.stats()
+    assert stats['pool_restarts'] == before['pool_restarts'] + 1
+    assert stats['failed'] == before['failed'] + 1
@@ -0,0 +1,41 @@
+import io
+
+from PIL import Image
+
+from services.imaging import fit, render_renditions
+
+RENDITIONS = {'full': (1024, 1024), 'mid': (480, 480), 'thumbnail': (150, 150)}
+
+
+def encoded(size=(1600, 1200), fmt='JPEG', mode='RGB'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (10, 120, 200) if mode == 'RGB' else (10, 120, 200, 128)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def opened(body):
+    return Image.open(io.BytesIO(body))
+
+
+def test_fit_keeps_aspect_ratio_and_never_upscales():
+    assert fit((1600, 1200), (1024, 1024)) == (1024, 768)
+    assert fit((1200, 1600), (150, 150)) == (112, 150)
+    assert fit((100, 50), (1024, 1024)) == (100, 50)
+
+
+def test_every_rendition_fits_its_box():
+    output = render_renditions(encoded(), RENDITIONS, ['jpeg'])
+    sizes = {name: opened(formats['jpeg']).size for name, formats in output.items()}
+    assert sizes == {'full': (1024, 768), 'mid': (480, 360), 'thumbnail': (150, 112)}
+
+
+def test_png_with_alpha_is_encoded_as_rgb_jpeg():
+    output = render_renditions(encoded(fmt='PNG', mode='RGBA'), {'thumbnail': (150, 150)}, ['jpeg'])
+    image = opened(output['thumbnail']['jpeg'])
+    assert (image.format, image.mode) == ('JPEG', 'RGB')
+
+
+def test_timings_cover_decode_resize_and_encode():
+    timings = {}
+    render_renditions(encoded(), RENDITIONS, ['jpeg'], timings)
+    assert {'decode', 'resize_full', 'resize_thumbnail', 'encode_mid_jpeg'} <= set(timings)
@@ -0,0 +1,65 @@
+from conftest import create_test_app, signup_and_login
+from services.ratelimit import TokenBucket
+
+
+def login(client, password='pw', **identifier):
+    return client.post('/api/login', json={'password': password, **identifier})
+
+
+def test_login_by_username_or_email_ignores_case(client):
+    signup_and_login(client, 'Alice')
+    assert login(client, username='alice').status_code == 200
+    assert login(client, username='  ALICE ').status_code == 200
+    response = login(client, email='ALICE@Example.com')
+    assert response.status_code == 200
+    assert response.get_json()['user']['username'] == 'Alice'
+    assert login(client, username='alice', password='wrong').status_code == 401
+
+
+def test_signup_rejects_case_insensitive_duplicates_and_at_sign(client):
+    signup_and_login(client, 'alice')
+    response = client.post('/api/signup', json={'username': 'ALICE', 'email': 'other@example.com', 'password': 'pw'})
+    assert response.status_code == 400
+    response = client.post('/api/signup', json={'username': 'alice2', 'email': 'Alice@Example.com', 'password': 'pw'})
+    assert response.status_code == 400
+    response = client.post('/api/signup', json={'username': 'a@b', 'email': 'ab@example.com', 'password': 'pw'})
+    assert response.status_code == 400
+
+
+def test_login_attempts_are_limited_per_identifier(tmp_path):
+    app = create_test_app(tmp_path, LOGIN_RATE_PER_IDENTIFIER=(2, 60))
+    client = app.test_client()
+    signup_and_login(client, 'alice')
+    # signup_and_login already spent one attempt
+    assert login(client, username='ALICE', password='wrong').status_code == 401
+    response = login(client, username='alice')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+    # Other identifiers keep their own budget
+    signup_and_login(client, 'bob')
+    assert login(client, username='bob').status_code == 200
+
+
+def test_login_attempts_are_limited_per_ip(tmp_path):
+    app = create_test_app(tmp_path, LOGIN_RATE_PER_IP=(2, 60))
+    client = app.test_client()
+    assert login(client, username='alice').status_code == 401
+    assert login(client, username='bob').status_code == 401
+    assert login(client, username='carol').status_code == 429
+    other = {'REMOTE_ADDR': '10.0.0.2'}
+    assert client.post('/api/login', json={'username': 'carol', 'password': 'pw'},
+                       environ_base=other).status_code == 401
+
+
+def test_token_bucket_refills_and_evicts():
+    bucket = TokenBucket(rate=1.0, burst=2, max_keys=2)
+    assert bucket.take('a', now=0) == 0
+    assert bucket.take('a', now=0) == 0
+    assert bucket.take('a', now=0) == 1.0
+    assert bucket.take('a', now=1.5) == 0
+    bucket.take('b', now=2)
+    bucket.take('c', now=2)
+    assert len(bucket) == 2
+    # 'a' was least recently used, so it starts over with a full burst
+    assert bucket.take('a', now=2) == 0
+    assert bucket.take('a', now=2) == 0
@@ -0,0 +1,70 @@
+import hashlib
+import io
+import os
+
+from models.user import db
+from models.media import MediaBlob
+from models.post import Post
+from services.storage import media_store, reconcile_media_refs
+
+from conftest import get_post
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+
+
+def post_with_png(client, headers, body=PNG):
+    response = client.post('/api/posts', data={'title': 'Pic', 'content': 'Body', 'media': (io.BytesIO(body), 'a.png')},
+                           headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['id']
+
+
+def blob(app, key):
+    with app.app_context():
+        return db.session.get(MediaBlob, key)
+
+
+def stored_path(app, key):
+    return os.path.join(app.config['MEDIA_STORAGE_ROOT'], key)
+
+
+def test_identical_uploads_share_one_referenced_blob(app, client, alice, bob):
+    first, second = post_with_png(client, alice), post_with_png(client, bob)
+    key = get_post(app, first).media_key
+    assert key == get_post(app, second).media_key
+    digest = hashlib.sha256(PNG).hexdigest()
+    assert key == f'{digest[:2]}/{digest[2:4]}/{digest}.png'
+    assert blob(app, key).ref_count == 2
+    assert os.path.exists(stored_path(app, key))
+
+
+def test_blob_is_collected_when_its_last_post_is_deleted(app, client, alice, bob):
+    first, second = post_with_png(client, alice), post_with_png(client, bob)
+    key = get_post(app, first).media_key
+    client.delete(f'/api/posts/{first}', headers=alice)
+    assert blob(app, key).ref_count == 1 and os.path.exists(stored_path(app, key))
+    client.delete(f'/api/posts/{second}', headers=bob)
+    assert blob(app, key) is None
+    assert not os.path.exists(stored_path(app, key))
+
+
+def test_release_never_drops_below_zero(app, client, alice):
+    key = get_post(app, post_with_png(client, alice)).media_key
+    with app.app_context():
+        media_store.release([key, key])
+        db.session.commit()
+    assert blob(app, key).ref_count == 1
+
+
+def test_reconcile_repairs_reference_counts(app, client, alice):
+    post_id = post_with_png(client, alice)
+    key = get_post(app, post_id).media_key
+    with app.app_context():
+        MediaBlob.query.update({MediaBlob.ref_count: 5})
+        db.session.commit()
+        assert reconcile_media_refs() == 1
+        Post.query.filter_by(id=post_id).delete()
+        db.session.commit()
+        assert reconcile_media_refs() == 1
+        assert media_store.collect() == 1
+    assert not os.path.exists(stored_path(app, key))
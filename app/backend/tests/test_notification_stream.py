@@ -0,0 +1,49 @@
+import pytest
+
+from models.user import db, User
+from services.notifications import notify_users
+
+
+@pytest.fixture
+def short_streams(app):
+    # End each stream right after the replay so the response body can be read whole
+    app.config.update(NOTIFICATION_STREAM_MAX_DURATION=0, NOTIFICATION_STREAM_HEARTBEAT=0.01)
+
+
+def stream_token(client, headers):
+    response = client.post('/api/notifications/stream-token', headers=headers)
+    assert response.status_code == 200
+    return response.get_json()['token']
+
+
+def test_stream_opens_with_a_stream_token_and_replays_missed_events(app, client, bob, short_streams):
+    with app.app_context():
+        bob_id = User.query.filter_by(username='bob').one().id
+        notify_users([bob_id], 'Seen')
+        notify_users([bob_id], 'Missed')
+        db.session.commit()
+    response = client.get('/api/notifications/stream', query_string={'token': stream_token(client, bob)},
+                          headers={'Last-Event-ID': '1'})
+    assert response.status_code == 200 and response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert 'id: 2' in body and 'Missed' in body and 'Seen' not in body
+
+
+def test_stream_still_accepts_the_authorization_header(client, bob, short_streams):
+    assert client.get('/api/notifications/stream', headers=bob).status_code == 200
+
+
+def test_access_tokens_are_not_accepted_in_the_url(client, bob):
+    access_token = bob['Authorization'].split()[1]
+    assert client.get('/api/notifications/stream', query_string={'jwt': access_token}).status_code == 401
+    assert client.get('/api/notifications/stream', query_string={'token': access_token}).status_code == 401
+
+
+def test_stream_tokens_expire(app, client, bob):
+    token = stream_token(client, bob)
+    app.config['NOTIFICATION_STREAM_TOKEN_TTL'] = -1
+    assert client.get('/api/notifications/stream', query_string={'token': token}).status_code == 401
+
+
+def test_stream_token_requires_login(client):
+    assert client.post('/api/notifications/stream-token').status_code == 401
@@ -0,0 +1,38 @@
+from models.user import db, User
+from services.notifications import notify_users
+
+
+def notify(app, username, count):
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        for i in range(count):
+            notify_users([user_id], f'Message {i}')
+        db.session.commit()
+
+
+def test_inbox_pages_by_next_cursor(app, client, bob):
+    notify(app, 'bob', 5)
+    messages, cursor = [], None
+    while cursor != '':
+        response = client.get('/api/notifications', query_string={'per_page': 2, 'cursor': cursor or ''},
+                              headers=bob)
+        messages.extend(n['message'] for n in response.get_json())
+        cursor = response.headers['X-Next-Cursor']
+    assert messages == [f'Message {i}' for i in reversed(range(5))]
+
+
+def test_read_state_updates_the_unread_counter(app, client, bob):
+    notify(app, 'bob', 3)
+    first = client.get('/api/notifications', headers=bob).get_json()[0]['id']
+    client.patch(f'/api/notifications/{first}/read', headers=bob)
+    assert client.get('/api/notifications/unread-count', headers=bob).get_json() == {'unread': 2}
+    assert len(client.get('/api/notifications?unread=true', headers=bob).get_json()) == 2
+    response = client.patch('/api/notifications', json={'all': True}, headers=bob)
+    assert response.get_json() == {'updated': 2, 'unread': 0}
+    response = client.patch('/api/notifications', json={'ids': [first], 'is_read': False}, headers=bob)
+    assert response.get_json() == {'updated': 1, 'unread': 1}
+
+
+def test_bulk_update_validates_ids(client, bob):
+    assert client.patch('/api/notifications', json={'ids': 'all'}, headers=bob).status_code == 400
+    assert client.patch('/api/notifications', json={'ids': [1], 'is_read': 'yes'}, headers=bob).status_code == 400
@@ -0,0 +1,44 @@
+from conftest import create_post
+
+
+def walk(client, url):
+    ids, cursor = [], ''
+    while cursor is not None:
+        data = client.get(f'{url}&cursor={cursor}').get_json()
+        ids.extend(post['id'] for post in data['posts'])
+        cursor = data['next_cursor']
+    return ids
+
+
+def test_cursor_pages_cover_every_post_once(client, alice):
+    # Posts created back to back can share created_at; the id breaks the tie
+    post_ids = [create_post(client, alice, title=f'Post {i}') for i in range(7)]
+    assert walk(client, '/api/posts?per_page=3') == sorted(post_ids, reverse=True)
+
+
+def test_cursor_mode_skips_the_count(client, alice):
+    create_post(client, alice)
+    data = client.get('/api/posts?cursor=').get_json()
+    assert 'total' not in data and data['next_cursor'] is None
+    assert client.get('/api/posts?cursor=&include_total=true').get_json()['total'] == 1
+
+
+def test_offset_mode_is_unchanged(client, alice):
+    for i in range(3):
+        create_post(client, alice, title=f'Post {i}')
+    data = client.get('/api/posts?page=2&per_page=2').get_json()
+    assert (data['total'], data['page'], data['pages'], len(data['posts'])) == (3, 2, 2, 1)
+    assert client.get('/api/posts?page=1&per_page=2&include_total=false').get_json()['total'] is None
+
+
+def test_per_page_is_capped(app, client, alice):
+    app.config['POSTS_MAX_PER_PAGE'] = 2
+    for i in range(3):
+        create_post(client, alice, title=f'Post {i}')
+    assert client.get('/api/posts?per_page=1000&cursor=').get_json()['per_page'] == 2
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/posts?cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor.'}
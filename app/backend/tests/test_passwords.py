@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from conftest import signup_and_login
+from models.user import db, User
+from services.passwords import HashingUnavailable, PasswordHasher, password_hasher
+
+
+def pool(**config):
+    app = Flask(__name__)
+    app.config.update(PASSWORD_HASH_BACKEND='thread', PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', **config)
+    return PasswordHasher(app)
+
+
+def test_hash_and_verify():
+    hasher = pool()
+    try:
+        pwhash = hasher.hash('secret')
+        assert hasher.verify(pwhash, 'secret')
+        assert not hasher.verify(pwhash, 'wrong')
+        assert not hasher.needs_rehash(pwhash)
+        assert hasher.stats()['completed'] == 3
+    finally:
+        hasher.shutdown()
+
+
+def test_refuses_work_beyond_the_queue():
+    hasher = pool(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0, PASSWORD_HASH_RETRY_AFTER=3)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    worker = threading.Thread(target=hasher._run, args=(slow,))
+    worker.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(HashingUnavailable) as excinfo:
+            hasher.hash('secret')
+        assert excinfo.value.status == 429
+        assert excinfo.value.retry_after == 3
+        assert hasher.stats()['rejected'] == 1
+        assert hasher.stats()['in_flight'] == 1
+    finally:
+        release.set()
+        worker.join()
+        hasher.shutdown()
+    assert hasher.stats()['in_flight'] == 0
+    assert hasher.stats()['peak_in_flight'] == 1
+
+
+def test_slow_hash_times_out_with_503():
+    hasher = pool(PASSWORD_HASH_TIMEOUT=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(HashingUnavailable) as excinfo:
+            hasher._run(release.wait, 5)
+        assert excinfo.value.status == 503
+        assert hasher.stats()['timed_out'] == 1
+    finally:
+        release.set()
+        hasher.shutdown()
+
+
+def test_saturated_pool_answers_login_with_retry_after(app, client, monkeypatch):
+    signup_and_login(client, 'alice')
+
+    def unavailable(*args):
+        raise HashingUnavailable('Sign-in is temporarily unavailable, try again shortly.', 503, 2)
+
+    monkeypatch.setattr(password_hasher, '_run', unavailable)
+    response = client.post('/api/login', json={'username': 'alice', 'password': 'pw'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
+
+
+def test_login_rehashes_with_current_parameters(app, client):
+    signup_and_login(client, 'alice')
+    with app.app_context():
+        old_hash = db.session.scalar(db.select(User.password_hash).filter_by(username='alice'))
+    assert old_hash.startswith('pbkdf2:sha256:1000$')
+    before = password_hasher.stats()['rehashed']
+
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+    password_hasher.init_app(app)
+    response = client.post('/api/login', json={'username': 'alice', 'password': 'pw'})
+    assert response.status_code == 200
+    with app.app_context():
+        new_hash = db.session.scalar(db.select(User.password_hash).filter_by(username='alice'))
+    assert new_hash.startswith('pbkdf2:sha256:2000$')
+    assert password_hasher.stats()['rehashed'] == before + 1
+
+    # Already current: the next login leaves the hash alone
+    client.post('/api/login', json={'username': 'alice', 'password': 'pw'})
+    assert password_hasher.stats()['rehashed'] == before + 1
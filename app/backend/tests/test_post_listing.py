@@ -0,0 +1,33 @@
+from conftest import create_post, signup_and_login
+
+
+def test_listing_reports_engagement_counts(client, alice, bob):
+    post_id = create_post(client, alice)
+    create_post(client, alice, title='Quiet')
+    client.post(f'/api/posts/{post_id}/like', headers=bob)
+    client.post(f'/api/posts/{post_id}/comments', json={'content': 'Nice'}, headers=bob)
+    client.post(f'/api/posts/{post_id}/comments', json={'content': 'Again'}, headers=alice)
+
+    posts = {p['id']: p for p in client.get('/api/posts', headers=alice).get_json()['posts']}
+    assert posts[post_id]['like_count'] == 1
+    assert posts[post_id]['comment_count'] == 2
+    assert [p['like_count'] for p in posts.values() if p['id'] != post_id] == [0]
+
+
+def test_listing_query_count_does_not_grow_with_engagement(client, alice, count_queries):
+    post_ids = [create_post(client, alice, title=f'Post {i}') for i in range(3)]
+
+    def listing_queries():
+        with count_queries() as queries:
+            assert client.get('/api/posts', headers=alice).status_code == 200
+        return len(queries)
+
+    baseline = listing_queries()
+    for i in range(4):
+        headers = signup_and_login(client, f'fan{i}')
+        for post_id in post_ids:
+            client.post(f'/api/posts/{post_id}/like', headers=headers)
+            client.post(f'/api/posts/{post_id}/comments', json={'content': 'hi'}, headers=headers)
+    for i in range(5):
+        create_post(client, alice, title=f'More {i}')
+    assert listing_queries() == baseline
@@ -0,0 +1,53 @@
+from services.cache import LocalCacheBackend
+
+from conftest import create_post
+
+
+def test_anonymous_listing_is_cached_until_a_write(client, alice, bob):
+    post_id = create_post(client, alice)
+    assert client.get('/api/posts?page=1').headers['X-Cache'] == 'MISS'
+    assert client.get('/api/posts?page=1').headers['X-Cache'] == 'HIT'
+    client.post(f'/api/posts/{post_id}/like', headers=bob)
+    response = client.get('/api/posts?page=1')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['posts'][0]['like_count'] == 1
+
+
+def test_cache_key_ignores_argument_order_and_unrelated_args(client, alice):
+    create_post(client, alice)
+    client.get('/api/posts?page=1&per_page=5')
+    assert client.get('/api/posts?per_page=5&utm_source=x&page=1').headers['X-Cache'] == 'HIT'
+    assert client.get('/api/posts?per_page=6&page=1').headers['X-Cache'] == 'MISS'
+
+
+def test_authenticated_requests_bypass_the_cache(client, alice):
+    client.get('/api/posts')
+    assert 'X-Cache' not in client.get('/api/posts', headers=alice).headers
+
+
+def test_cached_etag_answers_304(client, alice):
+    create_post(client, alice)
+    etag = client.get('/api/posts').headers['ETag']
+    response = client.get('/api/posts', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.get_data() == b''
+    create_post(client, alice)
+    assert client.get('/api/posts', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = LocalCacheBackend(max_entries=2)
+    backend.set('a', b'1')
+    backend.set('b', b'2')
+    backend.get('a')
+    backend.set('c', b'3')
+    assert (backend.get('a'), backend.get('b'), backend.get('c')) == (b'1', None, b'3')
+    assert backend.evictions == 1
+
+
+def test_local_backend_expires_entries(monkeypatch):
+    backend = LocalCacheBackend()
+    now = [100.0]
+    monkeypatch.setattr('services.cache.time.monotonic', lambda: now[0])
+    backend.set('a', b'1', ttl=30)
+    now[0] += 31
+    assert backend.get('a') is None
@@ -0,0 +1,32 @@
+import gzip
+
+from conftest import create_post
+
+
+def test_large_json_is_gzipped_when_accepted(client, alice):
+    create_post(client, alice, content='lorem ipsum ' * 200)
+    response = client.get('/api/posts', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'lorem ipsum' in gzip.decompress(response.get_data())
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert 'Content-Encoding' not in client.get('/api/posts').headers
+
+
+def test_small_bodies_are_sent_as_is(client, alice):
+    create_post(client, alice, content='short')
+    assert 'Content-Encoding' not in client.get('/api/posts?fields=id', headers={'Accept-Encoding': 'gzip'}).headers
+
+
+def test_versioned_route_answers_304_without_running_the_view(client, alice, count_queries):
+    post_id = create_post(client, alice)
+    etag = client.get(f'/api/posts/{post_id}/comments').headers['ETag']
+    with count_queries() as counter:
+        response = client.get(f'/api/posts/{post_id}/comments', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and len(counter) == 0
+    client.post(f'/api/posts/{post_id}/comments', json={'content': 'New'}, headers=alice)
+    assert client.get(f'/api/posts/{post_id}/comments', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_other_gets_revalidate_on_a_body_hash(client, alice):
+    etag = client.get('/api/notifications', headers=alice).headers['ETag']
+    assert client.get('/api/notifications', headers={**alice, 'If-None-Match': etag}).status_code == 304
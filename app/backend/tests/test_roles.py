@@ -0,0 +1,113 @@
+from commands import set_admin_command
+from conftest import create_test_app, make_admin, signup_and_login
+from models.user import db, RoleRevocation, User
+from services.identity import role_revocations
+
+
+def user_id(app, username):
+    with app.app_context():
+        return db.session.scalar(db.select(User.id).filter_by(username=username))
+
+
+def set_roles(client, headers, target, is_admin):
+    return client.put(f'/api/admin/users/{target}/roles', json={'is_admin': is_admin}, headers=headers)
+
+
+def test_demoted_admin_is_refused_with_their_old_token(app, client, alice, bob):
+    make_admin(app, 'alice')
+    make_admin(app, 'bob')
+    alice = signup_and_login(client, 'alice')
+    bob = signup_and_login(client, 'bob')
+    assert client.get('/api/admin/users', headers=bob).status_code == 200
+
+    response = set_roles(client, alice, user_id(app, 'bob'), False)
+    assert response.status_code == 200
+    assert response.get_json()['roles'] == []
+    assert client.get('/api/admin/users', headers=bob).status_code == 403
+
+
+def test_promoted_user_is_admitted_with_their_old_token(app, client, alice, bob):
+    make_admin(app, 'alice')
+    alice = signup_and_login(client, 'alice')
+    assert client.get('/api/admin/users', headers=bob).status_code == 403
+    assert set_roles(client, alice, user_id(app, 'bob'), True).status_code == 200
+    assert client.get('/api/admin/users', headers=bob).status_code == 200
+
+
+def test_revocations_are_persisted_and_reloaded(app, client, alice, bob):
+    make_admin(app, 'alice')
+    make_admin(app, 'bob')
+    alice = signup_and_login(client, 'alice')
+    bob = signup_and_login(client, 'bob')
+    set_roles(client, alice, user_id(app, 'bob'), False)
+    with app.app_context():
+        row = db.session.get(RoleRevocation, user_id(app, 'bob'))
+        assert row.roles == ''
+
+    # Another worker only knows the table
+    role_revocations.clear()
+    before = role_revocations.stats()['syncs']
+    assert client.get('/api/admin/users', headers=bob).status_code == 403
+    assert role_revocations.stats()['syncs'] == before + 1
+
+
+def test_unpersisted_revocations_stay_in_memory(tmp_path):
+    app = create_test_app(tmp_path, ROLE_REVOCATIONS_PERSIST=False)
+    client = app.test_client()
+    signup_and_login(client, 'alice')
+    make_admin(app, 'alice')
+    alice = signup_and_login(client, 'alice')
+    bob = signup_and_login(client, 'bob')
+    assert set_roles(client, alice, user_id(app, 'bob'), True).status_code == 200
+    assert client.get('/api/admin/users', headers=bob).status_code == 200
+    with app.app_context():
+        assert RoleRevocation.query.count() == 0
+    role_revocations.clear()
+
+
+def test_rolled_back_change_records_nothing(app, client, bob):
+    with app.app_context():
+        user = User.query.filter_by(username='bob').first()
+        user.is_admin = True
+        role_revocations.revoke(user)
+        db.session.rollback()
+    assert role_revocations.stats()['entries'] == 0
+    assert client.get('/api/admin/users', headers=bob).status_code == 403
+
+
+def test_only_admins_set_roles(app, client, alice, bob):
+    assert set_roles(client, bob, user_id(app, 'alice'), True).status_code == 403
+    make_admin(app, 'alice')
+    alice = signup_and_login(client, 'alice')
+    response = client.put(f'/api/admin/users/{user_id(app, "bob")}/roles', json={'is_admin': 'yes'}, headers=alice)
+    assert response.status_code == 400
+    assert set_roles(client, alice, 9999, True).status_code == 404
+
+
+def test_admin_metrics_requires_admin(app, client, alice):
+    assert client.get('/api/admin/metrics', headers=alice).status_code == 403
+    make_admin(app, 'alice')
+    # The role is read from the token, so a fresh login picks it up
+    response = client.post('/api/login', json={'username': 'alice', 'password': 'pw'})
+    headers = {'Authorization': 'Bearer ' + response.get_json()['token']}
+    metrics = client.get('/api/admin/metrics', headers=headers).get_json()
+    assert {'view_buffer', 'response_cache', 'password_hasher'} <= set(metrics)
+
+
+def test_set_admin_command_applies_to_existing_tokens(app, client, bob):
+    runner = app.test_cli_runner()
+    with app.app_context():
+        result = runner.invoke(set_admin_command, ['BOB'])
+    assert result.exit_code == 0, result.output
+    assert 'now an admin' in result.output
+    assert client.get('/api/admin/users', headers=bob).status_code == 200
+
+    with app.app_context():
+        result = runner.invoke(set_admin_command, ['bob', '--revoke'])
+    assert result.exit_code == 0, result.output
+    assert client.get('/api/admin/users', headers=bob).status_code == 403
+
+    with app.app_context():
+        result = runner.invoke(set_admin_command, ['nobody'])
+    assert result.exit_code != 0
+    assert 'No user named nobody' in result.output
@@ -0,0 +1,52 @@
+import sqlalchemy as sa
+
+from models.user import db
+from services.search import LikeSearchBackend, get_search_backend
+
+from conftest import create_post, get_post
+
+
+def search(client, q, **args):
+    return client.get('/api/posts/search', query_string={'q': q, **args}).get_json()['posts']
+
+
+def test_search_ranks_title_hits_first(client, alice):
+    body_hit = create_post(client, alice, title='Weekend', content='Notes on sourdough starters')
+    title_hit = create_post(client, alice, title='Sourdough basics', content='Flour and water')
+    create_post(client, alice, title='Unrelated', content='Nothing here')
+    assert [post['id'] for post in search(client, 'sourdough')] == [title_hit, body_hit]
+
+
+def test_index_follows_edits_and_deletes(client, alice):
+    post_id = create_post(client, alice, title='Draft', content='about kayaks')
+    client.put(f'/api/posts/{post_id}', data={'content': 'about canoes'}, headers=alice)
+    assert search(client, 'kayaks') == []
+    assert [post['id'] for post in search(client, 'canoes')] == [post_id]
+    client.delete(f'/api/posts/{post_id}', headers=alice)
+    assert search(client, 'canoes') == []
+
+
+def test_snippets_escape_post_content(client, alice):
+    create_post(client, alice, content='<img src=x onerror=alert(1)> kayak trip')
+    snippet = search(client, 'kayak')[0]['snippet']
+    assert '<img' not in snippet
+    assert '&lt;img' in snippet and '<mark>kayak</mark>' in snippet
+
+
+def test_like_backend_snippets_escape_post_content(app, client, alice):
+    post_id = create_post(client, alice, content='<script>x</script> kayak trip')
+    post = get_post(app, post_id)
+    with app.app_context():
+        snippet = LikeSearchBackend().snippets('kayak', [post])[post_id]
+    assert snippet == '&lt;script&gt;x&lt;/script&gt; <mark>kayak</mark> trip'
+
+
+def test_rebuild_restores_a_cleared_index(app, client, alice):
+    post_id = create_post(client, alice, content='about kayaks')
+    with app.app_context():
+        db.session.execute(sa.text("INSERT INTO posts_fts(posts_fts) VALUES ('delete-all')"))
+        db.session.commit()
+    assert search(client, 'kayaks') == []
+    with app.app_context():
+        get_search_backend().rebuild()
+    assert [post['id'] for post in search(client, 'kayaks')] == [post_id]
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from models.user import db, User
+from models.post import Post
+from services.notifications import notify_users
+from services.serializers import InvalidFields, OrjsonProvider, post_serializer
+
+from conftest import create_post
+
+
+def test_rows_and_orm_objects_dump_alike(app, client, alice):
+    post_id = create_post(client, alice, title='Same', tags='go')
+    with app.app_context():
+        row = post_serializer.query(Post.query, Post.media_key).filter(Post.id == post_id).one()
+        assert post_serializer.dump(row) == post_serializer.dump(db.session.get(Post, post_id))
+        assert post_serializer.dump(row)['created_at'] == db.session.get(Post, post_id).created_at.isoformat()
+
+
+def test_projection_keeps_declaration_order(app, client, alice):
+    create_post(client, alice, title='Projected')
+    serializer = post_serializer.project({'title', 'id'})
+    with app.app_context():
+        assert list(serializer.dump(serializer.query(Post.query).one())) == ['id', 'title']
+        assert serializer.project({'title'}).dump(Post.query.one()) == {'title': 'Projected'}
+
+
+def test_projection_rejects_unknown_or_empty_fields():
+    with pytest.raises(InvalidFields):
+        post_serializer.project({'id', 'password'})
+    with pytest.raises(InvalidFields):
+        post_serializer.project(set())
+
+
+def test_notify_users_stages_each_recipients_row(app, client, alice, bob, monkeypatch):
+    staged = []
+    monkeypatch.setattr('services.notifications.notification_hub.stage', lambda session, events: staged.extend(events))
+    with app.app_context():
+        bob_id = User.query.filter_by(username='bob').one().id
+        notify_users([bob_id], 'Hello')
+        db.session.commit()
+    [(user_id, event_id, kind, payload)] = staged
+    assert (user_id, kind, payload['message'], payload['id']) == (bob_id, 'notification', 'Hello', event_id)
+
+
+@pytest.mark.parametrize('kwargs', [{'sort_keys': False}, {'indent': 2}, {'default': repr}])
+def test_orjson_provider_honours_stdlib_dumps_arguments(app, kwargs):
+    obj = {'b': 1, 'a': [2, 3]} if 'default' not in kwargs else {'a': {1, 2}}
+    assert OrjsonProvider(app).dumps(obj, **kwargs) == DefaultJSONProvider(app).dumps(obj, **kwargs)
+
+
+def test_orjson_provider_matches_stdlib_output(app):
+    pytest.importorskip('orjson')
+    obj = {'b': [1, 2.5, None], 'a': 'é', 'c': {'z': True, 'y': 'x'}}
+    assert json.loads(OrjsonProvider(app).dumps(obj)) == json.loads(DefaultJSONProvider(app).dumps(obj))
+    assert list(json.loads(OrjsonProvider(app).dumps(obj))) == ['a', 'b', 'c']
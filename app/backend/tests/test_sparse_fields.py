@@ -0,0 +1,26 @@
+from conftest import create_post
+
+
+def test_fields_limit_the_listing(client, alice):
+    create_post(client, alice, title='Sparse', content='x' * 50)
+    [post] = client.get('/api/posts?fields=title,id').get_json()['posts']
+    assert post == {'id': 1, 'title': 'Sparse'}
+
+
+def test_preview_len_truncates_content(client, alice):
+    create_post(client, alice, content='abcdefghij')
+    [post] = client.get('/api/posts?fields=content&preview_len=4').get_json()['posts']
+    assert post == {'content': 'abcd'}
+
+
+def test_snippet_only_search_falls_back_to_ids(client, alice):
+    post_id = create_post(client, alice, content='a kayak trip')
+    response = client.get('/api/posts/search?q=kayak&fields=snippet')
+    assert response.status_code == 200
+    assert response.get_json()['posts'] == [{'id': post_id, 'snippet': 'a <mark>kayak</mark> trip'}]
+
+
+def test_invalid_fields_are_rejected(client):
+    assert client.get('/api/posts?fields=password').status_code == 400
+    assert client.get('/api/posts?fields=snippet').status_code == 400
+    assert client.get('/api/posts?preview_len=0').status_code == 400
@@ -0,0 +1,46 @@
+from models.user import db
+from models.post import Tag
+from services.tags import parse_tags, reconcile_tag_counts
+
+from conftest import create_post
+
+
+def tagged(client, tag, mode='any'):
+    data = client.get('/api/posts', query_string={'tag': tag, 'tag_mode': mode}).get_json()
+    return sorted(post['id'] for post in data['posts'])
+
+
+def tag_counts(client):
+    return {tag['name']: tag['post_count'] for tag in client.get('/api/tags').get_json()}
+
+
+def test_parse_tags_normalizes_and_dedupes():
+    assert parse_tags(' Python, #go,python,, GO ') == ['python', 'go']
+
+
+def test_tag_filter_matches_whole_tags(client, alice):
+    go = create_post(client, alice, tags='go')
+    django = create_post(client, alice, tags='django,python')
+    both = create_post(client, alice, tags='go,python')
+    assert tagged(client, 'go') == [go, both]
+    assert tagged(client, 'go,python') == [go, django, both]
+    assert tagged(client, 'go,python', mode='all') == [both]
+
+
+def test_tag_counts_follow_edits_and_deletes(client, alice):
+    post_id = create_post(client, alice, tags='go,python')
+    create_post(client, alice, tags='python')
+    assert tag_counts(client) == {'python': 2, 'go': 1}
+    client.put(f'/api/posts/{post_id}', data={'tags': 'rust'}, headers=alice)
+    assert tag_counts(client) == {'python': 1, 'rust': 1}
+    client.delete(f'/api/posts/{post_id}', headers=alice)
+    assert tag_counts(client) == {'python': 1}
+
+
+def test_reconcile_repairs_tag_counts(app, client, alice):
+    create_post(client, alice, tags='go')
+    with app.app_context():
+        Tag.query.update({Tag.post_count: 5})
+        db.session.commit()
+        assert reconcile_tag_counts() == 1
+    assert tag_counts(client) == {'go': 1}
@@ -0,0 +1,66 @@
+import json
+
+from models.user import db
+from models.task import BackgroundTask
+from services.tasks import TaskQueue
+
+from conftest import create_post
+
+
+def test_mentions_notify_each_mentioned_user_once(client, alice, bob):
+    create_post(client, alice, content='Hi @bob, and @bob again; @alice and @nobody')
+    assert client.get('/api/notifications/unread-count', headers=bob).get_json() == {'unread': 1}
+    assert client.get('/api/notifications/unread-count', headers=alice).get_json() == {'unread': 0}
+    messages = [n['message'] for n in client.get('/api/notifications', headers=bob).get_json()]
+    assert messages == ['You were mentioned in a post.']
+
+
+def test_mention_fan_out_resolves_usernames_in_one_query(app, client, alice, bob, count_queries):
+    with count_queries() as counter:
+        create_post(client, alice, content='@bob @carol @dave @erin')
+    user_lookups = [s for s in counter.statements if 'FROM users' in s and 'username' in s]
+    assert len(user_lookups) == 1
+
+
+def database_queue(app, monkeypatch):
+    app.config.update(TASK_QUEUE_BACKEND='database', TASK_QUEUE_MAX_ATTEMPTS=2)
+    queue = TaskQueue(app)
+    # Drain on the test thread instead of the poller
+    monkeypatch.setattr(queue.backend.poller, 'ensure_started', lambda: None)
+    monkeypatch.setattr(queue.backend.poller, 'wake', lambda: None)
+    return queue
+
+
+def test_database_backend_persists_and_runs_tasks(app, monkeypatch):
+    queue = database_queue(app, monkeypatch)
+    ran = []
+    queue.task('record')(lambda value: ran.append(value))
+    with app.app_context():
+        queue.enqueue('record', value=42)
+        assert [json.loads(task.payload) for task in BackgroundTask.query] == [{'value': 42}]
+    queue.backend.drain()
+    assert ran == [42]
+    with app.app_context():
+        assert BackgroundTask.query.count() == 0
+
+
+def test_database_backend_gives_up_after_max_attempts(app, monkeypatch):
+    queue = database_queue(app, monkeypatch)
+
+    @queue.task('explode')
+    def explode():
+        raise RuntimeError('boom')
+
+    with app.app_context():
+        queue.enqueue('explode')
+    queue.backend.drain()
+    with app.app_context():
+        task = BackgroundTask.query.one()
+        assert (task.status, task.attempts) == ('pending', 1)
+        task.run_after = task.created_at  # skip the backoff
+        db.session.commit()
+    queue.backend.drain()
+    with app.app_context():
+        task = BackgroundTask.query.one()
+        assert (task.status, task.attempts) == ('failed', 2)
+        assert 'boom' in task.last_error
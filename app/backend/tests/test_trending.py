@@ -0,0 +1,63 @@
+import threading
+import time
+
+from services.trending import trending_leaderboard
+
+from conftest import create_post
+
+
+def test_trending_ranks_by_engagement(client, alice, bob):
+    quiet = create_post(client, alice, title='Quiet')
+    liked = create_post(client, alice, title='Liked', tags='news')
+    client.post(f'/api/posts/{liked}/like', headers=bob)
+    client.get(f'/api/posts/{quiet}')
+    ranked = client.get('/api/posts/trending?k=2').get_json()
+    assert [post['id'] for post in ranked] == [liked, quiet]
+    assert [post['id'] for post in client.get('/api/posts/trending?tag=news').get_json()] == [liked]
+
+
+def test_deleted_post_leaves_the_board(app, client, alice):
+    post_id = create_post(client, alice)
+    client.get(f'/api/posts/{post_id}')
+    assert [post['id'] for post in client.get('/api/posts/trending').get_json()] == [post_id]
+    client.delete(f'/api/posts/{post_id}', headers=alice)
+    assert trending_leaderboard.top() == []
+
+
+def test_reads_serve_the_previous_board_while_the_worker_refreshes(app, monkeypatch):
+    trending_leaderboard.init_app(app)
+    built_on = []
+    monkeypatch.setattr(trending_leaderboard, '_build', lambda: built_on.append(threading.current_thread()) or {})
+    monkeypatch.setattr(trending_leaderboard._worker, 'ensure_started', lambda: None)
+    woken = []
+    monkeypatch.setattr(trending_leaderboard._worker, 'wake', lambda: woken.append(True))
+    trending_leaderboard._boards = {('all', None): [(7, 1.0)]}
+    trending_leaderboard._built_at = time.monotonic() - app.config['TRENDING_TTL'] - 1
+
+    assert trending_leaderboard.top() == [(7, 1.0)]
+    assert woken and not built_on
+
+
+def test_cold_start_builds_once_before_serving(app, monkeypatch):
+    trending_leaderboard.init_app(app)
+    monkeypatch.setattr(trending_leaderboard._worker, 'ensure_started', lambda: None)
+    builds = []
+    monkeypatch.setattr(trending_leaderboard, '_build', lambda: builds.append(1) or {('all', None): [(3, 2.0)]})
+
+    assert trending_leaderboard.top() == [(3, 2.0)]
+    assert trending_leaderboard.top() == [(3, 2.0)]
+    assert len(builds) == 1
+
+
+def test_failed_refresh_keeps_the_previous_board(app, monkeypatch):
+    trending_leaderboard.init_app(app)
+    trending_leaderboard._boards = {('all', None): [(7, 1.0)]}
+    failures = trending_leaderboard.stats()['failures']
+
+    def broken():
+        raise RuntimeError('database went away')
+
+    monkeypatch.setattr(trending_leaderboard, '_build', broken)
+    trending_leaderboard.refresh()
+    assert trending_leaderboard._boards == {('all', None): [(7, 1.0)]}
+    assert trending_leaderboard.stats()['failures'] == failures + 1
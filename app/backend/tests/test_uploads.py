@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from services.uploads import sniff_media_type
+
+
+def ftyp(brand):
+    return b'\x00\x00\x00\x18ftyp' + brand + b'\x00\x00\x00\x00'
+
+
+@pytest.mark.parametrize('head, media_type', [
+    (b'\xff\xd8\xff\xe0\x00\x10JFIF\x00', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR', 'png'),
+    (b'GIF89a\x01\x00\x01\x00', 'gif'),
+    (b'RIFF\x24\x00\x00\x00WEBPVP8 ', 'webp'),
+    (b'RIFF\x24\x00\x00\x00AVI LIST', 'avi'),
+    (ftyp(b'isom'), 'mp4'),
+    (ftyp(b'mp42'), 'mp4'),
+    (ftyp(b'qt  '), 'mov'),
+])
+def test_known_formats_are_recognized(head, media_type):
+    assert sniff_media_type(head) == media_type
+
+
+@pytest.mark.parametrize('head', [
+    ftyp(b'heic'),
+    ftyp(b'avif'),
+    ftyp(b'mif1'),
+    b'JUNK\x24\x00\x00\x00WEBPVP8 ',
+    b'JUNK\x24\x00\x00\x00AVI LIST',
+    b'<html><script>',
+    b'',
+])
+def test_lookalikes_are_rejected(head):
+    assert sniff_media_type(head) is None
+
+
+def post_with_media(client, headers, body, filename):
+    return client.post('/api/posts', data={'title': 'Media', 'content': 'Body', 'media': (io.BytesIO(body), filename)},
+                       headers=headers)
+
+
+def test_post_media_type_comes_from_content_not_name(client, alice):
+    response = post_with_media(client, alice, ftyp(b'heic') + b'\x00' * 64, 'clip.mp4')
+    assert response.status_code == 400
+    response = post_with_media(client, alice, ftyp(b'isom') + b'\x00' * 64, 'clip.bin')
+    assert response.status_code == 201
+    post = client.get(f"/api/posts/{response.get_json()['id']}").get_json()
+    assert post['media_url'].endswith('.mp4')
+
+
+def test_oversize_upload_is_rejected_with_413(app, client, alice, monkeypatch):
+    monkeypatch.setattr(app.view_functions['posts.create_post'], 'upload_limit', 1024)
+    response = post_with_media(client, alice, b'\xff\xd8\xff' + b'\x00' * 4096, 'big.jpg')
+    assert response.status_code == 413
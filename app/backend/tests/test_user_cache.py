@@ -0,0 +1,113 @@
+from conftest import create_post, create_test_app, signup_and_login
+from models.user import db, User
+from services.counters import reconcile_user_post_counts
+from services.identity import user_cache
+from services.notifications import reconcile_unread_counts
+
+
+def user_selects(counter):
+    return [s for s in counter.statements if s.lstrip().startswith('SELECT') and 'FROM users' in s]
+
+
+def test_repeat_requests_read_the_user_from_cache(client, alice, count_queries):
+    assert client.get('/api/profile', headers=alice).status_code == 200
+    before = user_cache.stats()
+    with count_queries() as counter:
+        response = client.get('/api/profile', headers=alice)
+    assert response.status_code == 200
+    assert response.get_json()['username'] == 'alice'
+    assert user_selects(counter) == []
+    assert user_cache.stats()['hits'] == before['hits'] + 1
+
+
+def test_profile_update_invalidates_the_entry(client, alice):
+    client.get('/api/profile', headers=alice)
+    before = user_cache.stats()
+    response = client.put('/api/profile', json={'bio': 'Hello there'}, headers=alice)
+    assert response.status_code == 200
+    assert user_cache.stats()['invalidations'] == before['invalidations'] + 1
+    assert client.get('/api/profile', headers=alice).get_json()['bio'] == 'Hello there'
+
+
+def test_rolled_back_changes_keep_the_entry(app, client, alice):
+    client.get('/api/profile', headers=alice)
+    with app.app_context():
+        user = User.query.filter_by(username='alice').first()
+        user.bio = 'never saved'
+        db.session.flush()
+        db.session.rollback()
+    assert user_cache.stats()['entries'] == 1
+    assert client.get('/api/profile', headers=alice).get_json()['bio'] == ''
+
+
+def test_cached_user_is_attached_and_writable(app, client, alice):
+    client.get('/api/profile', headers=alice)
+    with app.app_context():
+        user_id = db.session.scalar(db.select(User.id).filter_by(username='alice'))
+        user = user_cache.get(user_id)
+        assert user in db.session
+        user.bio = 'written through a cached instance'
+        db.session.commit()
+    assert client.get('/api/profile', headers=alice).get_json()['bio'] == 'written through a cached instance'
+
+
+def test_expired_and_evicted_entries_are_reloaded(tmp_path):
+    app = create_test_app(tmp_path, USER_CACHE_TTL=0, USER_CACHE_MAX_ENTRIES=1)
+    client = app.test_client()
+    alice = signup_and_login(client, 'alice')
+    before = user_cache.stats()
+    client.get('/api/profile', headers=alice)
+    client.get('/api/profile', headers=alice)
+    assert user_cache.stats()['misses'] == before['misses'] + 2
+    assert user_cache.stats()['hits'] == before['hits']
+
+    user_cache.ttl = 60
+    bob = signup_and_login(client, 'bob')
+    client.get('/api/profile', headers=alice)
+    client.get('/api/profile', headers=bob)
+    assert user_cache.stats()['entries'] == 1
+    user_cache.clear()
+
+
+def test_disabled_cache_loads_from_the_database(tmp_path):
+    app = create_test_app(tmp_path, USER_CACHE_ENABLED=False)
+    client = app.test_client()
+    alice = signup_and_login(client, 'alice')
+    before = user_cache.stats()
+    assert client.get('/api/profile', headers=alice).status_code == 200
+    assert user_cache.stats()['misses'] == before['misses']
+    assert user_cache.stats()['entries'] == 0
+
+
+def cached(app, username, field):
+    with app.app_context():
+        user_id = db.session.scalar(db.select(User.id).filter_by(username=username))
+        return getattr(user_cache.get(user_id), field)
+
+
+def test_bulk_counter_updates_invalidate_the_entry(app, client, alice, bob):
+    client.get('/api/profile', headers=bob)
+    post_id = create_post(client, bob)
+    assert cached(app, 'bob', 'post_count') == 1
+    client.delete(f'/api/posts/{post_id}', headers=bob)
+    assert cached(app, 'bob', 'post_count') == 0
+
+    create_post(client, alice, content='Hi @bob')
+    assert cached(app, 'bob', 'unread_notification_count') == 1
+    client.patch('/api/notifications', json={'all': True}, headers=bob)
+    assert cached(app, 'bob', 'unread_notification_count') == 0
+
+
+
+def test_reconciling_counters_clears_the_cache(app, client, bob):
+    client.get('/api/profile', headers=bob)
+    with app.app_context():
+        User.query.filter_by(username='bob').update({User.post_count: 5, User.unread_notification_count: 5})
+        db.session.commit()
+        assert user_cache.stats()['entries'] == 1
+        assert reconcile_user_post_counts() == 1
+        assert user_cache.stats()['entries'] == 0
+    assert cached(app, 'bob', 'post_count') == 0
+    with app.app_context():
+        assert reconcile_unread_counts() == 1
+        assert user_cache.stats()['entries'] == 0
@@ -0,0 +1,44 @@
+from models.user import db
+from models.post import PostView, PostViewCount
+from services.view_buffer import view_buffer
+
+from conftest import create_post, get_post
+
+
+def test_buffered_views_are_written_on_flush(app, client, alice):
+    app.config['VIEW_BUFFER_FLUSH_INTERVAL'] = 60
+    view_buffer.init_app(app)
+    post_id = create_post(client, alice)
+    for _ in range(3):
+        client.get(f'/api/posts/{post_id}', headers=alice)
+    assert get_post(app, post_id).view_count == 0
+    assert view_buffer.flush() == 3
+    assert get_post(app, post_id).view_count == 3
+    with app.app_context():
+        assert PostView.query.count() == 3
+        assert db.session.query(db.func.sum(PostViewCount.count)).scalar() == 3
+
+
+def test_flush_skips_views_of_deleted_posts(app, client, alice):
+    app.config['VIEW_BUFFER_FLUSH_INTERVAL'] = 60
+    view_buffer.init_app(app)
+    kept = create_post(client, alice)
+    deleted = create_post(client, alice)
+    client.get(f'/api/posts/{kept}', headers=alice)
+    client.get(f'/api/posts/{deleted}', headers=alice)
+    client.delete(f'/api/posts/{deleted}', headers=alice)
+    before = view_buffer.stats()
+    assert view_buffer.flush() == 1
+    after = view_buffer.stats()
+    assert [after[key] - before[key] for key in ('flushed', 'orphaned', 'failed')] == [1, 1, 0]
+    assert get_post(app, kept).view_count == 1
+
+
+def test_full_buffer_drops_views(app, client, alice):
+    app.config.update(VIEW_BUFFER_FLUSH_INTERVAL=60, VIEW_BUFFER_MAX_SIZE=1)
+    view_buffer.init_app(app)
+    post_id = create_post(client, alice)
+    dropped = view_buffer.stats()['dropped']
+    assert view_buffer.record(post_id) is True
+    assert view_buffer.record(post_id) is False
+    assert view_buffer.stats()['dropped'] == dropped + 1
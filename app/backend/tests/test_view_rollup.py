@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from models.user import db
+from models.post import PostViewCount
+from services.view_rollup import compact_view_counts, record_view_counts, top_viewed_posts
+
+from conftest import create_post
+
+NOW = datetime(2024, 5, 1, 12, 30)
+
+
+def test_views_roll_up_into_hourly_buckets(app, client, alice):
+    post_id = create_post(client, alice)
+    with app.app_context():
+        record_view_counts([(post_id, NOW), (post_id, NOW + timedelta(minutes=20))])
+        record_view_counts([(post_id, NOW - timedelta(hours=1))])
+        db.session.commit()
+        buckets = {row.bucket_start: row.count for row in PostViewCount.query.filter_by(post_id=post_id)}
+    assert buckets == {datetime(2024, 5, 1, 12): 2, datetime(2024, 5, 1, 11): 1}
+
+
+def test_top_viewed_posts_reads_the_window(app, client, alice):
+    old, recent = create_post(client, alice), create_post(client, alice)
+    with app.app_context():
+        record_view_counts([(old, NOW - timedelta(days=8))] * 5 + [(recent, NOW)] * 2 + [(old, NOW)])
+        db.session.commit()
+        assert top_viewed_posts(NOW - timedelta(days=7)) == [(recent, 2), (old, 1)]
+
+
+def test_compaction_drops_expired_buckets(app, client, alice):
+    post_id = create_post(client, alice)
+    with app.app_context():
+        record_view_counts([(post_id, NOW - timedelta(days=8)), (post_id, NOW - timedelta(days=9)), (post_id, NOW)])
+        db.session.commit()
+        assert compact_view_counts(now=NOW) == 2
+        assert [row.bucket_start for row in PostViewCount.query] == [datetime(2024, 5, 1, 12)]
@@ -21,21 +21,29 @@ const AdminDashboard: React.FC = () => {
   const [posts, setPosts] = useState<Post[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // From the last page's next_cursor; null once every user is listed
+  const [usersCursor, setUsersCursor] = useState<string | null>(null);
+  const [loadingMoreUsers, setLoadingMoreUsers] = useState(false);
 
-  const fetchUsers = async () => {
-    setLoading(true);
+  const fetchUsers = async (cursor: string | null = null) => {
+    // Later pages append below the table instead of replacing it with the spinner
+    const setBusy = cursor ? setLoadingMoreUsers : setLoading;
+    setBusy(true);
     setError(null);
     try {
-      const res = await fetch('/api/admin/users', {
+      const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+      const res = await fetch(`/api/admin/users?per_page=50${query}`, {
         headers: { 'Authorization': `Bearer ${token}` },
       });
       if (res.ok) {
-        setUsers(await res.json());
+        const data = await res.json();
+        setUsers(users => cursor ? [...users, ...data.users] : data.users);
+        setUsersCursor(data.next_cursor);
       } else {
         setError('Failed to fetch users');
       }
     } finally {
-      setLoading(false);
+      setBusy(false);
     }
   };
 
@@ -111,6 +119,15 @@ const AdminDashboard: React.FC = () => {
             </tbody>
           </table>
         )}
+        {usersCursor && !loading && (
+          <button
+            className="w-full p-2 text-sm text-blue-600 hover:underline"
+            onClick={() => fetchUsers(usersCursor)}
+            disabled={loadingMoreUsers}
+          >
+            {loadingMoreUsers ? 'Loading...' : 'Load more users'}
+          </button>
+        )}
       </div>
       <div>
         <h2 className="text-xl font-semibold mb-2">Posts</h2>
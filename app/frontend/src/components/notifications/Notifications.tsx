@@ -13,17 +13,21 @@ const Notifications: React.FC = () => {
   const [notifications, setNotifications] = useState<Notification[]>([]);
   const [open, setOpen] = useState(false);
   const [loading, setLoading] = useState(false);
+  // From the X-Next-Cursor header; empty on the last page
+  const [nextCursor, setNextCursor] = useState('');
 
-  const fetchNotifications = async () => {
+  const fetchNotifications = async (cursor = '') => {
     if (!token) return;
     setLoading(true);
     try {
-      const res = await fetch('/api/notifications', {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const res = await fetch(`/api/notifications${query}`, {
         headers: { 'Authorization': `Bearer ${token}` },
       });
       if (res.ok) {
-        const data = await res.json();
-        setNotifications(data);
+        const data: Notification[] = await res.json();
+        setNotifications(prev => (cursor ? [...prev, ...data] : data));
+        setNextCursor(res.headers.get('X-Next-Cursor') || '');
       }
     } finally {
       setLoading(false);
@@ -44,6 +48,56 @@ const Notifications: React.FC = () => {
     // eslint-disable-next-line
   }, [open]);
 
+  // New notifications are pushed over Server-Sent Events. EventSource can't send the
+  // Authorization header, so each connection opens with a short-lived stream token;
+  // when the stream drops we fetch a fresh one and resume from the last event id
+  useEffect(() => {
+    if (!token) return;
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+    let lastEventId = '';
+    let closed = false;
+
+    const reconnectLater = () => {
+      if (!closed) retry = setTimeout(connect, 3000);
+    };
+
+    const connect = async () => {
+      try {
+        const res = await fetch('/api/notifications/stream-token', {
+          method: 'POST',
+          headers: { 'Authorization': `Bearer ${token}` },
+        });
+        if (!res.ok) throw new Error('Failed to get a stream token');
+        const { token: streamToken } = await res.json();
+        if (closed) return;
+        const params = new URLSearchParams({ token: streamToken });
+        if (lastEventId) params.set('last_event_id', lastEventId);
+        source = new EventSource(`/api/notifications/stream?${params}`);
+        source.addEventListener('notification', (e) => {
+          const event = e as MessageEvent;
+          lastEventId = event.lastEventId;
+          const notification: Notification = JSON.parse(event.data);
+          setNotifications(prev => (prev.some(n => n.id === notification.id) ? prev : [notification, ...prev]));
+        });
+        // The stream token may have expired by now, so don't let EventSource retry with it
+        source.onerror = () => {
+          source?.close();
+          reconnectLater();
+        };
+      } catch (err) {
+        reconnectLater();
+      }
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      source?.close();
+    };
+  }, [token]);
+
   return (
     <div className="relative inline-block text-left">
       <button
@@ -74,6 +128,14 @@ const Notifications: React.FC = () => {
               </div>
             ))
           )}
+          {nextCursor && !loading && (
+            <button
+              className="w-full p-2 text-sm text-blue-600 hover:underline"
+              onClick={() => fetchNotifications(nextCursor)}
+            >
+              Load older
+            </button>
+          )}
         </div>
       )}
     </div>
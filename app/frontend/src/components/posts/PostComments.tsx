@@ -13,8 +13,27 @@ interface Comment {
   parent_id: number | null;
   created_at: string;
   replies: Comment[];
+  reply_count?: number;
+  more_replies?: number;
 }
 
+interface ThreadPage {
+  threads: Comment[];
+  hasMore: boolean;
+}
+
+// Threads come back as a plain list; paging travels in the X-Page / X-Has-More headers
+const fetchThreads = async (url: string, page: number): Promise<ThreadPage> => {
+  const res = await fetch(`${url}?page=${page}`);
+  if (!res.ok) throw new Error('Failed to fetch comments');
+  return { threads: await res.json(), hasMore: res.headers.get('X-Has-More') === 'true' };
+};
+
+const mapComment = (comments: Comment[], id: number, update: (comment: Comment) => Comment): Comment[] =>
+  comments.map(comment => comment.id === id
+    ? update(comment)
+    : { ...comment, replies: mapComment(comment.replies || [], id, update) });
+
 interface PostCommentsProps {
   postId: number;
 }
@@ -22,6 +41,11 @@ interface PostCommentsProps {
 const PostComments: React.FC<PostCommentsProps> = ({ postId }) => {
   const { user, token } = useAuth();
   const [comments, setComments] = useState<Comment[]>([]);
+  const [page, setPage] = useState(1);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Comment id -> last page of direct replies fetched, and whether there are more
+  const [replyPages, setReplyPages] = useState<Record<number, { page: number; hasMore: boolean }>>({});
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [newComment, setNewComment] = useState('');
@@ -33,10 +57,11 @@ const PostComments: React.FC<PostCommentsProps> = ({ postId }) => {
     setLoading(true);
     setError(null);
     try {
-      const res = await fetch(`/api/posts/${postId}/comments`);
-      if (!res.ok) throw new Error('Failed to fetch comments');
-      const data = await res.json();
-      setComments(data);
+      const { threads, hasMore } = await fetchThreads(`/api/posts/${postId}/comments`, 1);
+      setComments(threads);
+      setPage(1);
+      setHasMore(hasMore);
+      setReplyPages({});
     } catch (err) {
       setError('Error loading comments');
     } finally {
@@ -44,6 +69,36 @@ const PostComments: React.FC<PostCommentsProps> = ({ postId }) => {
     }
   };
 
+  const loadMoreComments = async () => {
+    setLoadingMore(true);
+    try {
+      const { threads, hasMore } = await fetchThreads(`/api/posts/${postId}/comments`, page + 1);
+      setComments(prev => [...prev, ...threads]);
+      setPage(page + 1);
+      setHasMore(hasMore);
+    } catch (err) {
+      setError('Error loading comments');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadReplies = async (commentId: number) => {
+    const next = (replyPages[commentId]?.page || 0) + 1;
+    try {
+      const { threads, hasMore } = await fetchThreads(`/api/posts/${postId}/comments/${commentId}/replies`, next);
+      // The first page replaces the partial subtree that came with the thread
+      setComments(prev => mapComment(prev, commentId, comment => ({
+        ...comment,
+        replies: next === 1 ? threads : [...comment.replies, ...threads],
+        more_replies: undefined,
+      })));
+      setReplyPages(prev => ({ ...prev, [commentId]: { page: next, hasMore } }));
+    } catch (err) {
+      setError('Error loading replies');
+    }
+  };
+
   useEffect(() => {
     fetchComments();
     // eslint-disable-next-line
@@ -127,6 +182,16 @@ const PostComments: React.FC<PostCommentsProps> = ({ postId }) => {
             )}
           </div>
           {comment.replies && comment.replies.length > 0 && renderComments(comment.replies, depth + 1)}
+          {(comment.more_replies || replyPages[comment.id]?.hasMore) && (
+            <button
+              className="text-xs text-blue-600 hover:underline ml-6"
+              onClick={() => loadReplies(comment.id)}
+            >
+              {comment.more_replies
+                ? `${comment.more_replies} more ${comment.more_replies === 1 ? 'reply' : 'replies'}`
+                : 'More replies'}
+            </button>
+          )}
         </li>
       ))}
     </ul>
@@ -142,6 +207,15 @@ const PostComments: React.FC<PostCommentsProps> = ({ postId }) => {
       ) : (
         <>
           {renderComments(comments)}
+          {hasMore && (
+            <button
+              className="text-sm text-blue-600 hover:underline"
+              onClick={loadMoreComments}
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Loading...' : 'Load more comments'}
+            </button>
+          )}
           {user && token && (
             <div className="mt-4">
               <ReactQuill
@@ -2,6 +2,9 @@ import type { Profile, ProfileImageUpload } from '../../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
+// About 130s of polling at the backoff below, just past the server's IMAGE_JOB_TIMEOUT
+const IMAGE_JOB_MAX_POLLS = 30;
+
 // Helper function to get auth headers
 const getAuthHeaders = () => ({
   'Authorization': `Bearer ${localStorage.getItem('token')}`,
@@ -54,7 +57,22 @@ export const profileApi = {
       },
       body: formData,
     });
-    return handleResponse(response);
+    // Processing happens in the background: poll the job, backing off from 0.5s to 5s
+    // between attempts; the server fails jobs still queued after IMAGE_JOB_TIMEOUT (2 min)
+    const job = await handleResponse(response);
+    let delay = 500;
+    for (let attempt = 0; attempt < IMAGE_JOB_MAX_POLLS; attempt++) {
+      await new Promise(resolve => setTimeout(resolve, delay));
+      delay = Math.min(delay * 1.5, 5000);
+      const status = await handleResponse(await fetch(`${API_URL}${job.status_url}`, { headers: getAuthHeaders() }));
+      if (status.status === 'done') {
+        return { image_url: status.image_url, thumbnail_url: status.thumbnail_url, message: job.message };
+      }
+      if (status.status === 'failed') {
+        throw new Error(status.error || 'Image processing failed');
+      }
+    }
+    throw new Error('Image processing is taking too long; please try again later');
   },
 
   // Validate file before upload